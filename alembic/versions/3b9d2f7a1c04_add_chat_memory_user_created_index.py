@@ -0,0 +1,41 @@
+"""add (user_id, created_at DESC) index to chat_memory
+
+Revision ID: 3b9d2f7a1c04
+Revises: ea12b3d4c5f6
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+import sqlalchemy as sa  # type: ignore
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9d2f7a1c04"
+down_revision: Union[str, None] = "ea12b3d4c5f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so a large chat_memory table isn't write-locked while the index builds;
+    # it can't run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_memory_user_id_created_at",
+            "chat_memory",
+            ["user_id", sa.text("created_at DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_memory_user_id_created_at",
+            table_name="chat_memory",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,27 @@
+"""add compact embedding_vector column to chat_long_memory
+
+Revision ID: 5c1e8a9d2b37
+Revises: 3b9d2f7a1c04
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+import sqlalchemy as sa  # type: ignore
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e8a9d2b37"
+down_revision: Union[str, None] = "3b9d2f7a1c04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable, no default -> metadata-only change, no table rewrite
+    op.add_column("chat_long_memory", sa.Column("embedding_vector", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_long_memory", "embedding_vector")
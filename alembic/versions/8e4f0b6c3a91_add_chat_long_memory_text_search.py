@@ -0,0 +1,71 @@
+"""add full-text (tsvector) and trigram search indexes to chat_long_memory
+
+Revision ID: 8e4f0b6c3a91
+Revises: 5c1e8a9d2b37
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+import sqlalchemy as sa  # type: ignore
+from sqlalchemy.dialects import postgresql  # type: ignore
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4f0b6c3a91"
+down_revision: Union[str, None] = "5c1e8a9d2b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Stored generated column: Postgres keeps it in sync with content on every write.
+    # Adding it rewrites the table once.
+    op.add_column(
+        "chat_long_memory",
+        sa.Column(
+            "content_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', coalesce(content, ''))", persisted=True),
+        ),
+    )
+
+    # CONCURRENTLY so writes aren't blocked while the GIN indexes build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_long_memory_content_tsv",
+            "chat_long_memory",
+            ["content_tsv"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_chat_long_memory_content_trgm",
+            "chat_long_memory",
+            ["content"],
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_long_memory_content_trgm",
+            table_name="chat_long_memory",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_long_memory_content_tsv",
+            table_name="chat_long_memory",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("chat_long_memory", "content_tsv")
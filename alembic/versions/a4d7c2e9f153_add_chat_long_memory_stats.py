@@ -0,0 +1,45 @@
+"""add chat_long_memory_stats per-user summary table
+
+Revision ID: a4d7c2e9f153
+Revises: 8e4f0b6c3a91
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+import sqlalchemy as sa  # type: ignore
+from sqlalchemy.dialects import postgresql  # type: ignore
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7c2e9f153"
+down_revision: Union[str, None] = "8e4f0b6c3a91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_long_memory_stats",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("memory_type", sa.String(length=50), primary_key=True),
+        sa.Column("memory_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("importance_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("latest_created_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Backfill from the existing memories (same aggregate as rebuild_memory_stats)
+    op.execute(
+        """
+        INSERT INTO chat_long_memory_stats (user_id, memory_type, memory_count, importance_sum, latest_created_at)
+        SELECT user_id, coalesce(memory_type, 'unknown'), count(*), coalesce(sum(importance_score), 0),
+               max(created_at)
+          FROM chat_long_memory
+         GROUP BY user_id, coalesce(memory_type, 'unknown')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chat_long_memory_stats")
@@ -0,0 +1,50 @@
+"""add memory_consolidation_watermark table
+
+Revision ID: b2e6f8a1d407
+Revises: a4d7c2e9f153
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op  # type: ignore
+import sqlalchemy as sa  # type: ignore
+from sqlalchemy.dialects import postgresql  # type: ignore
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b2e6f8a1d407"
+down_revision: Union[str, None] = "a4d7c2e9f153"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "memory_consolidation_watermark",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("consolidated_until", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("turns_consolidated", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("summaries_created", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    # Consolidation scans: a user's turns of one type, oldest first
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_long_memory_user_type_created",
+            "chat_long_memory",
+            ["user_id", "memory_type", "created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_chat_long_memory_user_type_created",
+            table_name="chat_long_memory",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table("memory_consolidation_watermark")
@@ -1,13 +1,25 @@
-from fastapi import APIRouter
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import APIRouter, HTTPException
+from app.core.conversation_store import conversation_store
 from app.services.ai_memory_service import chat_with_memory
 
 router = APIRouter(prefix="/ai-memory", tags=["AI Memory"])
 
-chat_history = []  # Temporary memory (we’ll persist it later)
 
 @router.post("/chat")
-async def chat_endpoint(prompt: str):
-    global chat_history
-    response = chat_with_memory(prompt, chat_history)
-    chat_history.append((prompt, response["answer"]))
-    return {"answer": response["answer"], "sources": response.get("context", [])}
+async def chat_endpoint(prompt: str, session_id: Optional[str] = None):
+    """Chat within a session; omit session_id to start one and reuse the returned id"""
+    session_id = session_id or uuid4().hex
+    response = chat_with_memory(prompt, conversation_store.history(session_id))
+    conversation_store.append(session_id, prompt, response["answer"])
+    return {"answer": response["answer"], "sources": response.get("context", []), "session_id": session_id}
+
+
+@router.delete("/chat/{session_id}")
+async def clear_chat_session(session_id: str):
+    """Forget a session's history"""
+    if not conversation_store.clear(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"session_id": session_id, "cleared": True}
@@ -99,20 +99,73 @@
 
 
 # app/api/routes/ai_routes.py
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.api.dependencies.db_dependency import get_db
-from app.schemas.ai_schema import AIResponseOut
+from app.core.sse import SSE_HEADERS, sse_event
+from app.db.session import SessionLocal
+from app.schemas.ai_schema import AIBatchRequest, AIBatchResponse, AIResponseOut
 from app.services.ai_service import AIService
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
 
 @router.post("/generate", response_model=AIResponseOut)
-async def generate_ai_response(prompt: str, model_type: str, db: Session = Depends(get_db)):
+async def generate_ai_response(
+    prompt: str,
+    model_type: str = Query(default="auto", description="openai | groq | auto (fastest healthy provider)"),
+    hedge: Optional[bool] = Query(default=None, description="auto only: race a second provider after the first one's p95"),
+    db: Session = Depends(get_db),
+):
     try:
-        result = await AIService.generate_response(db, prompt, model_type)
+        result = await AIService.generate_response(db, prompt, model_type, hedge=hedge)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/generate/batch", response_model=AIBatchResponse)
+async def generate_ai_batch(
+    request: AIBatchRequest,
+    stream: bool = Query(default=False, description="Stream results as Server-Sent Events as they complete"),
+    db: Session = Depends(get_db),
+):
+    """
+    Many prompts at once, run concurrently (request.concurrency, capped server-side).
+    Results are saved with one multi-row insert. Without `stream` the response lists
+    every item in prompt order; with it, a "result" event per prompt as it completes,
+    then "done" with the saved ids in prompt order.
+    """
+    try:
+        AIService.check_batch(request.prompts, request.model_type)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if stream:
+        async def event_stream():
+            # The session lives exactly as long as the stream, independent of dependency teardown
+            stream_db = SessionLocal()
+            try:
+                async for event, data in AIService.stream_batch(
+                    stream_db, request.prompts, request.model_type, request.concurrency, request.hedge
+                ):
+                    yield sse_event(event, data)
+            except Exception as e:
+                yield sse_event("error", {"detail": str(e)})
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    try:
+        return await AIService.generate_batch(
+            db, request.prompts, request.model_type, request.concurrency, request.hedge
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
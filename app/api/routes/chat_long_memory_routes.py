@@ -4,8 +4,11 @@ FastAPI endpoints for memory management
 """
 from app.api.dependencies.db_dependency import get_db
 from app.db.models.user_model import User
-from app.services.chat_long_memory_service import sharmaji_chat
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from app.services.chat_long_memory_service import sharmaji_chat, stream_sharmaji_chat, chat_long_memory_service
+from app.db.session import SessionLocal
+from app.core.sse import SSE_HEADERS, sse_event
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from uuid import UUID
@@ -15,6 +18,7 @@ from app.schemas.chat_long_memory_schema import (
     ChatLongMemoryUpdate,
     ChatLongMemoryResponse,
     ChatMemoryQueryResponse,
+    MemorySearchResponse,
     MemoryStatsResponse,
     MemoryCleanupResponse
 )
@@ -36,6 +40,58 @@ def chat_with_sharmaji(user_id: str, message: str, db: Session = Depends(get_db)
     }
 
 
+@router.post("/chat-with-sharmaji/stream")
+async def chat_with_sharmaji_stream(user_id: str, message: str, request: Request):
+    """
+    Talk to Sharma Ji with the reply streamed as Server-Sent Events
+    (sources → token* → done)
+    """
+    async def event_stream():
+        db = SessionLocal()
+        try:
+            async for event, data in stream_sharmaji_chat(
+                db, user_id, message, is_disconnected=request.is_disconnected
+            ):
+                yield sse_event(event, data)
+        finally:
+            db.close()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/search", response_model=MemorySearchResponse)
+def search_memories(
+    user_id: UUID,
+    q: str = Query(..., description="Search term", min_length=1),
+    mode: str = Query(default="words", description="words, prefix, phrase or substring"),
+    limit: int = Query(default=20, ge=1, le=100, description="Maximum results"),
+    db: Session = Depends(get_db)
+):
+    """
+    Ranked full-text search over a user's long-term memories
+    
+    - **words**: all words, any order (stemming-free, `-word` excludes)
+    - **prefix**: every word as a prefix, for search-as-you-type
+    - **phrase**: the words adjacent, in order
+    - **substring**: fuzzy/infix match via trigrams
+    """
+    try:
+        return chat_long_memory_service.search_memories(
+            db=db,
+            user_id=user_id,
+            search_term=q,
+            limit=limit,
+            mode=mode
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search memories: {str(e)}"
+        )
+
+
 # def get_current_user(db: Session = Depends(get_db)) -> User:
 #     user = db.query(User).first()
 #     if not user:
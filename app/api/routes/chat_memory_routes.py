@@ -1,11 +1,16 @@
-from app.api.dependencies.db_dependency import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.services.chat_memory_service import chat_with_memory_db
-from app.schemas.chat_memory_schema import ChatMemoryResponse
+from app.api.dependencies.db_dependency import get_async_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.chat_memory_service import chat_with_memory_db, stream_chat_with_memory_db
+from app.repositories.chat_memory_repository import aget_chat_memory_page
+from app.db.session import AsyncSessionLocal
+from app.core.sse import SSE_HEADERS, sse_event
+from app.schemas.chat_memory_schema import ChatMemoryPage
 from pydantic import BaseModel
 from uuid import UUID
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter(prefix="/chat-memory", tags=["Chat Memory"])
 
@@ -18,12 +23,13 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     answer: str
     sources: List[dict]
+    history_stats: Optional[dict] = None
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat_endpoint(request: ChatRequest, db: AsyncSession = Depends(get_async_db)):
     try:
-        response = chat_with_memory_db(db, request.user_id, request.question)
+        response = await chat_with_memory_db(db, request.user_id, request.question)
 
         # context is already a list of dicts (serialized safely)
         context = response.get("context", [])
@@ -33,7 +39,8 @@ async def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
 
         return {
             "answer": response.get("answer", ""),
-            "sources": sources
+            "sources": sources,
+            "history_stats": response.get("history_stats")
         }
 
     except ValueError as e:
@@ -43,8 +50,29 @@ async def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
 
 
 
-@router.get("/history/{user_id}", response_model=List[ChatMemoryResponse])
-async def get_chat_history(user_id: UUID, db: Session = Depends(get_db)):
-    from app.repositories.chat_memory_repository import get_user_chat_memory
-    history = get_user_chat_memory(db, user_id)
-    return history
\ No newline at end of file
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request):
+    """Same as /chat but streams tokens as Server-Sent Events (sources → token* → done)"""
+    async def event_stream():
+        # The session lives exactly as long as the stream, independent of dependency teardown
+        async with AsyncSessionLocal() as db:
+            async for event, data in stream_chat_with_memory_db(
+                db, request.user_id, request.question, is_disconnected=http_request.is_disconnected
+            ):
+                yield sse_event(event, data)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/history/{user_id}", response_model=ChatMemoryPage)
+async def get_chat_history(
+    user_id: UUID,
+    before: Optional[datetime] = Query(default=None, description="Cursor: return turns older than this created_at"),
+    before_id: Optional[UUID] = Query(default=None, description="Cursor tie-breaker: the id that came with next_before"),
+    limit: int = Query(default=50, ge=1, le=200, description="Page size"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    items, next_before, next_before_id = await aget_chat_memory_page(
+        db, user_id, before=before, before_id=before_id, limit=limit
+    )
+    return {"items": items, "next_before": next_before, "next_before_id": next_before_id}
\ No newline at end of file
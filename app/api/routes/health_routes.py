@@ -0,0 +1,51 @@
+"""
+Health API Routes
+Liveness (the process answers) and readiness (DB reachable + resource warm-up finished)
+"""
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.core.resources import resources
+from app.db.session import async_engine
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+def liveness():
+    """Always 200 while the event loop is serving requests"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    200 once the database answers and the resource warm-up (if one was started) has
+    finished, 503 before that. Resources that failed to warm up are listed and the
+    status is "degraded": they are retried on first use, not waited on.
+    """
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        database = "ok"
+    except Exception as e:
+        database = f"error: {e}"
+
+    ready = database == "ok" and resources.ready
+    failed = resources.failed
+    if ready:
+        state = "degraded" if failed else "ready"
+    else:
+        state = "starting" if resources.warming else "not_ready"
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": state,
+            "database": database,
+            "warm_up": "running" if resources.warming else "done" if resources.warm_up_started else "disabled",
+            "warm_up_seconds": round(resources.warm_up_seconds, 3) if resources.warm_up_seconds else None,
+            "failed": failed,
+            "resources": resources.snapshot(),
+        },
+    )
@@ -0,0 +1,35 @@
+"""
+Ingestion API Routes
+Upload documents into the Chroma stores used for retrieval
+"""
+from typing import List
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
+
+from app.services.ingestion_service import CHROMA_STORES, ingest_documents
+
+router = APIRouter(prefix="/ingest", tags=["Ingestion"])
+
+
+@router.post("/files")
+async def ingest_files(
+    files: List[UploadFile] = File(...),
+    store: str = Form("chat"),
+    prune: bool = Form(True)
+):
+    """
+    Chunk, dedupe and embed uploaded text files into a Chroma store
+    (unchanged chunks are not re-embedded; returns counts and chunks/sec)
+    """
+    if store not in CHROMA_STORES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Store must be one of: {', '.join(CHROMA_STORES)}"
+        )
+
+    def uploads():
+        # Uploads are spooled by FastAPI; read them one at a time
+        for upload in files:
+            yield upload.filename, upload.file.read().decode("utf-8", errors="replace")
+
+    return await ingest_documents(uploads(), store=store, prune=prune)
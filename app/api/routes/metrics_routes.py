@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Response
+from app.db.session import get_pool_stats
+from app.core.client_registry import client_registry
+from app.core.semantic_cache import response_cache_stats
+from app.core.search_cache import search_cache
+from app.core.embedding_cache import embedding_cache
+from app.core.conversation_store import conversation_store
+from app.core.llm_router import llm_router
+from app.core.tracing import CONTENT_TYPE, metrics
+from app.db.chat_memory_writer import chat_memory_writer
+from app.db.user_cache import user_cache
+from app.db.memory_access_buffer import memory_access_buffer
+from app.db.memory_vector_index import memory_vector_index
+from app.services.memory_consolidation_service import memory_consolidator
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+def prometheus_metrics():
+    """Stage latency histograms, request latency, LLM tokens and stage errors (Prometheus text format)"""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+@router.get("/db-pool")
+def db_pool_metrics():
+    """Connection pool checkouts, overflow and checkout wait time for this worker"""
+    return get_pool_stats()
+
+
+@router.get("/http-clients")
+def http_client_metrics():
+    """Provider clients created in this worker and outbound connection reuse rates"""
+    return client_registry.stats()
+
+
+@router.get("/response-cache")
+def response_cache_metrics():
+    """Semantic response cache hit rate and saved tokens per chat endpoint"""
+    return response_cache_stats()
+
+
+@router.get("/search-cache")
+def search_cache_metrics():
+    """Tavily result cache hits, misses and coalesced (single-flighted) lookups"""
+    return search_cache.snapshot()
+
+
+@router.get("/chat-writes")
+def chat_write_metrics():
+    """Write-behind queue depth, flushed batches, dead-lettered and dropped turns"""
+    return chat_memory_writer.snapshot()
+
+
+@router.get("/user-cache")
+def user_cache_metrics():
+    """User lookup cache hits, misses, evictions and invalidations"""
+    return user_cache.snapshot()
+
+
+@router.get("/memory-access")
+def memory_access_metrics():
+    """Buffered last_used_at touches waiting to be flushed and bulk UPDATEs so far"""
+    return memory_access_buffer.snapshot()
+
+
+@router.get("/memory-index")
+def memory_index_metrics():
+    """Users/vectors held by the long-term memory similarity index"""
+    return memory_vector_index.snapshot()
+
+
+@router.get("/memory-consolidation")
+def memory_consolidation_metrics():
+    """Consolidation runs, users processed, turns folded into summaries"""
+    return memory_consolidator.snapshot()
+
+
+@router.get("/embedding-cache")
+def embedding_cache_metrics():
+    """Embedding cache hit rate per tier, bytes stored and API latency saved"""
+    return embedding_cache.snapshot()
+
+
+@router.get("/conversations")
+def conversation_store_metrics():
+    """/ai-memory/chat sessions held, their size against the ceiling and evictions"""
+    return conversation_store.snapshot()
+
+
+@router.get("/llm-router")
+def llm_router_metrics():
+    """Per-provider p50/p95 latency, error rate and health, plus hedges and failovers"""
+    return llm_router.snapshot()
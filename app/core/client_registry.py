@@ -0,0 +1,195 @@
+"""
+Client Registry
+Process-wide, lazily created provider clients (OpenAI, Groq, Tavily) that share
+one keep-alive HTTP pool per sync/async flavour instead of opening a fresh
+connection pool (and TLS handshake) on every request.
+"""
+import threading
+from typing import Callable, Dict, Hashable
+
+import httpx
+from groq import AsyncGroq, Groq
+from openai import AsyncOpenAI, OpenAI
+
+from app.core.config import settings
+from app.core.logging_config import logger
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+
+class ConnectionStats:
+    """Counts outbound requests vs. newly opened TCP connections"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.per_host: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, host: str, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+            host_stats = self.per_host.setdefault(host, {"requests": 0, "new_connections": 0})
+            host_stats[field] += 1
+
+    def _trace_for(self, host: str):
+        def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                self._bump(host, "new_connections")
+        return trace
+
+    def _async_trace_for(self, host: str):
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                self._bump(host, "new_connections")
+        return trace
+
+    def on_request(self, request: httpx.Request):
+        host = request.url.host
+        self._bump(host, "requests")
+        request.extensions["trace"] = self._trace_for(host)
+
+    async def on_async_request(self, request: httpx.Request):
+        host = request.url.host
+        self._bump(host, "requests")
+        request.extensions["trace"] = self._async_trace_for(host)
+
+    @staticmethod
+    def _reuse_rate(requests: int, new_connections: int) -> float:
+        return round(1 - new_connections / requests, 4) if requests else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reuse_rate": self._reuse_rate(self.requests, self.new_connections),
+                "hosts": {
+                    host: {**s, "reuse_rate": self._reuse_rate(s["requests"], s["new_connections"])}
+                    for host, s in self.per_host.items()
+                },
+            }
+
+
+class TavilyClient:
+    """
+    Minimal Tavily REST client on top of the shared sync HTTP pool.
+    HTTP errors (401, 429, 5xx) and network errors are raised, never turned into
+    "no results", so callers fall back and the search cache doesn't store them.
+    """
+
+    def __init__(self, api_key: str, http_client: httpx.Client):
+        self.api_key = api_key
+        self.base_url = TAVILY_SEARCH_URL
+        self._http = http_client
+
+    def search(self, query: str, max_results: int = 5):
+        payload = {"query": query, "api_key": self.api_key, "max_results": max_results}
+        response = self._http.post(self.base_url, json=payload)
+        response.raise_for_status()
+        return response.json().get("results", [])
+
+
+class AsyncTavilyClient:
+    """Async counterpart of TavilyClient on the shared async HTTP pool (errors are raised too)"""
+
+    def __init__(self, api_key: str, http_client: httpx.AsyncClient):
+        self.api_key = api_key
+        self.base_url = TAVILY_SEARCH_URL
+        self._http = http_client
+
+    async def search(self, query: str, max_results: int = 5):
+        payload = {"query": query, "api_key": self.api_key, "max_results": max_results}
+        response = await self._http.post(self.base_url, json=payload)
+        response.raise_for_status()
+        return response.json().get("results", [])
+
+
+class ClientRegistry:
+    """Creates each provider client once per process and hands out the same instance"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Hashable, object] = {}
+        self.connection_stats = ConnectionStats()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], object]):
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = factory()
+                    self._clients[key] = client
+                    logger.info("[Clients] Created %s client", key[0] if isinstance(key, tuple) else key)
+        return client
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    # ---------- shared HTTP pools ----------
+
+    @property
+    def http_client(self) -> httpx.Client:
+        return self.get_or_create("http", lambda: httpx.Client(
+            limits=self._limits(),
+            timeout=settings.HTTP_TIMEOUT,
+            event_hooks={"request": [self.connection_stats.on_request]},
+        ))
+
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        return self.get_or_create("async_http", lambda: httpx.AsyncClient(
+            limits=self._limits(),
+            timeout=settings.HTTP_TIMEOUT,
+            event_hooks={"request": [self.connection_stats.on_async_request]},
+        ))
+
+    # ---------- provider clients ----------
+
+    def openai(self, api_key: str) -> OpenAI:
+        return self.get_or_create(("openai", api_key), lambda: OpenAI(api_key=api_key, http_client=self.http_client))
+
+    def async_openai(self, api_key: str) -> AsyncOpenAI:
+        return self.get_or_create(
+            ("async_openai", api_key), lambda: AsyncOpenAI(api_key=api_key, http_client=self.async_http_client)
+        )
+
+    def groq(self, api_key: str) -> Groq:
+        return self.get_or_create(("groq", api_key), lambda: Groq(api_key=api_key, http_client=self.http_client))
+
+    def async_groq(self, api_key: str) -> AsyncGroq:
+        return self.get_or_create(
+            ("async_groq", api_key), lambda: AsyncGroq(api_key=api_key, http_client=self.async_http_client)
+        )
+
+    def tavily(self, api_key: str) -> TavilyClient:
+        return self.get_or_create(("tavily", api_key), lambda: TavilyClient(api_key, self.http_client))
+
+    def async_tavily(self, api_key: str) -> AsyncTavilyClient:
+        return self.get_or_create(("async_tavily", api_key), lambda: AsyncTavilyClient(api_key, self.async_http_client))
+
+    # ---------- stats / shutdown ----------
+
+    def stats(self) -> dict:
+        return {
+            "clients": sorted(k[0] if isinstance(k, tuple) else k for k in self._clients),
+            "connections": self.connection_stats.snapshot(),
+        }
+
+    async def aclose(self):
+        """Close the shared HTTP pools (call on app shutdown)"""
+        async_http = self._clients.get("async_http")
+        if async_http is not None:
+            await async_http.aclose()
+        http = self._clients.get("http")
+        if http is not None:
+            http.close()
+        self._clients.clear()
+
+
+client_registry = ClientRegistry()
@@ -1,6 +1,3 @@
-from openai import OpenAI
-from groq import Groq
-import requests
 from pydantic_settings import BaseSettings
 
 
@@ -15,6 +12,14 @@ class Settings(BaseSettings):
     DB_PORT: int
     DB_NAME: str
 
+    # Connection pool (per engine, per uvicorn worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+
     # AWS
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
@@ -28,41 +33,171 @@ class Settings(BaseSettings):
     GROQ_MODEL: str
     TAVILY_API_KEY: str
 
+    # Logging (see app/core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_MODULE_LEVELS: str = ""
+
     # Bot Info
     BOT_NAME: str
     CREATOR_NAME: str
 
-    # Clients
+    # Chat history window (limits what gets replayed into the prompt)
+    CHAT_HISTORY_MAX_TURNS: int = 20
+    CHAT_HISTORY_MAX_TOKENS: int = 2000
+
+    # /ai-memory/chat conversation store (per session; backend: memory)
+    CONVERSATION_STORE_BACKEND: str = "memory"
+    CONVERSATION_MAX_TURNS: int = 20
+    CONVERSATION_MAX_SESSIONS: int = 10000
+    CONVERSATION_IDLE_TTL: int = 3600
+    CONVERSATION_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Concurrent retrieval stage (per-source timeouts in seconds)
+    RETRIEVAL_HISTORY_TIMEOUT: float = 2.0
+    RETRIEVAL_VECTOR_TIMEOUT: float = 3.0
+    RETRIEVAL_SEARCH_TIMEOUT: float = 6.0
+
+    # Write-behind persistence for chat turns (off = save synchronously per request)
+    CHAT_WRITE_BEHIND_ENABLED: bool = False
+    CHAT_WRITE_BEHIND_BATCH_SIZE: int = 50
+    CHAT_WRITE_BEHIND_FLUSH_INTERVAL: float = 0.5
+    CHAT_WRITE_BEHIND_MAX_QUEUE: int = 5000
+    CHAT_WRITE_BEHIND_RETRIES: int = 3
+    CHAT_WRITE_BEHIND_DEAD_LETTER_MAX: int = 10000
+
+    # User lookup cache (LRU + TTL; invalidation backend: local | postgres)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_INVALIDATION_BACKEND: str = "local"
+
+    # Long-term memory access tracking (buffered last_used_at touches)
+    MEMORY_ACCESS_BUFFER_ENABLED: bool = True
+    MEMORY_ACCESS_FLUSH_INTERVAL: float = 5.0
+    MEMORY_ACCESS_FLUSH_SIZE: int = 500
+
+    # Long-term memory similarity retrieval
+    MEMORY_RETRIEVAL_TOP_K: int = 6
+    MEMORY_RETRIEVAL_RECENT: int = 4
+    MEMORY_RETRIEVAL_MIN_SCORE: float = 0.25
+    MEMORY_INDEX_MAX_USERS: int = 1000
+    MEMORY_INDEX_TTL: float = 300.0  # seconds before a user's matrix is reloaded (writes from other workers)
+
+    # Long-term memory stats from the incrementally maintained chat_long_memory_stats table
+    # (turning it on for existing data: run the migration, or rebuild_memory_stats)
+    MEMORY_STATS_SUMMARY_ENABLED: bool = False
+
+    # Background consolidation of raw chat turns into summary memories
+    MEMORY_CONSOLIDATION_ENABLED: bool = False
+    MEMORY_CONSOLIDATION_INTERVAL: float = 600.0
+    MEMORY_CONSOLIDATION_MIN_AGE_HOURS: float = 24.0
+    MEMORY_CONSOLIDATION_MIN_TURNS: int = 10
+    MEMORY_CONSOLIDATION_BATCH_TURNS: int = 40
+    MEMORY_CONSOLIDATION_MAX_BATCHES_PER_USER: int = 5
+    MEMORY_CONSOLIDATION_USERS_PER_RUN: int = 50
+    MEMORY_CONSOLIDATION_CONCURRENCY: int = 4
+    MEMORY_CONSOLIDATION_ARCHIVE: bool = False
+    MEMORY_CONSOLIDATION_MODEL: str = ""
+
+    # Document ingestion into the Chroma stores
+    INGEST_CHUNK_SIZE: int = 1000
+    INGEST_CHUNK_OVERLAP: int = 150
+    INGEST_EMBED_BATCH_SIZE: int = 64
+    INGEST_EMBED_CONCURRENCY: int = 4
+
+    # LLM router for /ai/generate (model_type=auto: fastest healthy provider, optional hedging)
+    LLM_ROUTER_WINDOW: int = 100
+    LLM_ROUTER_MIN_SAMPLES: int = 5
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.5
+    LLM_ROUTER_FAILURE_THRESHOLD: int = 3
+    LLM_ROUTER_COOLDOWN: float = 30.0
+    LLM_ROUTER_HEDGE_ENABLED: bool = False
+    LLM_ROUTER_HEDGE_DELAY: float = 2.0
+    LLM_ROUTER_HEDGE_MIN_DELAY: float = 0.25
+
+    # /ai/generate/batch (concurrent prompts; 429s pause the whole batch and are retried)
+    AI_BATCH_MAX_PROMPTS: int = 1000
+    AI_BATCH_CONCURRENCY: int = 8
+    AI_BATCH_MAX_CONCURRENCY: int = 32
+    AI_BATCH_MAX_RETRIES: int = 4
+    AI_BATCH_BACKOFF: float = 1.0
+    AI_BATCH_MAX_BACKOFF: float = 30.0
+
+    # Request tracing: per-stage latency histograms + token/error counters on /metrics
+    TRACING_ENABLED: bool = True
+    TRACING_SLOW_REQUEST_SECONDS: float = 5.0
+
+    # Startup (FastAPI lifespan): create tables, warm Chroma/LLM/search clients in the background
+    STARTUP_CREATE_TABLES: bool = True
+    STARTUP_WARM_UP: bool = True
+
+    # Embedding cache (memory LRU + sqlite file; empty path = memory only)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 20000
+    EMBEDDING_CACHE_PATH: str = "app/db/embedding_cache.sqlite3"
+
+    # Semantic response cache (exact + embedding-similarity answer reuse)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 2000
+    SEMANTIC_CACHE_SIMILARITY: float = 0.95
+    SEMANTIC_CACHE_TTL: int = 3600
+    SEMANTIC_CACHE_PERSONAL_TTL: int = 600
+    SEMANTIC_CACHE_REALTIME_TTL: int = 300
+
+    # Tavily search result cache (TTL in seconds per query category)
+    SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    SEARCH_CACHE_TTL_SPORTS: int = 30
+    SEARCH_CACHE_TTL_FINANCE: int = 60
+    SEARCH_CACHE_TTL_NEWS: int = 300
+    SEARCH_CACHE_TTL_WEATHER: int = 900
+    SEARCH_CACHE_TTL_DEFAULT: int = 600
+
+    # Shared outbound HTTP pool (OpenAI / Groq / Tavily)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 60.0
+
+    # Clients (process-wide singletons, see app/core/client_registry.py)
     @property
     def openai_client(self):
-        return OpenAI(api_key=self.OPENAI_API_KEY)
+        from app.core.client_registry import client_registry
+        return client_registry.openai(self.OPENAI_API_KEY)
+
+    @property
+    def async_openai_client(self):
+        from app.core.client_registry import client_registry
+        return client_registry.async_openai(self.OPENAI_API_KEY)
 
     @property
     def groq_client(self):
-        return Groq(api_key=self.GROQ_API_KEY)
+        from app.core.client_registry import client_registry
+        return client_registry.groq(self.GROQ_API_KEY)
+
+    @property
+    def async_groq_client(self):
+        from app.core.client_registry import client_registry
+        return client_registry.async_groq(self.GROQ_API_KEY)
 
     @property
     def tavily_client(self):
-        class TavilyClient:
-            def __init__(self, api_key: str):
-                self.api_key = api_key
-                self.base_url = "https://api.tavily.com/search"
-
-            def search(self, query: str):
-                payload = {"query": query, "api_key": self.api_key}
-                try:
-                    response = requests.post(self.base_url, json=payload)
-                    return response.json().get("results", [])
-                except Exception as e:
-                    print(f"❌ Tavily client error: {e}")
-                    return []
-
-        return TavilyClient(api_key=self.TAVILY_API_KEY)
+        from app.core.client_registry import client_registry
+        return client_registry.tavily(self.TAVILY_API_KEY)
+
+    @property
+    def async_tavily_client(self):
+        from app.core.client_registry import client_registry
+        return client_registry.async_tavily(self.TAVILY_API_KEY)
 
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,196 @@
+"""
+Conversation Store
+Per-session (question, answer) history for /ai-memory/chat, replacing the single
+module-level list every caller used to share.
+
+Bounds (all settings):
+    CONVERSATION_MAX_TURNS     newest turns kept per session
+    CONVERSATION_IDLE_TTL      sessions untouched this long (seconds) are dropped
+    CONVERSATION_MAX_SESSIONS  least recently used sessions are evicted past this
+    CONVERSATION_MAX_BYTES     ceiling on the UTF-8 size of all stored text
+
+Backends (CONVERSATION_STORE_BACKEND):
+    memory    in-process (per worker); the only one so far. A shared backend
+              (e.g. Redis) implements ConversationBackend so workers can share it.
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Deque, List, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Turn = Tuple[str, str]
+
+
+def turn_size(question: str, answer: str) -> int:
+    return len(question.encode("utf-8")) + len(answer.encode("utf-8"))
+
+
+class ConversationBackend(ABC):
+    """Storage for session histories; implementations enforce the bounds themselves"""
+
+    @abstractmethod
+    def history(self, session_id: str) -> List[Turn]:
+        ...
+
+    @abstractmethod
+    def append(self, session_id: str, question: str, answer: str):
+        ...
+
+    @abstractmethod
+    def clear(self, session_id: str) -> bool:
+        ...
+
+    def snapshot(self) -> dict:
+        return {}
+
+
+class _Session:
+    __slots__ = ("turns", "size", "last_used")
+
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Turn] = deque(maxlen=max_turns)
+        self.size = 0
+        self.last_used = time.monotonic()
+
+
+class MemoryConversationBackend(ConversationBackend):
+    """Thread-safe LRU of sessions, each a capped deque of turns"""
+
+    def __init__(self, max_turns: int = None, max_sessions: int = None, idle_ttl: int = None,
+                 max_bytes: int = None):
+        self.max_turns = max_turns or settings.CONVERSATION_MAX_TURNS
+        self.max_sessions = max_sessions or settings.CONVERSATION_MAX_SESSIONS
+        self.idle_ttl = idle_ttl or settings.CONVERSATION_IDLE_TTL
+        self.max_bytes = max_bytes or settings.CONVERSATION_MAX_BYTES
+        # Least recently used first, so idle sessions are always at the front
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.stats = {"appended": 0, "turns_dropped": 0, "expired": 0, "evicted": 0}
+
+    def _expire(self, now: float):
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_used < self.idle_ttl:
+                break
+            self._drop(session_id)
+            self.stats["expired"] += 1
+
+    def _drop(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self._bytes -= session.size
+        return session
+
+    def history(self, session_id: str) -> List[Turn]:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return list(session.turns)
+
+    def append(self, session_id: str, question: str, answer: str):
+        size = turn_size(question, answer)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(self.max_turns)
+            if len(session.turns) == session.turns.maxlen:
+                # deque drops the oldest turn on append; keep the byte count in step
+                dropped = turn_size(*session.turns[0])
+                session.size -= dropped
+                self._bytes -= dropped
+                self.stats["turns_dropped"] += 1
+            session.turns.append((question, answer))
+            session.size += size
+            session.last_used = now
+            self._bytes += size
+            self._sessions.move_to_end(session_id)
+            self.stats["appended"] += 1
+
+            while len(self._sessions) > self.max_sessions:
+                self._drop(next(iter(self._sessions)))
+                self.stats["evicted"] += 1
+            while self._bytes > self.max_bytes:
+                oldest_id = next(iter(self._sessions))
+                if oldest_id != session_id:
+                    self._drop(oldest_id)
+                    self.stats["evicted"] += 1
+                elif len(session.turns) > 1:
+                    # Only this session is left: shed its own oldest turns
+                    dropped = turn_size(*session.turns.popleft())
+                    session.size -= dropped
+                    self._bytes -= dropped
+                    self.stats["turns_dropped"] += 1
+                else:
+                    break
+
+    def clear(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._drop(session_id)
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "turns": sum(len(session.turns) for session in self._sessions.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_sessions": self.max_sessions,
+                "max_turns": self.max_turns,
+                **self.stats,
+            }
+
+
+class ConversationStore:
+    """Front for the configured backend; a failing backend degrades to an empty history"""
+
+    def __init__(self, backend: ConversationBackend):
+        self._backend = backend
+
+    def set_backend(self, backend: ConversationBackend):
+        """Swap the backend (e.g. a fresh MemoryConversationBackend in tests)"""
+        self._backend = backend
+
+    def history(self, session_id: str) -> List[Turn]:
+        try:
+            return self._backend.history(session_id)
+        except Exception as e:
+            logger.warning("⚠️ [CONVERSATIONS] History read failed for %s: %s", session_id, e)
+            return []
+
+    def append(self, session_id: str, question: str, answer: str):
+        try:
+            self._backend.append(session_id, question, answer)
+        except Exception as e:
+            logger.warning("⚠️ [CONVERSATIONS] Append failed for %s: %s", session_id, e)
+
+    def clear(self, session_id: str) -> bool:
+        return self._backend.clear(session_id)
+
+    def snapshot(self) -> dict:
+        return {"backend": type(self._backend).__name__, **self._backend.snapshot()}
+
+
+def _make_backend() -> ConversationBackend:
+    if settings.CONVERSATION_STORE_BACKEND != "memory":
+        logger.warning("⚠️ [CONVERSATIONS] Unknown backend %r, using memory",
+                       settings.CONVERSATION_STORE_BACKEND)
+    return MemoryConversationBackend()
+
+
+conversation_store = ConversationStore(_make_backend())
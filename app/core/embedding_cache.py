@@ -0,0 +1,229 @@
+"""
+Embedding Cache
+Content-hash keyed cache in front of OpenAIEmbeddings, so a text that was embedded
+once (a repeated question, a re-ingested chunk, a memory) never costs another
+network call.
+
+Two tiers:
+    memory  LRU of float32 vectors (EMBEDDING_CACHE_MAX_ENTRIES)
+    disk    sqlite file (EMBEDDING_CACHE_PATH, WAL mode, shared by all workers);
+            an empty path keeps the cache in memory only
+
+Keys are sha256(model + text), so switching the embedding model never serves a
+stale vector. Vectors are stored as float32 (~6 KB for 1536 dims).
+
+Use `cached_openai_embeddings()` wherever an OpenAIEmbeddings would be created;
+the result is a drop-in langchain Embeddings (Chroma, retrievers, aembed_*).
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.client_registry import client_registry
+from app.core.config import settings
+from app.core.logging_config import logger
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Thread-safe memory LRU backed by an optional sqlite table"""
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        self.max_entries = max_entries or settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._path = settings.EMBEDDING_CACHE_PATH if path is None else path
+        self._opened = False
+        self.stats = {
+            "lookups": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "disk_entries": 0, "disk_bytes": 0, "miss_seconds": 0.0, "embedded_texts": 0,
+        }
+
+    def _ensure_open(self):
+        """Open the sqlite tier on first use (call with the lock held)"""
+        if self._opened:
+            return
+        self._opened = True
+        if not self._path:
+            return
+        path = self._path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            count, size = db.execute("SELECT count(*), coalesce(sum(length(vector)), 0) FROM embeddings").fetchone()
+            self.stats["disk_entries"], self.stats["disk_bytes"] = count, size
+            self._db = db
+        except sqlite3.Error as e:
+            logger.warning("⚠️ [EMBED-CACHE] Disk tier unavailable (%s), memory only", e)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for whichever keys are known (memory first, then one disk query)"""
+        found = {}
+        with self._lock:
+            self._ensure_open()
+            self.stats["lookups"] += len(keys)
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.stats["memory_hits"] += len(found)
+            missing = [key for key in keys if key not in found]
+            if missing and self._db is not None:
+                try:
+                    placeholders = ",".join("?" * len(missing))
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", missing
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logger.warning("⚠️ [EMBED-CACHE] Disk read failed: %s", e)
+                    rows = []
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+                self.stats["disk_hits"] += len(rows)
+            self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray], seconds: float):
+        """Store freshly embedded vectors; `seconds` is what the API call took (for latency saved)"""
+        with self._lock:
+            self._ensure_open()
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            self.stats["miss_seconds"] += seconds
+            self.stats["embedded_texts"] += len(vectors)
+            if self._db is None or not vectors:
+                return
+            try:
+                before = self._db.total_changes
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                    [(key, vector.tobytes(), time.time()) for key, vector in vectors.items()]
+                )
+                self._db.commit()
+                added = self._db.total_changes - before
+                if added:
+                    self.stats["disk_entries"] += added
+                    self.stats["disk_bytes"] += added * next(iter(vectors.values())).nbytes
+            except sqlite3.Error as e:
+                logger.warning("⚠️ [EMBED-CACHE] Disk write failed: %s", e)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            per_text = self.stats["miss_seconds"] / self.stats["embedded_texts"] if self.stats["embedded_texts"] else 0.0
+            return {
+                "enabled": settings.EMBEDDING_CACHE_ENABLED,
+                "disk_tier": self._db is not None,
+                "memory_entries": len(self._memory),
+                "memory_bytes": sum(vector.nbytes for vector in self._memory.values()),
+                **{key: value for key, value in self.stats.items() if key != "miss_seconds"},
+                "hit_rate": round(hits / self.stats["lookups"], 4) if self.stats["lookups"] else 0.0,
+                "avg_miss_ms": round(per_text * 1000, 2),
+                # Every hit avoided roughly one average miss
+                "latency_saved_s": round(hits * per_text, 2),
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """langchain Embeddings that consults an EmbeddingCache before calling `underlying`"""
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache):
+        self.underlying = underlying
+        self.cache = cache
+        self.namespace = f"{underlying.model}:{underlying.dimensions or ''}"
+
+    def _keys(self, texts: Sequence[str]) -> List[str]:
+        return [cache_key(self.namespace, text) for text in texts]
+
+    @staticmethod
+    def _unique_misses(texts, keys, found) -> Dict[str, str]:
+        return {key: text for key, text in zip(keys, texts) if key not in found}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = self._keys(texts)
+        found = self.cache.get_many(keys)
+        misses = self._unique_misses(texts, keys, found)
+        if misses:
+            started = time.perf_counter()
+            vectors = self.underlying.embed_documents(list(misses.values()))
+            fresh = {key: np.asarray(v, dtype=np.float32) for key, v in zip(misses, vectors)}
+            self.cache.put_many(fresh, time.perf_counter() - started)
+            found.update(fresh)
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._keys([text])[0]
+        found = self.cache.get_many([key])
+        if key not in found:
+            started = time.perf_counter()
+            vector = np.asarray(self.underlying.embed_query(text), dtype=np.float32)
+            self.cache.put_many({key: vector}, time.perf_counter() - started)
+            return vector.tolist()
+        return found[key].tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = self._keys(texts)
+        found = await asyncio.to_thread(self.cache.get_many, keys)
+        misses = self._unique_misses(texts, keys, found)
+        if misses:
+            started = time.perf_counter()
+            vectors = await self.underlying.aembed_documents(list(misses.values()))
+            fresh = {key: np.asarray(v, dtype=np.float32) for key, v in zip(misses, vectors)}
+            await asyncio.to_thread(self.cache.put_many, fresh, time.perf_counter() - started)
+            found.update(fresh)
+        return [found[key].tolist() for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._keys([text])[0]
+        found = await asyncio.to_thread(self.cache.get_many, [key])
+        if key not in found:
+            started = time.perf_counter()
+            vector = np.asarray(await self.underlying.aembed_query(text), dtype=np.float32)
+            await asyncio.to_thread(self.cache.put_many, {key: vector}, time.perf_counter() - started)
+            return vector.tolist()
+        return found[key].tolist()
+
+
+embedding_cache = EmbeddingCache()
+
+
+def cached_openai_embeddings(**kwargs) -> Embeddings:
+    """OpenAIEmbeddings on the shared HTTP clients, behind the process-wide embedding cache"""
+    from langchain_openai import OpenAIEmbeddings
+
+    underlying = OpenAIEmbeddings(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=client_registry.http_client,
+        http_async_client=client_registry.async_http_client,
+        **kwargs
+    )
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return underlying
+    return CachedEmbeddings(underlying, embedding_cache)
@@ -0,0 +1,100 @@
+"""
+Intent Matching
+Keyword intent classification shared by the chat services and the search cache:
+is a question a direct date/time question, does it need a realtime search, and
+which topic (sports / finance / news / weather) does it belong to.
+
+All keyword tables are compiled into one regex at import time, so a question is
+classified in a single scan. Keywords only match whole words ("now" does not
+match "know", "rate" does not match "separate"); a trailing "s"/"es" is allowed
+so "prices" and "matches" still count.
+
+Regression corpus + timings: python -m benchmarks.intent_benchmark
+"""
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Tuple
+
+# (group, category, triggers realtime search on its own, keywords)
+# Alternatives are tried in this order at each position, so the direct date/time
+# phrases come first: "aaj ki date" is answered from the clock, not searched.
+INTENT_GROUPS: List[Tuple[str, str, bool, Tuple[str, ...]]] = [
+    ("date_time", "date_time", False, (
+        "aaj ki date", "today date", "aaj ka din", "current date", "kya tarikh",
+        "aaj kya date", "date kya hai", "time kya hai", "aaj ka time",
+    )),
+    ("temporal", "temporal", True, (
+        "latest", "current", "today", "now", "live", "trending", "recent",
+        "abhi", "aaj", "abhi ka", "kal ka",
+    )),
+    ("sports", "sports", True, ("ipl", "match", "score", "winner")),
+    ("sports_context", "sports", False, ("tournament", "cricket", "game", "wicket")),
+    ("finance", "finance", True, (
+        "price", "rate", "value", "gold", "silver", "bitcoin", "stock", "sensex", "bazar", "market",
+    )),
+    ("finance_context", "finance", False, ("usd", "crypto", "share", "nifty")),
+    ("news", "news", True, ("news", "update", "breaking")),
+    ("news_context", "news", False, ("headline",)),
+    ("weather", "weather", True, ("weather", "temperature")),
+    ("weather_context", "weather", False, ("climate", "rain", "humidity", "mausam")),
+    ("year", "year", True, ()),
+]
+
+TOPIC_CATEGORIES = ("sports", "finance", "news", "weather")
+
+_YEAR_PATTERN = r"20(?:2[3-9]|30)"
+_GROUP_CATEGORY = {group: category for group, category, _, _ in INTENT_GROUPS}
+_REALTIME_GROUPS = frozenset(group for group, _, realtime, _ in INTENT_GROUPS if realtime)
+
+
+def _alternation(keywords: Tuple[str, ...]) -> str:
+    # Longest first so "abhi ka" wins over "abhi"; spaces match any run of whitespace
+    ordered = sorted(keywords, key=len, reverse=True)
+    return "|".join(r"\s+".join(map(re.escape, keyword.split())) for keyword in ordered)
+
+
+def _compile() -> "re.Pattern":
+    parts = []
+    for group, _, _, keywords in INTENT_GROUPS:
+        body = _YEAR_PATTERN if group == "year" else f"(?:{_alternation(keywords)})(?:e?s)?"
+        parts.append(f"(?P<{group}>{body})")
+    return re.compile(r"\b(?:" + "|".join(parts) + r")\b")
+
+
+INTENT_PATTERN = _compile()
+
+
+class Intent(NamedTuple):
+    categories: FrozenSet[str]
+    realtime: bool
+
+    @property
+    def date_time(self) -> bool:
+        return "date_time" in self.categories
+
+    @property
+    def topic(self) -> str:
+        """First matching topic in TOPIC_CATEGORIES order, else default"""
+        for category in TOPIC_CATEGORIES:
+            if category in self.categories:
+                return category
+        return "default"
+
+
+@lru_cache(maxsize=None)
+def _intent_for(groups: FrozenSet[str]) -> Intent:
+    # Only a few hundred group combinations exist, so each Intent is built once
+    return Intent(
+        categories=frozenset(_GROUP_CATEGORY[group] for group in groups),
+        realtime=not groups.isdisjoint(_REALTIME_GROUPS),
+    )
+
+
+def detect_intent(text: str) -> Intent:
+    """Every intent category in `text`, in one pass of INTENT_PATTERN"""
+    return _intent_for(frozenset(match.lastgroup for match in INTENT_PATTERN.finditer(text.lower())))
+
+
+def detect_realtime_intent(question: str) -> bool:
+    """True for questions about live or recent data (prices, scores, news, weather, "today", ...)"""
+    return detect_intent(question).realtime
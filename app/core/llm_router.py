@@ -0,0 +1,352 @@
+"""
+LLM Router
+Picks the provider for /ai/generate from a rolling latency / error profile of
+each one, instead of the caller hard-coding "openai" or "groq".
+
+    model_type="openai" | "groq"   that provider only (its calls still update the profile)
+    model_type="auto"              fastest healthy provider (median latency over the
+                                   last LLM_ROUTER_WINDOW calls); providers with fewer
+                                   than LLM_ROUTER_MIN_SAMPLES calls are tried first
+                                   so every provider gets a profile
+
+A provider's breaker trips after LLM_ROUTER_FAILURE_THRESHOLD failures in a row,
+or once more than LLM_ROUTER_MAX_ERROR_RATE of its recent outcomes failed (judged
+only with at least LLM_ROUTER_MIN_SAMPLES outcomes, so one early error can't trip
+it). A tripped provider is unhealthy for LLM_ROUTER_COOLDOWN seconds, and is only
+used once every healthy one has failed. After that it is half-open: its outcome
+window starts over, the next call that succeeds closes the breaker and the next
+one that fails trips it again straight away.
+
+Hedging (LLM_ROUTER_HEDGE_ENABLED, or per call): when the chosen provider hasn't
+answered within its own p95 latency, the next provider is started too. The first
+answer wins and the other request is cancelled (which closes its HTTP stream).
+A provider that fails outright is failed over to the next one immediately.
+
+Rate limits (HTTP 429) are the exception: they say nothing about a provider's
+health and moving the load onto the next provider only gets that one limited
+too, so they are counted apart, never failed over, and raised to the caller
+(which owns the backoff, e.g. the batch's RateLimitGate).
+
+StubProvider stands in for the real APIs (latency/error profile of your choice),
+so routing and hedging can be exercised offline:
+    python -m benchmarks.llm_router_benchmark
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from app.core.config import settings
+from app.core.logging_config import logger
+from app.core.tracing import record_usage, span
+
+
+class Completion(NamedTuple):
+    text: str
+    provider: str
+    model: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+
+
+class ProviderError(Exception):
+    pass
+
+
+class ProviderRateLimited(ProviderError):
+    status_code = 429
+
+
+def is_rate_limited(error: Exception) -> bool:
+    # openai.RateLimitError / groq.RateLimitError both carry the HTTP status
+    return getattr(error, "status_code", None) == 429
+
+
+class ChatCompletionsProvider:
+    """An OpenAI-compatible chat.completions API (OpenAI, Groq) on its shared async client"""
+
+    def __init__(self, name: str, model: str, client_factory: Callable):
+        self.name = name
+        self.model = model
+        self._client_factory = client_factory
+
+    async def complete(self, prompt: str) -> Completion:
+        with span(f"llm.{self.name}"):
+            response = await self._client_factory().chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+            )
+        usage = getattr(response, "usage", None)
+        record_usage(self.model, usage)
+        return Completion(
+            text=response.choices[0].message.content,
+            provider=self.name,
+            model=self.model,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            total_tokens=usage.total_tokens if usage else None,
+        )
+
+
+class StubProvider:
+    """Offline stand-in: answers after `latency` +- `jitter` seconds, with optional slow calls, failures and 429s"""
+
+    def __init__(self, name: str, latency: float = 0.2, jitter: float = 0.05, error_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_latency: float = 2.0, rate_limit_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.name = name
+        self.model = f"stub-{name}"
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def complete(self, prompt: str) -> Completion:
+        self.calls += 1
+        slow = self._random.random() < self.slow_rate
+        delay = self.slow_latency if slow else max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self._random.random() < self.rate_limit_rate:
+            raise ProviderRateLimited(f"{self.name} stub rate limit")
+        if self._random.random() < self.error_rate:
+            raise ProviderError(f"{self.name} stub failure")
+        words = len(prompt.split())
+        return Completion(f"[{self.name}] {prompt[:40]}", self.name, self.model, words, 8, words + 8)
+
+
+class ProviderStats:
+    """Rolling window of one provider's call latencies and outcomes"""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.half_open = False
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.rate_limited = 0
+        self.trips = 0
+
+    def record_success(self, seconds: float):
+        self.calls += 1
+        self.latencies.append(seconds)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.half_open = False
+
+    def record_failure(self):
+        self.calls += 1
+        self.errors += 1
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if (
+            self.half_open
+            or self.consecutive_failures >= settings.LLM_ROUTER_FAILURE_THRESHOLD
+            or (len(self.outcomes) >= settings.LLM_ROUTER_MIN_SAMPLES
+                and self.error_rate > settings.LLM_ROUTER_MAX_ERROR_RATE)
+        ):
+            self.trip()
+
+    def record_rate_limited(self):
+        # Not an outcome: a 429 neither trips the breaker nor resets a failure streak
+        self.calls += 1
+        self.rate_limited += 1
+
+    def trip(self):
+        # The outcomes that tripped the breaker are spent: after the cooldown the
+        # provider is judged on fresh ones (half-open), so it can recover
+        self.cooldown_until = time.monotonic() + settings.LLM_ROUTER_COOLDOWN
+        self.outcomes.clear()
+        self.consecutive_failures = 0
+        self.half_open = True
+        self.trips += 1
+
+    def record_cancelled(self, seconds: float):
+        # A hedge loser took at least this long: keep it in the profile so its p95 doesn't look rosier
+        self.cancelled += 1
+        self.latencies.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def snapshot(self, now: float) -> dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "healthy": self.healthy(now),
+            "half_open": self.half_open and self.healthy(now),
+            "trips": self.trips,
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "rate_limited": self.rate_limited,
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "cooldown_s": round(max(0.0, self.cooldown_until - now), 1),
+        }
+
+
+class LLMRouter:
+    def __init__(self, providers: Sequence):
+        self.set_providers(providers)
+
+    def set_providers(self, providers: Sequence):
+        """Replace the providers (and forget their profiles), e.g. with StubProviders offline"""
+        self._providers = {provider.name: provider for provider in providers}
+        self._stats = {name: ProviderStats(settings.LLM_ROUTER_WINDOW) for name in self._providers}
+        self.counters = {
+            "requests": 0, "hedges": 0, "hedge_wins": 0, "failovers": 0, "rate_limited": 0, "failed": 0,
+        }
+
+    def check_model_type(self, model_type: str) -> str:
+        """Lower-cased model_type; ValueError unless it is "auto" or a provider name"""
+        model_type = model_type.lower()
+        if model_type != "auto" and model_type not in self._providers:
+            raise ValueError(f"Invalid model_type. Use {', '.join(repr(n) for n in self._providers)} or 'auto'.")
+        return model_type
+
+    def ranked(self) -> List[str]:
+        """Provider names in the order "auto" tries them"""
+        now = time.monotonic()
+
+        def score(name):
+            stats = self._stats[name]
+            if len(stats.latencies) < settings.LLM_ROUTER_MIN_SAMPLES:
+                return (0, len(stats.latencies), 0.0)  # still profiling: try these first
+            return (1, 0, stats.percentile(0.5))
+
+        healthy = sorted((n for n in self._providers if self._stats[n].healthy(now)), key=score)
+        unhealthy = sorted((n for n in self._providers if n not in healthy),
+                           key=lambda n: self._stats[n].cooldown_until)
+        return healthy + unhealthy
+
+    def hedge_delay(self, name: str) -> float:
+        stats = self._stats[name]
+        if len(stats.latencies) < settings.LLM_ROUTER_MIN_SAMPLES:
+            return settings.LLM_ROUTER_HEDGE_DELAY
+        return max(settings.LLM_ROUTER_HEDGE_MIN_DELAY, stats.percentile(0.95))
+
+    async def _call(self, name: str, prompt: str) -> Completion:
+        stats = self._stats[name]
+        started = time.perf_counter()
+        try:
+            result = await self._providers[name].complete(prompt)
+        except asyncio.CancelledError:
+            stats.record_cancelled(time.perf_counter() - started)
+            raise
+        except Exception as e:
+            if is_rate_limited(e):
+                stats.record_rate_limited()
+                logger.warning("⏳ [LLM-ROUTER] %s rate limited: %s", name, e)
+                raise
+            stats.record_failure()
+            logger.warning("⚠️ [LLM-ROUTER] %s failed: %s", name, e)
+            raise
+        stats.record_success(time.perf_counter() - started)
+        return result
+
+    async def complete(self, prompt: str, model_type: str = "auto", hedge: Optional[bool] = None) -> Completion:
+        """
+        Run `prompt` on the provider `model_type` names, or on the best one for "auto"
+
+        Raises:
+            ValueError: unknown model_type
+            Exception: a provider's rate-limit error (429) as soon as no call is left in
+                flight, else the last provider error when every candidate failed
+        """
+        model_type = self.check_model_type(model_type)
+        self.counters["requests"] += 1
+        if model_type != "auto":
+            return await self._call(model_type, prompt)
+
+        hedge = settings.LLM_ROUTER_HEDGE_ENABLED if hedge is None else hedge
+        candidates = self.ranked()
+        primary = candidates[0]
+        running: Dict[asyncio.Future, str] = {}
+        hedged = False
+        last_error: Optional[Exception] = None
+        rate_limited: Optional[Exception] = None
+
+        def launch():
+            name = candidates.pop(0)
+            running[asyncio.ensure_future(self._call(name, prompt))] = name
+
+        launch()
+        try:
+            while running:
+                # One hedge at most: only while the primary is the only call in flight
+                can_hedge = hedge and not hedged and not rate_limited and candidates and len(running) == 1
+                timeout = self.hedge_delay(next(iter(running.values()))) if can_hedge else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self.counters["hedges"] += 1
+                    launch()
+                    continue
+                for task in done:
+                    name = running.pop(task)
+                    if task.exception() is None:
+                        if name != primary:
+                            self.counters["hedge_wins" if hedged else "failovers"] += 1
+                        return task.result()
+                    last_error = task.exception()
+                    if is_rate_limited(last_error):
+                        rate_limited = last_error
+                if not running and candidates and not rate_limited:
+                    launch()
+            if rate_limited:
+                self.counters["rate_limited"] += 1
+                raise rate_limited
+            self.counters["failed"] += 1
+            raise last_error
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            "hedge_enabled": settings.LLM_ROUTER_HEDGE_ENABLED,
+            "ranking": self.ranked(),
+            **self.counters,
+            "providers": {
+                name: {"model": provider.model, **self._stats[name].snapshot(now)}
+                for name, provider in self._providers.items()
+            },
+        }
+
+
+def default_providers() -> list:
+    # Clients are looked up per call, so nothing is built at import
+    return [
+        ChatCompletionsProvider("openai", settings.OPENAI_MODEL, lambda: settings.async_openai_client),
+        ChatCompletionsProvider("groq", settings.GROQ_MODEL, lambda: settings.async_groq_client),
+    ]
+
+
+llm_router = LLMRouter(default_providers())
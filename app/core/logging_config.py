@@ -1,8 +1,94 @@
+"""
+Logging Configuration
+Structured (JSON or text) logging behind a non-blocking queue handler.
+
+Request threads only enqueue records; a background QueueListener thread does the
+formatting (message interpolation, JSON, tracebacks) and stdout I/O. Records
+cross threads as they are, so don't mutate an object after passing it as a log
+argument. Levels are gated per module, so disabled debug calls
+cost a level check and nothing else (use %-style args, not f-strings, so the
+message isn't even built when the level is off).
+
+Settings:
+    LOG_LEVEL          root level, e.g. INFO
+    LOG_FORMAT         "json" or "text"
+    LOG_MODULE_LEVELS  per-logger overrides, e.g.
+                       "app.services.chat_memory_service=DEBUG,sqlalchemy.engine=WARNING"
+"""
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import sys
+
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is emitted as a field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, any `extra=` fields, exc_info"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener's handler"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() calls self.format() - in the caller's thread, i.e. on
+        # the event loop - and replaces msg/args with the result; keep them instead
+        return record
+
+
+def _parse_module_levels(spec: str) -> dict:
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Install the queue handler on the root logger and start the writer thread"""
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT.lower() == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name, level in _parse_module_levels(settings.LOG_MODULE_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+_listener = setup_logging()
 logger = logging.getLogger(__name__)
@@ -1,4 +1,5 @@
 from app.core.config import settings
+from app.core.tracing import record_usage, span, traced_stream
 
 def get_ai_response(messages: list, model: str = None):
     """
@@ -7,9 +8,44 @@ def get_ai_response(messages: list, model: str = None):
     client = settings.openai_client
     model = model or settings.OPENAI_MODEL
 
-    completion = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0.7
-    )
+    with span("llm"):
+        completion = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.7
+        )
+    record_usage(model, getattr(completion, "usage", None))
     return completion.choices[0].message.content
+
+
+async def stream_ai_response(messages: list, model: str = None):
+    """
+    Async generator over the content deltas of a streamed chat completion.
+    The HTTP stream is closed as soon as the consumer stops iterating.
+    """
+    client = settings.async_openai_client
+    model = model or settings.OPENAI_MODEL
+
+    async def deltas():
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.7,
+            stream=True,
+            # Final chunk carries the token usage (and no choices)
+            stream_options={"include_usage": True}
+        )
+        async with stream:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    record_usage(model, chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    # "llm.stream" counts the waits on the provider only, not the consumer's time per delta
+    timed = traced_stream("llm.stream", deltas())
+    try:
+        async for delta in timed:
+            yield delta
+    finally:
+        await timed.aclose()
@@ -0,0 +1,113 @@
+"""
+Lazy Resources
+Process-wide singletons for the heavy objects the services need (Chroma stores,
+LLM clients, search tools). Modules register a factory at import time - which costs
+nothing - and the object is built on first `.get()`.
+
+The app lifespan calls `resources.start_warm_up()` to build everything marked
+warm=True in parallel worker threads after the server has started, so imports
+(tests, CLIs, each uvicorn worker) stay fast and /health/ready reports when the
+warm-up is done. Without a warm-up (STARTUP_WARM_UP off) every resource is built on
+first use and there is nothing to wait for; a resource whose warm-up failed is
+reported and retried on its next `.get()`, not waited on.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+
+from app.core.logging_config import logger
+
+T = TypeVar("T")
+
+
+class LazyResource(Generic[T]):
+    """Built once, on first use, by `factory` (thread-safe)"""
+
+    def __init__(self, name: str, factory: Callable[[], T], warm: bool = True):
+        self.name = name
+        self.warm = warm
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._ready = False
+        self.init_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def get(self) -> T:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    started = time.perf_counter()
+                    try:
+                        self._value = self._factory()
+                    except Exception as e:
+                        self.error = str(e)
+                        logger.error("❌ [RESOURCES] %s failed to initialize: %s", self.name, e)
+                        raise
+                    self.init_seconds = time.perf_counter() - started
+                    self.error = None
+                    self._ready = True
+                    logger.info("✅ [RESOURCES] %s ready in %.2fs", self.name, self.init_seconds)
+        return self._value
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self._ready,
+            "warm": self.warm,
+            "init_seconds": round(self.init_seconds, 3) if self.init_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+class ResourceRegistry:
+    """Named LazyResources plus a parallel warm-up"""
+
+    def __init__(self):
+        self._resources: Dict[str, LazyResource] = {}
+        self.warm_up_seconds: Optional[float] = None
+        self.warm_up_started = False
+        self.warming = False
+
+    def register(self, name: str, factory: Callable[[], T], warm: bool = True) -> LazyResource[T]:
+        resource = LazyResource(name, factory, warm)
+        self._resources[name] = resource
+        return resource
+
+    def start_warm_up(self) -> asyncio.Future:
+        """Schedule warm_up(); readiness waits for it from this call on"""
+        self.warm_up_started = self.warming = True
+        return asyncio.ensure_future(self.warm_up())
+
+    async def warm_up(self) -> Dict[str, dict]:
+        """Build every warm resource concurrently; failures are logged, not raised"""
+        self.warm_up_started = self.warming = True
+        started = time.perf_counter()
+        pending = [r for r in self._resources.values() if r.warm and not r.ready]
+        try:
+            await asyncio.gather(*(asyncio.to_thread(r.get) for r in pending), return_exceptions=True)
+        finally:
+            self.warming = False
+            self.warm_up_seconds = time.perf_counter() - started
+        logger.info("🔥 [RESOURCES] Warmed %s resources in %.2fs", len(pending), self.warm_up_seconds)
+        return self.snapshot()
+
+    @property
+    def ready(self) -> bool:
+        """No warm-up in progress: it finished (see `failed`) or none was started"""
+        return not self.warming
+
+    @property
+    def failed(self) -> List[str]:
+        """Warm resources whose last build attempt raised"""
+        return sorted(name for name, r in self._resources.items() if r.warm and not r.ready and r.error)
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: r.snapshot() for name, r in sorted(self._resources.items())}
+
+
+resources = ResourceRegistry()
@@ -0,0 +1,160 @@
+"""
+Realtime Search Cache
+TTL cache for Tavily results keyed by the normalised query, with per-category
+TTLs (finance / sports / weather / news) and single-flight request coalescing:
+concurrent identical lookups share one outbound search.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Tuple
+
+from app.core.config import settings
+from app.core.intent import detect_intent
+from app.core.semantic_cache import normalize_question
+
+
+def categorize_query(query: str) -> str:
+    # The first matching topic (shortest-lived data first) sets the TTL
+    return detect_intent(query).topic
+
+
+def ttl_for_category(category: str) -> int:
+    return {
+        "sports": settings.SEARCH_CACHE_TTL_SPORTS,
+        "finance": settings.SEARCH_CACHE_TTL_FINANCE,
+        "news": settings.SEARCH_CACHE_TTL_NEWS,
+        "weather": settings.SEARCH_CACHE_TTL_WEATHER,
+    }.get(category, settings.SEARCH_CACHE_TTL_DEFAULT)
+
+
+class _InFlight:
+    """A sync lookup other threads can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SearchCache:
+    """Process-wide TTL + LRU cache with single-flight for sync and async callers"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or settings.SEARCH_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Tuple[float, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._inflight_async: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "fetches": 0, "errors": 0}
+
+    @staticmethod
+    def _key(query: str, max_results: int) -> str:
+        return f"{max_results}|{normalize_question(query)}"
+
+    def _get_fresh(self, key: str):
+        """Cached results or None (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    def _store(self, key: str, query: str, results: list):
+        # Empty results usually mean the search failed -> don't pin them for a whole TTL
+        if not results:
+            return
+        expires_at = time.monotonic() + ttl_for_category(categorize_query(query))
+        with self._lock:
+            self._entries[key] = (expires_at, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, query: str, fetch: Callable[..., list], max_results: int = 5) -> list:
+        """Sync lookup; `fetch(query, max_results=...)` runs at most once per key at a time"""
+        key = self._key(query, max_results)
+        with self._lock:
+            results = self._get_fresh(key)
+            if results is not None:
+                self.stats["hits"] += 1
+                return results
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+                self.stats["misses"] += 1
+                self.stats["fetches"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch(query, max_results=max_results)
+            self._store(key, query, call.result)
+            return call.result
+        except Exception as e:
+            call.error = e
+            self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    async def aget_or_fetch(
+        self, query: str, fetch: Callable[..., Awaitable[list]], max_results: int = 5
+    ) -> list:
+        """Async lookup; concurrent callers for the same key await one shared task"""
+        key = self._key(query, max_results)
+        with self._lock:
+            results = self._get_fresh(key)
+            if results is not None:
+                self.stats["hits"] += 1
+                return results
+            task = self._inflight_async.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._afetch(key, query, fetch, max_results))
+                self._inflight_async[key] = task
+                self.stats["misses"] += 1
+                self.stats["fetches"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        # shield: one caller disconnecting must not cancel the search everyone else awaits
+        return await asyncio.shield(task)
+
+    async def _afetch(self, key: str, query: str, fetch, max_results: int) -> list:
+        try:
+            results = await fetch(query, max_results=max_results)
+            self._store(key, query, results)
+            return results
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight_async.pop(key, None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+            return {
+                "entries": len(self._entries),
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+search_cache = SearchCache()
@@ -0,0 +1,306 @@
+"""
+Semantic Response Cache
+Caches LLM answers keyed by the question: exact (normalised-hash) match first,
+then cosine similarity over question embeddings. Entries are either generic
+(shareable across users) or personalised (scoped to one user_id), expire by TTL
+and are evicted LRU once the cache is full.
+
+Realtime answers (REALTIME_SOURCES) are only served on an exact match: "gold
+price in Delhi" and "silver price in Delhi" embed almost identically, and
+replaying the wrong live answer is worse than a miss.
+
+Each scope keeps its question embeddings stacked in one matrix, so a similarity
+lookup is one matrix-vector product per scope, computed outside the lock.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return _WHITESPACE.sub(" ", question.lower()).strip().rstrip("?!. ")
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    scope: Optional[str]  # None = generic, otherwise the user_id it belongs to
+    response: dict
+    embedding: Optional[np.ndarray]
+    tokens: int
+    expires_at: float
+
+
+class _ScopeVectors:
+    """
+    Stacked unit embeddings of one scope's entries. Rows are append-only (removal
+    leaves a tombstone, growth and compaction build a new array), so a snapshot
+    of (keys, matrix) stays valid after the lock is released.
+    """
+
+    def __init__(self):
+        self.keys: List[Optional[str]] = []  # row -> entry key, None for a removed row
+        self.rows: Dict[str, int] = {}
+        self.matrix: Optional[np.ndarray] = None
+        self.size = 0
+
+    def add(self, key: str, vector: np.ndarray):
+        self.remove(key)
+        if self.matrix is not None and self.matrix.shape[1] != vector.shape[0]:
+            return  # a different embedding model; such an entry is only reachable exactly
+        if self.matrix is None or self.size == len(self.matrix):
+            self._resize(max(16, 2 * len(self.rows) + 1), vector.shape[0])
+        self.matrix[self.size] = vector
+        self.keys.append(key)
+        self.rows[key] = self.size
+        self.size += 1
+
+    def remove(self, key: str):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        self.keys[row] = None
+        if len(self.rows) < self.size // 2:
+            self._resize(max(16, 2 * len(self.rows)), self.matrix.shape[1])
+
+    def _resize(self, capacity: int, dims: int):
+        # Always a new array (live rows compacted to the front): snapshots keep the old one
+        live = [(key, row) for key, row in self.rows.items()]
+        live.sort(key=lambda item: item[1])
+        matrix = np.empty((max(capacity, len(live)), dims), dtype=np.float32)
+        if live:
+            matrix[:len(live)] = self.matrix[[row for _, row in live]]
+        self.matrix = matrix
+        self.keys = [key for key, _ in live]
+        self.rows = {key: index for index, (key, _) in enumerate(live)}
+        self.size = len(live)
+
+    def snapshot(self):
+        if not self.rows:
+            return None
+        return self.keys[:self.size], self.matrix[:self.size]
+
+
+@dataclass
+class CacheStats:
+    lookups: int = 0
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    saved_tokens: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> dict:
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / self.lookups, 4) if self.lookups else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SemanticCache:
+    """Thread-safe exact + embedding-similarity cache for chat answers"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = None,
+        similarity_threshold: float = None,
+    ):
+        self.name = name
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.similarity_threshold = similarity_threshold or settings.SEMANTIC_CACHE_SIMILARITY
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._vectors: Dict[Optional[str], _ScopeVectors] = {}
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    @staticmethod
+    def _key(question: str, scope: Optional[str]) -> str:
+        raw = f"{scope or '*'}|{normalize_question(question)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _scopes(user_id) -> List[Optional[str]]:
+        # Personalised answers win over generic ones for the same question
+        return [str(user_id), None] if user_id is not None else [None]
+
+    def _remove(self, key: str):
+        """Drop an entry and its embedding row (call with the lock held)"""
+        entry = self._entries.pop(key)
+        vectors = self._vectors.get(entry.scope)
+        if vectors is not None:
+            vectors.remove(key)
+            if not vectors.rows:
+                del self._vectors[entry.scope]
+
+    def _alive(self, entry: CacheEntry, now: float) -> bool:
+        if entry.expires_at > now:
+            return True
+        self._remove(entry.key)
+        self.stats.expirations += 1
+        return False
+
+    def _hit(self, entry: CacheEntry, kind: str) -> dict:
+        self._entries.move_to_end(entry.key)
+        if kind == "exact":
+            self.stats.exact_hits += 1
+        else:
+            self.stats.semantic_hits += 1
+        self.stats.saved_tokens += entry.tokens
+        return {**entry.response, "cache_hit": kind}
+
+    def get_exact(self, question: str, user_id=None) -> Optional[dict]:
+        """
+        Exact normalised-question lookup
+        Counts the lookup; on None callers fall through to get_similar,
+        which is where the miss is recorded.
+        """
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self.stats.lookups += 1
+            for scope in self._scopes(user_id):
+                entry = self._entries.get(self._key(question, scope))
+                if entry is not None and self._alive(entry, now):
+                    return self._hit(entry, "exact")
+        return None
+
+    def get_similar(self, embedding: List[float], user_id=None) -> Optional[dict]:
+        """Nearest cached question by cosine similarity, if above the threshold"""
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return None
+        query = _unit(embedding)
+        with self._lock:
+            snapshots = [
+                snapshot for snapshot in (
+                    self._vectors[scope].snapshot() for scope in self._scopes(user_id) if scope in self._vectors
+                ) if snapshot is not None
+            ]
+
+        # The matrix products run without the lock; rows of a snapshot are never rewritten
+        candidates = []
+        for keys, matrix in snapshots:
+            if matrix.shape[1] != query.shape[0]:
+                continue
+            scores = matrix @ query
+            for row in np.flatnonzero(scores >= self.similarity_threshold):
+                if keys[row] is not None:
+                    candidates.append((float(scores[row]), keys[row]))
+        candidates.sort(reverse=True)
+
+        now = time.monotonic()
+        with self._lock:
+            # Best first; entries evicted or expired since the snapshot are skipped
+            for _, key in candidates:
+                entry = self._entries.get(key)
+                if entry is not None and entry.embedding is not None and self._alive(entry, now):
+                    return self._hit(entry, "semantic")
+            self.stats.misses += 1
+        return None
+
+    def put(
+        self,
+        question: str,
+        response: dict,
+        embedding: Optional[List[float]] = None,
+        user_id=None,
+        ttl: int = None,
+        tokens: int = 0,
+        source_type: Optional[str] = None,
+    ):
+        """
+        Store an answer; pass user_id for personalised answers, None for generic ones.
+        Answers whose source_type is in REALTIME_SOURCES are only served on an exact match.
+        """
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return
+        scope = str(user_id) if user_id is not None else None
+        key = self._key(question, scope)
+        similar = embedding is not None and source_type not in REALTIME_SOURCES
+        entry = CacheEntry(
+            key=key,
+            scope=scope,
+            response=response,
+            embedding=_unit(embedding) if similar else None,
+            tokens=tokens,
+            expires_at=time.monotonic() + (ttl or settings.SEMANTIC_CACHE_TTL),
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            if entry.embedding is not None:
+                self._vectors.setdefault(scope, _ScopeVectors()).add(key, entry.embedding)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def invalidate_user(self, user_id):
+        """Drop every personalised entry for a user (e.g. after their history changes)"""
+        scope = str(user_id)
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.scope == scope]:
+                self._remove(key)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"name": self.name, "entries": len(self._entries), **self.stats.as_dict()}
+
+
+# Source types whose answers must never be replayed (clock answers, failures)
+UNCACHEABLE_SOURCES = {"system_time", "error"}
+REALTIME_SOURCES = {"tavily_search", "realtime"}
+
+
+def ttl_for(source_type: str, personalised: bool) -> Optional[int]:
+    """TTL in seconds for an answer, or None if it shouldn't be cached at all"""
+    if source_type in UNCACHEABLE_SOURCES:
+        return None
+    if source_type in REALTIME_SOURCES:
+        return settings.SEMANTIC_CACHE_REALTIME_TTL
+    if personalised:
+        return settings.SEMANTIC_CACHE_PERSONAL_TTL
+    return settings.SEMANTIC_CACHE_TTL
+
+
+def _unit(vector) -> np.ndarray:
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    return arr / norm if norm else arr
+
+
+_caches: Dict[str, SemanticCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(name: str) -> SemanticCache:
+    """Named, process-wide cache instance (one per chat endpoint / prompt)"""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = SemanticCache(name)
+        return _caches[name]
+
+
+def response_cache_stats() -> dict:
+    with _caches_lock:
+        return {name: cache.snapshot() for name, cache in _caches.items()}
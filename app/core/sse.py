@@ -0,0 +1,13 @@
+"""Server-Sent Events helpers"""
+import json
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # stop nginx from buffering the stream
+}
+
+
+def sse_event(event: str, data) -> str:
+    """Format one SSE frame (`event:` + single-line JSON `data:`)"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
@@ -1,8 +1,10 @@
 from app.core.config import settings
+from app.core.search_cache import search_cache
 
 def fetch_realtime_data(query: str):
     """
     Wrapper function to use Tavily client from config
+    (served from the shared search cache; identical concurrent queries share one search)
     """
     tavily = settings.tavily_client
-    return tavily.search(query)
+    return search_cache.get_or_fetch(query, tavily.search)
@@ -0,0 +1,65 @@
+"""
+Token Budget Helpers
+Token counting (tiktoken) and history trimming for prompt construction
+"""
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import tiktoken
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = None) -> int:
+    """Number of tokens `text` costs for the given (or default) OpenAI model"""
+    if not text:
+        return 0
+    return len(_get_encoding(model or settings.OPENAI_MODEL).encode(text))
+
+
+def trim_history_to_budget(turns: Sequence, max_tokens: int, model: str = None) -> Tuple[List, dict]:
+    """
+    Keep the newest chat turns that fit inside a token budget
+
+    Args:
+        turns: ChatMemory rows (anything with .question/.answer), oldest first
+        max_tokens: Token budget for the whole history
+        model: Model used for token counting
+
+    Returns:
+        (kept turns oldest first, stats dict)
+    """
+    kept = []
+    tokens_kept = 0
+    tokens_trimmed = 0
+    budget_hit = False
+
+    # Walk newest -> oldest so the most recent context survives; once a turn
+    # doesn't fit, everything older is dropped too (no gaps in the window)
+    for turn in reversed(turns):
+        cost = count_tokens(turn.question, model) + count_tokens(turn.answer, model)
+        if budget_hit or tokens_kept + cost > max_tokens:
+            budget_hit = True
+            tokens_trimmed += cost
+            continue
+        kept.append(turn)
+        tokens_kept += cost
+
+    kept.reverse()
+    stats = {
+        "turns_loaded": len(turns),
+        "turns_kept": len(kept),
+        "turns_trimmed": len(turns) - len(kept),
+        "tokens_kept": tokens_kept,
+        "tokens_trimmed": tokens_trimmed,
+        "token_budget": max_tokens,
+    }
+    return kept, stats
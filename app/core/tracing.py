@@ -0,0 +1,322 @@
+"""
+Request Tracing
+Per-stage latency for every request, exported as Prometheus metrics on /metrics.
+
+    TracingMiddleware     opens a trace per HTTP request (whole body, streams included)
+    request_trace(name)   the same for work outside HTTP (background jobs, CLIs)
+    span(stage)           times one stage of the current trace: `with span("tavily"): ...`
+    traced(stage)         decorator form of span, for sync and async functions
+    traced_stream(stage, source)
+                          times only the awaits on an async iterator (streamed LLM
+                          answers), not the consumer's time between items
+    record_tokens(...)    LLM prompt/completion token counters
+
+Spans feed the histograms whether or not a trace is open; a trace also collects
+its spans and logs the per-stage breakdown (at WARNING when the request took
+longer than TRACING_SLOW_REQUEST_SECONDS). Spans started in child tasks or
+worker threads (asyncio.gather / to_thread) land in the parent's trace, because
+both copy the context.
+
+Metrics are per worker process, like the other /metrics/* endpoints; the text
+format is rendered on scrape, recording is one lock + bisect per observation.
+"""
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging_config import logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2])
+                        for labels, series in sorted(self._series.items())]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labels, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUEST_SECONDS = metrics.histogram(
+    "app_request_duration_seconds", "Whole request (or background job) latency", ("route", "status")
+)
+STAGE_SECONDS = metrics.histogram(
+    "app_stage_duration_seconds", "Latency of one stage (history, vector, tavily, llm, db.*, ...)", ("stage",)
+)
+STAGE_ERRORS = metrics.counter(
+    "app_stage_errors_total", "Stages that raised, by exception type", ("stage", "error")
+)
+LLM_TOKENS = metrics.counter(
+    "app_llm_tokens_total", "LLM tokens by model and kind (prompt / completion)", ("model", "kind")
+)
+
+
+class Trace:
+    __slots__ = ("name", "started", "stages")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    def breakdown(self) -> str:
+        totals: Dict[str, float] = {}
+        for stage, seconds in self.stages:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return " ".join(f"{stage}={seconds:.3f}s" for stage, seconds in totals.items())
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class span:
+    """Times a stage of the current request; usable as `with span("llm"):` in sync or async code"""
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record_stage(self.stage, time.perf_counter() - self.started, exc_type)
+        return False
+
+
+def _record_stage(stage: str, elapsed: float, exc_type=None):
+    if not settings.TRACING_ENABLED:
+        return
+    STAGE_SECONDS.observe(elapsed, stage)
+    # Cancellation / client disconnects (BaseException) are not stage errors
+    if exc_type is not None and issubclass(exc_type, Exception):
+        STAGE_ERRORS.inc(stage, exc_type.__name__)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.stages.append((stage, elapsed))
+
+
+async def traced_stream(stage: str, source):
+    """
+    Re-yield the async iterable `source`, recording one `stage` observation when it
+    ends: the summed time spent awaiting its items. While this generator is suspended
+    at a yield the consumer runs (SSE writes, a slow client), and that time is left
+    out. Closing this generator closes `source`.
+    """
+    iterator = source.__aiter__()
+    elapsed = 0.0
+    exc_type = None
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                elapsed += time.perf_counter() - started
+                return
+            except BaseException as e:
+                elapsed += time.perf_counter() - started
+                exc_type = type(e)
+                raise
+            elapsed += time.perf_counter() - started
+            yield item
+    finally:
+        close = getattr(iterator, "aclose", None)
+        if close is not None:
+            await close()
+        _record_stage(stage, elapsed, exc_type)
+
+
+def traced(stage: str):
+    """Decorator: run the whole function inside span(stage)"""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _finish_trace(trace: Trace, status: str):
+    if not settings.TRACING_ENABLED:
+        return
+    elapsed = time.perf_counter() - trace.started
+    REQUEST_SECONDS.observe(elapsed, trace.name, status)
+    if elapsed >= settings.TRACING_SLOW_REQUEST_SECONDS:
+        logger.warning("🐢 [TRACE] %s %s in %.3fs: %s", trace.name, status, elapsed, trace.breakdown())
+    else:
+        logger.debug("⏱️ [TRACE] %s %s in %.3fs: %s", trace.name, status, elapsed, trace.breakdown())
+
+
+class request_trace:
+    """Opens a trace outside HTTP: `with request_trace("job consolidation"):`"""
+
+    __slots__ = ("trace", "token")
+
+    def __init__(self, name: str):
+        self.trace = Trace(name)
+
+    def __enter__(self) -> Trace:
+        self.token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_trace.reset(self.token)
+        _finish_trace(self.trace, "error" if exc_type is not None else "ok")
+        return False
+
+
+def record_tokens(model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+    if not settings.TRACING_ENABLED:
+        return
+    if prompt_tokens:
+        LLM_TOKENS.inc(model, "prompt", amount=prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.inc(model, "completion", amount=completion_tokens)
+
+
+def record_usage(model: str, usage):
+    """record_tokens from an OpenAI-style `usage` object (None is ignored)"""
+    if usage is not None:
+        record_tokens(model, getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
+
+
+class TracingMiddleware:
+    """ASGI middleware: one trace per HTTP request, labelled by method + route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope["method"])
+        status = {"code": "500"}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = str(message["status"])
+            await send(message)
+
+        token = _current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            # The router stores the matched route in the scope; the template keeps label cardinality low
+            route = scope.get("route")
+            trace.name = f"{scope['method']} {getattr(route, 'path', 'unmatched')}"
+            _finish_trace(trace, status["code"])
@@ -0,0 +1,209 @@
+"""
+Chat Memory Write-Behind
+Optional in-process queue for chat turns (CHAT_WRITE_BEHIND_ENABLED). Turns are
+acknowledged as soon as they're queued and flushed in batches - one user check and
+one multi-row INSERT per batch - when BATCH_SIZE turns are waiting or FLUSH_INTERVAL
+seconds have passed.
+
+Guarantees:
+- bounded queue: once MAX_QUEUE turns are waiting, enqueue() blocks (backpressure)
+- flush on shutdown: stop() drains everything still queued
+- read-your-writes: queued turns stay visible through pending_for() until committed
+- no silent loss: a batch that still fails after RETRIES attempts is dead-lettered
+  (kept in memory, still visible) and re-driven after the next successful flush and
+  on shutdown; turns are only discarded once DEAD_LETTER_MAX of them are waiting
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.db.models.chat_memory_model import ChatMemory
+from app.db.models.user_model import User
+from app.db.session import AsyncSessionLocal
+from app.schemas.chat_memory_schema import ChatMemoryCreate
+
+logger = logging.getLogger(__name__)
+
+
+class ChatMemoryWriter:
+    """Batches ChatMemory inserts off the request path"""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = None
+        self._task: asyncio.Task = None
+        self._pending: Dict[uuid.UUID, Dict[uuid.UUID, ChatMemory]] = defaultdict(dict)
+        self._dead_letter: deque = deque()
+        self.stats = {
+            "enqueued": 0, "flushed": 0, "batches": 0, "dropped": 0, "failed_batches": 0,
+            "dead_lettered": 0, "redriven": 0, "max_depth": 0,
+        }
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=settings.CHAT_WRITE_BEHIND_MAX_QUEUE)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def enqueue(self, chat: ChatMemoryCreate) -> ChatMemory:
+        """Queue a turn (waits while the queue is full) and return its not-yet-persisted row"""
+        self._ensure_started()
+        row = ChatMemory(
+            id=uuid.uuid4(),
+            user_id=chat.user_id,
+            question=chat.question,
+            answer=chat.answer,
+            created_at=datetime.now(timezone.utc),
+        )
+        self._pending[row.user_id][row.id] = row
+        try:
+            await self._queue.put(row)
+        except BaseException:
+            self._forget([row])
+            raise
+        self.stats["enqueued"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self._queue.qsize())
+        return row
+
+    def pending_for(self, user_id) -> List[ChatMemory]:
+        """Queued-but-unflushed turns for a user, oldest first"""
+        rows = self._pending.get(user_id)
+        return sorted(rows.values(), key=lambda r: r.created_at) if rows else []
+
+    def _forget(self, rows: List[ChatMemory]):
+        for row in rows:
+            user_rows = self._pending.get(row.user_id)
+            if user_rows is not None:
+                user_rows.pop(row.id, None)
+                if not user_rows:
+                    del self._pending[row.user_id]
+
+    async def _next_batch(self) -> List[ChatMemory]:
+        """Block for the first turn, then collect until the batch is full or the interval ends"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.CHAT_WRITE_BEHIND_FLUSH_INTERVAL
+        while len(batch) < settings.CHAT_WRITE_BEHIND_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[ChatMemory]) -> int:
+        """One INSERT attempt for a batch; returns the turns written (raises on DB errors)"""
+        async with AsyncSessionLocal() as db:
+            # One existence check for the whole batch instead of a SELECT per turn
+            user_ids = {row.user_id for row in batch}
+            result = await db.execute(select(User.id).where(User.id.in_(user_ids)))
+            known = set(result.scalars().all())
+            rows = [row for row in batch if row.user_id in known]
+            if len(rows) < len(batch):
+                # Users are checked before enqueue, so only users deleted since then land here
+                self.stats["dropped"] += len(batch) - len(rows)
+                logger.warning("⚠️ [WRITE-BEHIND] Dropped %s turns for deleted users", len(batch) - len(rows))
+            if rows:
+                # ON CONFLICT: a retry after a commit whose acknowledgement was lost is a no-op
+                stmt = pg_insert(ChatMemory).on_conflict_do_nothing(index_elements=[ChatMemory.id])
+                await db.execute(stmt, [
+                    {"id": r.id, "user_id": r.user_id, "question": r.question,
+                     "answer": r.answer, "created_at": r.created_at}
+                    for r in rows
+                ])
+                await db.commit()
+        self.stats["flushed"] += len(rows)
+        self.stats["batches"] += 1
+        self._forget(batch)
+        return len(rows)
+
+    async def _flush(self, batch: List[ChatMemory]):
+        for attempt in range(1, settings.CHAT_WRITE_BEHIND_RETRIES + 1):
+            try:
+                await self._write(batch)
+                break
+            except Exception as flush_error:
+                logger.error("❌ [WRITE-BEHIND] Flush attempt %s/%s failed: %s",
+                             attempt, settings.CHAT_WRITE_BEHIND_RETRIES, flush_error)
+                if attempt < settings.CHAT_WRITE_BEHIND_RETRIES:
+                    await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+        else:
+            self._park(batch)
+            return
+        await self._redrive()
+
+    def _park(self, batch: List[ChatMemory]):
+        """Dead-letter a batch that exhausted its retries; turns stay visible via pending_for()"""
+        self.stats["failed_batches"] += 1
+        self.stats["dead_lettered"] += len(batch)
+        self._dead_letter.extend(batch)
+        overflow = len(self._dead_letter) - settings.CHAT_WRITE_BEHIND_DEAD_LETTER_MAX
+        if overflow > 0:
+            lost = [self._dead_letter.popleft() for _ in range(overflow)]
+            self._forget(lost)
+            self.stats["dropped"] += overflow
+            logger.error("❌ [WRITE-BEHIND] Dead-letter full, discarded the %s oldest turns", overflow)
+        logger.error("❌ [WRITE-BEHIND] Dead-lettered a batch of %s turns (%s waiting)",
+                     len(batch), len(self._dead_letter))
+
+    async def _redrive(self):
+        """Retry dead-lettered turns, a batch at a time, until one fails (the DB is down again)"""
+        while self._dead_letter:
+            size = min(len(self._dead_letter), settings.CHAT_WRITE_BEHIND_BATCH_SIZE)
+            batch = [self._dead_letter[i] for i in range(size)]
+            try:
+                await self._write(batch)
+            except Exception as redrive_error:
+                logger.error("❌ [WRITE-BEHIND] Re-drive of %s dead-lettered turns failed: %s",
+                             len(self._dead_letter), redrive_error)
+                return
+            for _ in range(size):
+                self._dead_letter.popleft()
+            self.stats["redriven"] += size
+
+    async def stop(self):
+        """Flush everything still queued, then stop the writer (call on app shutdown)"""
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self._redrive()
+        if self._dead_letter:
+            logger.error("❌ [WRITE-BEHIND] Shutting down with %s unsaved turns: %s",
+                         len(self._dead_letter), [str(row.id) for row in self._dead_letter])
+        logger.info("💾 [WRITE-BEHIND] Drained, %s turns flushed in total", self.stats["flushed"])
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": settings.CHAT_WRITE_BEHIND_ENABLED,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "pending_users": len(self._pending),
+            "dead_letter_depth": len(self._dead_letter),
+            **self.stats,
+        }
+
+
+chat_memory_writer = ChatMemoryWriter()
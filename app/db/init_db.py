@@ -1,7 +1,11 @@
+from sqlalchemy import text
 from app.db.session import engine, Base
 from app.db.models import user_model
 
 def init_db():
     print("Creating tables if not exist...")
+    with engine.begin() as conn:
+        # Trigram index on chat_long_memory.content needs the extension first
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
     print("✅ Tables created successfully!")
@@ -0,0 +1,104 @@
+"""
+Memory Access Buffer
+Collects "this long-term memory was just used" events in memory and writes them
+as one bulk UPDATE (touch_memories) every MEMORY_ACCESS_FLUSH_INTERVAL seconds or
+once MEMORY_ACCESS_FLUSH_SIZE distinct memories are waiting, instead of a
+SELECT + UPDATE + COMMIT + REFRESH per memory on the read path.
+
+last_used_at therefore lags reads by up to one flush interval. Pending touches
+are flushed on shutdown.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.chat_long_memory_repository import touch_memories
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryAccessBuffer:
+    """Thread-safe id -> last access time map with a background flusher"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[UUID, datetime] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"recorded": 0, "flushes": 0, "rows_touched": 0, "errors": 0}
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True, name="memory-access-flusher")
+                    self._thread.start()
+
+    def record(self, db, memory_ids: Iterable[UUID]):
+        """
+        Note that memories were used. Buffered when MEMORY_ACCESS_BUFFER_ENABLED,
+        otherwise written right away with one bulk UPDATE on `db`.
+        """
+        now = datetime.now(timezone.utc)
+        accessed = {memory_id: now for memory_id in memory_ids}
+        if not accessed:
+            return
+        if not settings.MEMORY_ACCESS_BUFFER_ENABLED:
+            touch_memories(db, accessed)
+            return
+
+        self._ensure_started()
+        with self._lock:
+            self._pending.update(accessed)
+            self.stats["recorded"] += len(accessed)
+            full = len(self._pending) >= settings.MEMORY_ACCESS_FLUSH_SIZE
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(settings.MEMORY_ACCESS_FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every pending touch in one UPDATE; failed batches are merged back for the next round"""
+        with self._lock:
+            accessed, self._pending = self._pending, {}
+        if not accessed:
+            return 0
+        db = SessionLocal()
+        try:
+            touched = touch_memories(db, accessed)
+            self.stats["flushes"] += 1
+            self.stats["rows_touched"] += touched
+            return touched
+        except Exception as flush_error:
+            self.stats["errors"] += 1
+            logger.error("❌ [ACCESS-BUFFER] Flush of %s touches failed: %s", len(accessed), flush_error)
+            with self._lock:
+                for memory_id, used_at in accessed.items():
+                    self._pending[memory_id] = max(used_at, self._pending.get(memory_id, used_at))
+            return 0
+        finally:
+            db.close()
+
+    def stop(self):
+        """Stop the flusher and write whatever is still pending (call on app shutdown)"""
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"enabled": settings.MEMORY_ACCESS_BUFFER_ENABLED, "pending": len(self._pending), **self.stats}
+
+
+memory_access_buffer = MemoryAccessBuffer()
+atexit.register(memory_access_buffer.flush)
@@ -0,0 +1,196 @@
+"""
+Long-Term Memory Vector Index
+Embeddings for ChatLongMemory are stored as unit-normalised float32 bytes
+(`embedding_vector`, ~6 KB for 1536 dims vs ~30 KB as a JSON list). Similarity
+search goes through a per-user in-process index: the first query for a user loads
+only that user's (id, vector) pairs into one float32 matrix, later queries are a
+single matrix-vector product + partial sort, and writes update or drop the user's
+entry instead of rebuilding everything. Users are kept in an LRU so memory stays
+bounded (MEMORY_INDEX_MAX_USERS).
+
+The index is per worker: writes made through another worker only show up once
+the user's matrix is reloaded, which happens at the latest MEMORY_INDEX_TTL
+seconds after it was loaded. Loads run outside the global lock, one at a time per
+user; a load that an add() / invalidate() raced with answers its own search but
+is not cached.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def encode_embedding(embedding: Sequence[float]) -> bytes:
+    """Unit-normalised float32 bytes (cosine similarity becomes a dot product)"""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tobytes()
+
+
+def decode_embedding(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+
+class _UserIndex:
+    def __init__(self, ids: List[UUID], vectors: List[bytes]):
+        matrix = (
+            np.vstack([decode_embedding(v) for v in vectors]) if vectors else np.empty((0, 0), dtype=np.float32)
+        )
+        # (ids, matrix) is replaced as a whole, so a search without the lock always
+        # sees a matching pair
+        self.rows: Tuple[Tuple[UUID, ...], np.ndarray] = (tuple(ids), matrix)
+        self.loaded_at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return len(self.rows[0])
+
+    def add(self, memory_id: UUID, vector: bytes):
+        ids, matrix = self.rows
+        row = decode_embedding(vector)[np.newaxis, :]
+        self.rows = (ids + (memory_id,), row if matrix.size == 0 else np.vstack([matrix, row]))
+
+    def search(self, query: np.ndarray, k: int, min_score: float) -> List[Tuple[UUID, float]]:
+        ids, matrix = self.rows
+        if not ids or matrix.shape[1] != query.shape[0]:
+            return []
+        scores = matrix @ query
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top if scores[i] >= min_score]
+
+
+class _Load:
+    """One user's in-progress load: serialises loaders, and notes writes that race with them"""
+
+    __slots__ = ("lock", "waiters", "stale")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiters = 0
+        self.stale = False
+
+
+class MemoryVectorIndex:
+    """Thread-safe LRU of per-user vector matrices"""
+
+    def __init__(self, max_users: int = None, ttl: float = None):
+        self.max_users = max_users or settings.MEMORY_INDEX_MAX_USERS
+        self.ttl = ttl or settings.MEMORY_INDEX_TTL
+        self._users: "OrderedDict[str, _UserIndex]" = OrderedDict()
+        self._loading: Dict[str, _Load] = {}
+        self._lock = threading.Lock()
+        self.stats = {"searches": 0, "loads": 0, "stale_loads": 0, "expired": 0, "evictions": 0}
+
+    def _cached(self, key: str) -> Optional[_UserIndex]:
+        with self._lock:
+            index = self._users.get(key)
+            if index is None:
+                return None
+            if time.monotonic() - index.loaded_at >= self.ttl:
+                del self._users[key]
+                self.stats["expired"] += 1
+                return None
+            self._users.move_to_end(key)
+            return index
+
+    def _load(self, key: str, loader: Callable[[], List[Tuple[UUID, bytes]]]) -> _UserIndex:
+        with self._lock:
+            load = self._loading.get(key)
+            if load is None:
+                load = self._loading[key] = _Load()
+            load.waiters += 1
+        try:
+            with load.lock:
+                # A search that held the lock before us may have loaded the user already
+                index = self._cached(key)
+                if index is not None:
+                    return index
+                with self._lock:
+                    load.stale = False
+                rows = loader()
+                index = _UserIndex([r[0] for r in rows], [r[1] for r in rows])
+                with self._lock:
+                    if load.stale:
+                        self.stats["stale_loads"] += 1
+                    else:
+                        self._users[key] = index
+                        self.stats["loads"] += 1
+                        while len(self._users) > self.max_users:
+                            self._users.popitem(last=False)
+                            self.stats["evictions"] += 1
+                return index
+        finally:
+            with self._lock:
+                load.waiters -= 1
+                if load.waiters == 0:
+                    del self._loading[key]
+
+    def search(
+        self,
+        user_id,
+        query_embedding: Sequence[float],
+        k: int,
+        loader: Callable[[], List[Tuple[UUID, bytes]]],
+        min_score: float = 0.0,
+    ) -> List[Tuple[UUID, float]]:
+        """
+        Top-k (memory_id, cosine score) for one user, best first.
+        `loader` returns that user's (id, embedding_vector) rows; it only runs when
+        the user isn't indexed yet (or the matrix is older than MEMORY_INDEX_TTL).
+        """
+        key = str(user_id)
+        index = self._cached(key) or self._load(key, loader)
+        matches = index.search(decode_embedding(encode_embedding(query_embedding)), k, min_score)
+        with self._lock:
+            self.stats["searches"] += 1
+        return matches
+
+    def add(self, user_id, memory_id: UUID, vector: Optional[bytes]):
+        """Append a new memory to an already-loaded user (unloaded users load lazily)"""
+        if vector is None:
+            return
+        key = str(user_id)
+        with self._lock:
+            self._mark_stale(key)
+            index = self._users.get(key)
+            if index is not None:
+                index.add(memory_id, vector)
+
+    def invalidate(self, user_id):
+        """Forget a user's matrix (after updates/deletes); rebuilt on the next search"""
+        key = str(user_id)
+        with self._lock:
+            self._mark_stale(key)
+            self._users.pop(key, None)
+
+    def _mark_stale(self, key: str):
+        # Call with the lock held: a load in progress may have read the rows before this write
+        load = self._loading.get(key)
+        if load is not None:
+            load.stale = True
+
+    def clear(self):
+        with self._lock:
+            for load in self._loading.values():
+                load.stale = True
+            self._users.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "vectors": sum(index.size for index in self._users.values()),
+                "loading": len(self._loading),
+                "ttl": self.ttl,
+                **self.stats,
+            }
+
+
+memory_vector_index = MemoryVectorIndex()
@@ -25,11 +25,14 @@
 Chat Long-Term Memory Model
 Stores summarized conversation memories, facts, and reflections
 """
-from sqlalchemy import Column, String, Text, DateTime, Float, JSON, ForeignKey, func
+from sqlalchemy import Column, String, Text, DateTime, Float, JSON, ForeignKey, LargeBinary, Computed, Index, func
 from app.db.base_class import Base
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 import uuid
 
+# 'simple' = lowercase + split, no stemming/stopwords: content is mixed Hindi/English
+SEARCH_CONFIG = "simple"
+
 
 class ChatLongMemory(Base):
     """
@@ -74,11 +77,21 @@ class ChatLongMemory(Base):
         Text, 
         nullable=False
     )  # The actual memory content
+
+    content_tsv = Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', coalesce(content, ''))", persisted=True)
+    )  # Full-text search vector, maintained by Postgres (GIN-indexed)
     
     embedding = Column(
         JSON, 
         nullable=True
     )  # Optional: store vector embeddings if not using separate vector DB
+
+    embedding_vector = Column(
+        LargeBinary,
+        nullable=True
+    )  # Unit-normalised float32 bytes of the content embedding (see memory_vector_index)
     
     importance_score = Column(
         Float, 
@@ -105,5 +118,16 @@ class ChatLongMemory(Base):
         nullable=False
     )
 
+    __table_args__ = (
+        # Per-user, per-type, oldest-first scans (consolidation)
+        Index("ix_chat_long_memory_user_type_created", user_id, memory_type, created_at),
+        Index("ix_chat_long_memory_content_tsv", content_tsv, postgresql_using="gin"),
+        # Trigram index for substring (ILIKE) search; needs pg_trgm (created by the migration)
+        Index(
+            "ix_chat_long_memory_content_trgm", content,
+            postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}
+        ),
+    )
+
     def __repr__(self):
         return f"<ChatLongMemory(id={self.id}, user_id={self.user_id}, type={self.memory_type})>"
\ No newline at end of file
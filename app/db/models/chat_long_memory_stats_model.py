@@ -0,0 +1,45 @@
+from sqlalchemy import Column, String, DateTime, Float, Integer, ForeignKey
+from app.db.base_class import Base
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class ChatLongMemoryStats(Base):
+    """
+    Per-user, per-memory-type running totals for chat_long_memory
+
+    Kept up to date by the repository's create/update/delete functions in the same
+    transaction as the memory write, so memory stats are a lookup of a handful of
+    rows instead of an aggregate over every memory the user has.
+    """
+    __tablename__ = "chat_long_memory_stats"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        primary_key=True
+    )
+
+    memory_type = Column(
+        String(50),
+        primary_key=True
+    )
+
+    memory_count = Column(
+        Integer,
+        nullable=False,
+        default=0
+    )
+
+    importance_sum = Column(
+        Float,
+        nullable=False,
+        default=0.0
+    )  # average = importance_sum / memory_count
+
+    latest_created_at = Column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+
+    def __repr__(self):
+        return f"<ChatLongMemoryStats(user_id={self.user_id}, type={self.memory_type}, count={self.memory_count})>"
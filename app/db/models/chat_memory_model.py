@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Text, func, ForeignKey # type: ignore
+from sqlalchemy import Column, DateTime, Text, func, ForeignKey, Index # type: ignore
 from app.db.base_class import Base
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
@@ -11,3 +11,8 @@ class ChatMemory(Base):
     question = Column(Text, nullable=False)
     answer = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # History reads are always "latest N for a user" -> serve them from one index range scan
+        Index("ix_chat_memory_user_id_created_at", user_id, created_at.desc()),
+    )
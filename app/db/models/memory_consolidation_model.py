@@ -0,0 +1,46 @@
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, func
+from app.db.base_class import Base
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class MemoryConsolidationWatermark(Base):
+    """
+    How far raw chat turns ("note" memories) have been consolidated for a user
+
+    The consolidation worker only looks at turns created after
+    `consolidated_until`, so each run picks up where the last one stopped.
+    """
+    __tablename__ = "memory_consolidation_watermark"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        primary_key=True
+    )
+
+    consolidated_until = Column(
+        DateTime(timezone=True),
+        nullable=False
+    )  # created_at of the newest turn folded into a summary
+
+    turns_consolidated = Column(
+        Integer,
+        nullable=False,
+        default=0
+    )
+
+    summaries_created = Column(
+        Integer,
+        nullable=False,
+        default=0
+    )
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<MemoryConsolidationWatermark(user_id={self.user_id}, until={self.consolidated_until})>"
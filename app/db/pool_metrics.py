@@ -0,0 +1,133 @@
+"""
+Connection Pool Metrics
+Counters for SQLAlchemy pool checkouts, overflow, checkout wait time (blocked on the
+pool queue) and connect time (opening new connections), kept apart so a slow database
+handshake isn't mistaken for pool exhaustion
+"""
+import threading
+import time
+import weakref
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Thread-safe counters for one engine's connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.new_connections = 0
+        self.total_connect = 0.0
+        self.max_connect = 0.0
+        # connect time of records created during a checkout, until that checkout's wait is recorded
+        self._connect_seconds = weakref.WeakKeyDictionary()
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.waits += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_connect(self, record, seconds: float):
+        with self._lock:
+            self.new_connections += 1
+            self.total_connect += seconds
+            self.max_connect = max(self.max_connect, seconds)
+            self._connect_seconds[record] = seconds
+
+    def connect_time_of(self, record) -> float:
+        """Connect time spent creating `record` in the current checkout (0.0 for pooled ones)"""
+        with self._lock:
+            return self._connect_seconds.pop(record, 0.0)
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            return {
+                "pool": self.name,
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.total_wait, 6),
+                "wait_seconds_avg": round(self.total_wait / self.waits, 6) if self.waits else 0.0,
+                "wait_seconds_max": round(self.max_wait, 6),
+                "connect_seconds_total": round(self.total_connect, 6),
+                "connect_seconds_avg": (
+                    round(self.total_connect / self.new_connections, 6) if self.new_connections else 0.0
+                ),
+                "connect_seconds_max": round(self.max_connect, 6),
+            }
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+
+def _timed_get(metrics: PoolMetrics, do_get):
+    started = time.perf_counter()
+    try:
+        conn = do_get()
+    except exc.TimeoutError:
+        metrics.record_wait(time.perf_counter() - started, timed_out=True)
+        raise
+    # A checkout that opened a new connection only waited for the part before connecting
+    metrics.record_wait(time.perf_counter() - started - metrics.connect_time_of(conn))
+    return conn
+
+
+def _timed_connect(metrics: PoolMetrics, create_connection):
+    started = time.perf_counter()
+    record = create_connection()
+    metrics.record_connect(record, time.perf_counter() - started)
+    return record
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection"""
+
+    def _do_get(self):
+        return _timed_get(sync_pool_metrics, super()._do_get)
+
+    def _create_connection(self):
+        return _timed_connect(sync_pool_metrics, super()._create_connection)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool counterpart of InstrumentedQueuePool"""
+
+    def _do_get(self):
+        return _timed_get(async_pool_metrics, super()._do_get)
+
+    def _create_connection(self):
+        return _timed_connect(async_pool_metrics, super()._create_connection)
+
+
+def register_pool_events(engine, metrics: PoolMetrics):
+    """Hook checkout/checkin/connect/invalidate counters onto an engine's pool"""
+    pool = engine.pool
+
+    event.listen(pool, "connect", lambda *args: metrics.incr("connects"))
+    event.listen(pool, "checkout", lambda *args: metrics.incr("checkouts"))
+    event.listen(pool, "checkin", lambda *args: metrics.incr("checkins"))
+    event.listen(pool, "invalidate", lambda *args: metrics.incr("invalidations"))
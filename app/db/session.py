@@ -1,11 +1,58 @@
 """Database session and engine configuration."""
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.db.base_class import Base
+from app.db.pool_metrics import (
+    InstrumentedQueuePool,
+    InstrumentedAsyncQueuePool,
+    register_pool_events,
+    sync_pool_metrics,
+    async_pool_metrics,
+)
+
+# Shared pool settings for both engines
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
 
 # SQLAlchemy engine setup
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    **POOL_OPTIONS,
+)
+register_pool_events(engine, sync_pool_metrics)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine + session factory (asyncpg) for non-blocking request paths
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedAsyncQueuePool,
+    **POOL_OPTIONS,
+)
+register_pool_events(async_engine.sync_engine, async_pool_metrics)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def get_pool_stats() -> dict:
+    """Current pool state + counters for both engines"""
+    return {
+        "sync": sync_pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+    }
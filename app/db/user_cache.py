@@ -0,0 +1,204 @@
+"""
+User Lookup Cache
+Bounded LRU + TTL cache of user rows for get_user_by_id and the "does this user
+exist" checks on the chat save paths. Writes through user_repository invalidate
+the entry locally and, through a pluggable backend, in every other worker.
+
+Backends (USER_CACHE_INVALIDATION_BACKEND):
+    local     in-process only (single worker, tests)
+    postgres  LISTEN/NOTIFY on the app database, no extra infrastructure
+"""
+import logging
+import select
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from sqlalchemy import inspect, text
+
+from app.core.config import settings
+from app.db.models.user_model import User
+
+logger = logging.getLogger(__name__)
+
+# Columns are read off the mapper so the snapshot follows the model
+USER_COLUMNS = [column.key for column in inspect(User).mapper.column_attrs]
+
+
+def user_snapshot(user: User) -> dict:
+    """Plain column values, safe to keep across sessions"""
+    return {key: getattr(user, key) for key in USER_COLUMNS}
+
+
+class InvalidationBackend(ABC):
+    """Fans invalidations out to every worker; a user_id of None means drop everything"""
+
+    @abstractmethod
+    def start(self, on_invalidate: Callable[[Optional[str]], None]):
+        ...
+
+    @abstractmethod
+    def publish(self, user_id: str):
+        ...
+
+    def stop(self):
+        pass
+
+
+class LocalInvalidationBackend(InvalidationBackend):
+    """In-process stand-in: delivers straight to the subscribers of this process"""
+
+    def __init__(self):
+        self._subscribers = []
+
+    def start(self, on_invalidate):
+        self._subscribers.append(on_invalidate)
+
+    def publish(self, user_id):
+        for callback in list(self._subscribers):
+            callback(user_id)
+
+
+class PostgresInvalidationBackend(InvalidationBackend):
+    """NOTIFY on write, a daemon thread per worker LISTENs and drops the entry"""
+
+    CHANNEL = "user_cache_invalidate"
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, on_invalidate):
+        self._thread = threading.Thread(target=self._listen, args=(on_invalidate,), daemon=True,
+                                        name="user-cache-listener")
+        self._thread.start()
+
+    def publish(self, user_id):
+        with self._engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {"channel": self.CHANNEL, "payload": str(user_id)})
+
+    def _listen(self, on_invalidate):
+        import psycopg2  # only needed for the postgres backend
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self._dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.CHANNEL}")
+                # Anything published while we weren't listening is lost -> start clean
+                on_invalidate(None)
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        on_invalidate(conn.notifies.pop(0).payload)
+            except Exception as listen_error:
+                logger.warning("⚠️ [USER-CACHE] Invalidation listener error: %s", listen_error)
+                self._stop.wait(5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+class UserCache:
+    """Thread-safe LRU + TTL map of user_id -> column snapshot"""
+
+    def __init__(self, backend: InvalidationBackend, max_entries: int = None, ttl: int = None):
+        self.max_entries = max_entries or settings.USER_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.USER_CACHE_TTL
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._backend = backend
+        self._started = False
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def _ensure_started(self):
+        if not self._started:
+            with self._lock:
+                if self._started:
+                    return
+                self._started = True
+            self._backend.start(self._drop)
+
+    def set_backend(self, backend: InvalidationBackend):
+        """Swap the invalidation backend (e.g. LocalInvalidationBackend in tests)"""
+        self._backend.stop()
+        self._backend = backend
+        self._started = False
+
+    def get(self, user_id) -> Optional[dict]:
+        if not settings.USER_CACHE_ENABLED:
+            return None
+        self._ensure_started()
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, user: User):
+        if not settings.USER_CACHE_ENABLED or user is None:
+            return
+        self._ensure_started()
+        snapshot = user_snapshot(user)
+        with self._lock:
+            key = str(snapshot["id"])
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _drop(self, user_id: Optional[str]):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            elif self._entries.pop(str(user_id), None) is not None:
+                self.stats["invalidations"] += 1
+
+    def invalidate(self, user_id):
+        """Drop a user here and tell the other workers to do the same"""
+        self._drop(user_id)
+        try:
+            self._backend.publish(str(user_id))
+        except Exception as publish_error:
+            # Other workers fall back to the TTL
+            logger.warning("⚠️ [USER-CACHE] Invalidation publish failed: %s", publish_error)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "enabled": settings.USER_CACHE_ENABLED,
+                "backend": type(self._backend).__name__,
+                "entries": len(self._entries),
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _make_backend() -> InvalidationBackend:
+    if settings.USER_CACHE_INVALIDATION_BACKEND == "postgres":
+        from app.db.session import engine
+        return PostgresInvalidationBackend(engine)
+    return LocalInvalidationBackend()
+
+
+user_cache = UserCache(_make_backend())
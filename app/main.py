@@ -1,14 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI # type: ignore
-from app.api.routes import ai_memory_routes, ai_routes, chat_long_memory_routes, user_routes, chat_memory_routes
+from app.core.logging_config import logger
+from app.api.routes import ai_memory_routes, ai_routes, chat_long_memory_routes, user_routes, chat_memory_routes, metrics_routes, ingestion_routes, health_routes
 from app.db.init_db import init_db
 from app.core.config import settings
-from app.core.logging_config import logger
+from app.core.client_registry import client_registry
+from app.core.resources import resources
+from app.core.tracing import TracingMiddleware
+from app.db.chat_memory_writer import chat_memory_writer
+from app.db.memory_access_buffer import memory_access_buffer
+from app.services.memory_consolidation_service import memory_consolidator
 
-# Initialize FastAPI app
-app = FastAPI(title=settings.APP_NAME)
 
-# Create DB tables
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create DB tables (was done at import time)
+    if settings.STARTUP_CREATE_TABLES:
+        await asyncio.to_thread(init_db)
+    # Build Chroma/LLM/search clients in the background; /health/ready waits for them
+    warm_up = resources.start_warm_up() if settings.STARTUP_WARM_UP else None
+    if settings.MEMORY_CONSOLIDATION_ENABLED:
+        memory_consolidator.start()
+
+    yield
+
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    await memory_consolidator.stop()
+    # Drain queued chat turns before the DB/HTTP pools go away
+    await chat_memory_writer.stop()
+    memory_access_buffer.stop()
+    await client_registry.aclose()
+
+
+# Initialize FastAPI app
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
+# Per-request stage timings -> /metrics
+app.add_middleware(TracingMiddleware)
 
 # Register routes
 app.include_router(user_routes.router)
@@ -16,6 +46,9 @@ app.include_router(ai_routes.router)
 app.include_router(ai_memory_routes.router)
 app.include_router(chat_memory_routes.router)
 app.include_router(chat_long_memory_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(ingestion_routes.router)
+app.include_router(health_routes.router)
 
 @app.get("/")
 def root():
@@ -1,11 +1,18 @@
 # app/repositories/ai_repository.py
+import uuid
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from app.core.tracing import traced
 from app.db.models.ai_model import AIResponse
 from app.schemas.ai_schema import AIResponseCreate
 
 
 class AIRepository:
     @staticmethod
+    @traced("db.save_ai_response")
     def create_response(db: Session, data: AIResponseCreate) -> AIResponse:
         ai_response = AIResponse(**data.dict())
         db.add(ai_response)
@@ -13,6 +20,24 @@ class AIRepository:
         db.refresh(ai_response)
         return ai_response
 
+    @staticmethod
+    @traced("db.save_ai_responses")
+    def create_responses(db: Session, items: Sequence[AIResponseCreate]) -> List[Tuple[uuid.UUID, datetime]]:
+        """
+        Insert many responses with a single multi-row INSERT ... RETURNING and one commit
+
+        Returns:
+            (id, created_at) per item, in input order
+        """
+        if not items:
+            return []
+        rows = db.execute(
+            insert(AIResponse).returning(AIResponse.id, AIResponse.created_at, sort_by_parameter_order=True),
+            [{"id": uuid.uuid4(), **item.dict()} for item in items]
+        ).all()
+        db.commit()
+        return [(row.id, row.created_at) for row in rows]
+
     @staticmethod
     def get_all_responses(db: Session):
         return db.query(AIResponse).order_by(AIResponse.created_at.desc()).all()
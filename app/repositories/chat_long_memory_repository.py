@@ -40,13 +40,20 @@ Chat Long-Term Memory Repository
 Database access layer for long-term memory operations
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from typing import List, Optional
+from sqlalchemy import func, and_, or_, case, delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 from uuid import UUID
+import re
 
-from app.db.models.chat_long_memory_model import ChatLongMemory
+from app.core.config import settings
+from app.core.tracing import traced
+from app.db.models.chat_long_memory_model import ChatLongMemory, SEARCH_CONFIG
+from app.db.models.chat_long_memory_stats_model import ChatLongMemoryStats
+from app.db.models.memory_consolidation_model import MemoryConsolidationWatermark
 from app.schemas.chat_long_memory_schema import ChatLongMemoryCreate, ChatLongMemoryUpdate
+from app.db.memory_vector_index import encode_embedding, memory_vector_index
 import logging
 
 logger = logging.getLogger(__name__)
@@ -54,29 +61,48 @@ logger = logging.getLogger(__name__)
 
 # ==================== CREATE ====================
 
-def create_chat_long_memory(db: Session, data: ChatLongMemoryCreate) -> ChatLongMemory:
+@traced("db.create_memory")
+def create_chat_long_memory(
+    db: Session,
+    data: ChatLongMemoryCreate,
+    embedding: Optional[Sequence[float]] = None
+) -> ChatLongMemory:
     """
     Create a new long-term memory entry
     
     Args:
         db: Database session
         data: ChatLongMemoryCreate schema
+        embedding: Optional content embedding (stored as compact float32 bytes)
     
     Returns:
         Created ChatLongMemory object
     """
     try:
-        new_mem = ChatLongMemory(**data.dict(by_alias=True))
+        new_mem = ChatLongMemory(**data.dict())
+        if embedding is not None:
+            new_mem.embedding_vector = encode_embedding(embedding)
         db.add(new_mem)
+        if settings.MEMORY_STATS_SUMMARY_ENABLED:
+            db.flush()  # applies the memory_type / importance defaults
+            # now() is the transaction start time, i.e. the created_at server default
+            _bump_stats(db, new_mem.user_id, new_mem.memory_type, 1, new_mem.importance_score or 0.0, func.now())
         db.commit()
         db.refresh(new_mem)
-        logger.info(f"Created memory {new_mem.id} for user {new_mem.user_id}")
-        return new_mem
     except Exception as e:
         db.rollback()
         logger.error(f"Error creating memory: {e}")
         raise
 
+    # The row is committed: an index failure must not fail the create, the matrix is just reloaded
+    try:
+        memory_vector_index.add(new_mem.user_id, new_mem.id, new_mem.embedding_vector)
+    except Exception as e:
+        logger.warning(f"Vector index update failed for memory {new_mem.id}, reloading user: {e}")
+        memory_vector_index.invalidate(new_mem.user_id)
+    logger.info(f"Created memory {new_mem.id} for user {new_mem.user_id}")
+    return new_mem
+
 
 # ==================== READ ====================
 
@@ -94,6 +120,7 @@ def get_memory_by_id(db: Session, memory_id: UUID) -> Optional[ChatLongMemory]:
     return db.query(ChatLongMemory).filter(ChatLongMemory.id == memory_id).first()
 
 
+@traced("db.recent_memories")
 def get_recent_memories(db: Session, user_id: UUID, limit: int = 10) -> List[ChatLongMemory]:
     """
     Get recent memories for a user
@@ -200,36 +227,125 @@ def get_important_memories(
     )
 
 
+SEARCH_MODES = ("words", "prefix", "phrase", "substring")
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _tsquery(search_term: str, mode: str):
+    """tsquery for a mode, or None when the term has nothing searchable"""
+    if mode == "phrase":
+        return func.phraseto_tsquery(SEARCH_CONFIG, search_term)
+    if mode == "prefix":
+        # Every word must match as a prefix: "crick ipl" -> 'crick':* & 'ipl':*
+        tokens = _SEARCH_TOKEN.findall(search_term.lower())
+        if not tokens:
+            return None
+        return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{token}:*" for token in tokens))
+    # Web-search syntax: plain words are ANDed, "quoted phrase", or, -exclude
+    return func.websearch_to_tsquery(SEARCH_CONFIG, search_term)
+
+
+@traced("db.search_memories")
 def search_memories_by_content(
     db: Session,
     user_id: UUID,
     search_term: str,
-    limit: int = 20
-) -> List[ChatLongMemory]:
+    limit: int = 20,
+    mode: str = "words"
+) -> List[Tuple[ChatLongMemory, float]]:
     """
-    Search memories by content (case-insensitive)
+    Ranked content search over a user's memories
     
     Args:
         db: Database session
         user_id: User UUID
         search_term: Text to search for
         limit: Maximum results
+        mode: words (web-search syntax), prefix, phrase, or substring
     
     Returns:
-        List of matching ChatLongMemory objects
+        List of (ChatLongMemory, score) tuples, best match first.
+        words/prefix/phrase use the GIN-indexed tsvector and score with ts_rank_cd;
+        substring uses the trigram index and scores with similarity().
+        A words search with no hits falls back to substring, so partial words still match.
     """
-    return (
-        db.query(ChatLongMemory)
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Search mode must be one of: {', '.join(SEARCH_MODES)}")
+
+    if mode != "substring":
+        query = _tsquery(search_term, mode)
+        if query is not None:
+            rank = func.ts_rank_cd(ChatLongMemory.content_tsv, query)
+            results = (
+                db.query(ChatLongMemory, rank)
+                .filter(
+                    and_(
+                        ChatLongMemory.user_id == user_id,
+                        ChatLongMemory.content_tsv.op("@@")(query)
+                    )
+                )
+                .order_by(rank.desc(), ChatLongMemory.importance_score.desc())
+                .limit(limit)
+                .all()
+            )
+            if results or mode != "words":
+                return [(memory, float(score)) for memory, score in results]
+
+    score = func.similarity(ChatLongMemory.content, search_term)
+    results = (
+        db.query(ChatLongMemory, score)
         .filter(
             and_(
                 ChatLongMemory.user_id == user_id,
                 ChatLongMemory.content.ilike(f"%{search_term}%")
             )
         )
-        .order_by(ChatLongMemory.importance_score.desc())
+        .order_by(score.desc(), ChatLongMemory.importance_score.desc())
         .limit(limit)
         .all()
     )
+    return [(memory, float(score)) for memory, score in results]
+
+
+@traced("db.similar_memories")
+def search_similar_memories(
+    db: Session,
+    user_id: UUID,
+    query_embedding: Sequence[float],
+    k: int = 5,
+    min_score: float = 0.0
+) -> List[Tuple[ChatLongMemory, float]]:
+    """
+    Top-k memories for a user by cosine similarity to `query_embedding`
+    
+    Args:
+        db: Database session
+        user_id: User UUID
+        query_embedding: Embedding of the current message
+        k: Number of memories to return
+        min_score: Drop matches below this cosine similarity
+    
+    Returns:
+        List of (ChatLongMemory, score) tuples, most similar first
+    """
+    def load_user_vectors():
+        return (
+            db.query(ChatLongMemory.id, ChatLongMemory.embedding_vector)
+            .filter(
+                and_(
+                    ChatLongMemory.user_id == user_id,
+                    ChatLongMemory.embedding_vector.isnot(None)
+                )
+            )
+            .all()
+        )
+
+    matches = memory_vector_index.search(user_id, query_embedding, k, load_user_vectors, min_score)
+    if not matches:
+        return []
+    rows = db.query(ChatLongMemory).filter(ChatLongMemory.id.in_([m[0] for m in matches])).all()
+    by_id = {row.id: row for row in rows}
+    return [(by_id[memory_id], score) for memory_id, score in matches if memory_id in by_id]
 
 
 # ==================== UPDATE ====================
@@ -259,6 +375,37 @@ def update_last_used(db: Session, memory_id: UUID) -> Optional[ChatLongMemory]:
         raise
 
 
+def touch_memories(db: Session, accessed: Dict[UUID, datetime]) -> int:
+    """
+    Bump last_used_at for many memories in one UPDATE ... WHERE id IN (...)
+    
+    Args:
+        db: Database session
+        accessed: Memory UUID -> time it was used
+    
+    Returns:
+        Number of rows updated
+    """
+    if not accessed:
+        return 0
+    try:
+        used_at = case(accessed, value=ChatLongMemory.id)
+        result = db.execute(
+            update(ChatLongMemory)
+            .where(ChatLongMemory.id.in_(list(accessed)))
+            # Never move a timestamp backwards (a direct write may have landed since)
+            .values(last_used_at=func.greatest(ChatLongMemory.last_used_at, used_at))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        logger.info("Touched last_used_at for %s memories", result.rowcount)
+        return result.rowcount
+    except Exception as e:
+        db.rollback()
+        logger.error("Error touching memories: %s", e)
+        raise
+
+
 def update_memory_importance(
     db: Session, 
     memory_id: UUID, 
@@ -278,9 +425,12 @@ def update_memory_importance(
     try:
         memory = db.query(ChatLongMemory).filter(ChatLongMemory.id == memory_id).first()
         if memory:
+            old_importance = memory.importance_score or 0.0
             # Clamp between 0 and 1
             memory.importance_score = max(0.0, min(1.0, new_importance))
             memory.last_used_at = datetime.utcnow()
+            if settings.MEMORY_STATS_SUMMARY_ENABLED:
+                _bump_stats(db, memory.user_id, memory.memory_type, 0, memory.importance_score - old_importance)
             db.commit()
             db.refresh(memory)
             logger.info(f"Updated importance for memory {memory_id} to {memory.importance_score}")
@@ -294,7 +444,8 @@ def update_memory_importance(
 def update_memory(
     db: Session,
     memory_id: UUID,
-    update_data: ChatLongMemoryUpdate
+    update_data: ChatLongMemoryUpdate,
+    embedding: Optional[Sequence[float]] = None
 ) -> Optional[ChatLongMemory]:
     """
     Update memory with partial data
@@ -303,6 +454,7 @@ def update_memory(
         db: Database session
         memory_id: Memory UUID
         update_data: ChatLongMemoryUpdate schema
+        embedding: New content embedding (pass it when content changes)
     
     Returns:
         Updated ChatLongMemory object or None
@@ -312,14 +464,28 @@ def update_memory(
         if not memory:
             return None
         
+        old_type, old_importance = memory.memory_type, memory.importance_score or 0.0
+        
         # Update only provided fields
         update_dict = update_data.dict(exclude_unset=True)
         for field, value in update_dict.items():
             setattr(memory, field, value)
+        if "content" in update_dict:
+            # A stale vector would keep matching the old text
+            memory.embedding_vector = encode_embedding(embedding) if embedding is not None else None
         
         memory.last_used_at = datetime.utcnow()
+        if settings.MEMORY_STATS_SUMMARY_ENABLED:
+            new_importance = memory.importance_score or 0.0
+            if memory.memory_type != old_type:
+                db.flush()
+                _remove_from_stats(db, memory.user_id, {old_type: (1, old_importance, memory.created_at)})
+                _bump_stats(db, memory.user_id, memory.memory_type, 1, new_importance, memory.created_at)
+            elif new_importance != old_importance:
+                _bump_stats(db, memory.user_id, memory.memory_type, 0, new_importance - old_importance)
         db.commit()
         db.refresh(memory)
+        memory_vector_index.invalidate(memory.user_id)
         logger.info(f"Updated memory {memory_id}")
         return memory
     except Exception as e:
@@ -345,7 +511,13 @@ def delete_memory(db: Session, memory_id: UUID) -> bool:
         memory = db.query(ChatLongMemory).filter(ChatLongMemory.id == memory_id).first()
         if memory:
             db.delete(memory)
+            if settings.MEMORY_STATS_SUMMARY_ENABLED:
+                db.flush()
+                _remove_from_stats(db, memory.user_id, {
+                    memory.memory_type: (1, memory.importance_score or 0.0, memory.created_at)
+                })
             db.commit()
+            memory_vector_index.invalidate(memory.user_id)
             logger.info(f"Deleted memory {memory_id}")
             return True
         return False
@@ -355,6 +527,34 @@ def delete_memory(db: Session, memory_id: UUID) -> bool:
         raise
 
 
+def _delete_and_tally(db: Session, user_id: UUID, *criteria) -> int:
+    """
+    Delete a user's memories matching `criteria` (not committed) and keep the stats
+    summary in step. The removed rows are tallied per type in the same statement
+    (DELETE ... RETURNING inside a CTE), so nothing is loaded into the session.
+    """
+    gone = (
+        delete(ChatLongMemory)
+        .where(and_(ChatLongMemory.user_id == user_id, *criteria))
+        .returning(ChatLongMemory.memory_type, ChatLongMemory.importance_score, ChatLongMemory.created_at)
+        .cte("gone")
+    )
+    removed = db.execute(
+        select(
+            gone.c.memory_type,
+            func.count(),
+            func.coalesce(func.sum(gone.c.importance_score), 0.0),
+            func.max(gone.c.created_at)
+        ).group_by(gone.c.memory_type)
+    ).all()
+    
+    if settings.MEMORY_STATS_SUMMARY_ENABLED and removed:
+        _remove_from_stats(db, user_id, {
+            memory_type: (count, importance, latest) for memory_type, count, importance, latest in removed
+        })
+    return sum(count for _, count, _, _ in removed)
+
+
 def delete_old_memories(
     db: Session,
     user_id: UUID,
@@ -376,15 +576,13 @@ def delete_old_memories(
     try:
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
         
-        deleted = db.query(ChatLongMemory).filter(
-            and_(
-                ChatLongMemory.user_id == user_id,
-                ChatLongMemory.created_at < cutoff_date,
-                ChatLongMemory.importance_score < min_importance
-            )
-        ).delete()
-        
+        deleted = _delete_and_tally(
+            db, user_id,
+            ChatLongMemory.created_at < cutoff_date,
+            ChatLongMemory.importance_score < min_importance
+        )
         db.commit()
+        memory_vector_index.invalidate(user_id)
         logger.info(f"Deleted {deleted} old memories for user {user_id}")
         return deleted
     except Exception as e:
@@ -408,8 +606,11 @@ def delete_all_user_memories(db: Session, user_id: UUID) -> int:
         deleted = db.query(ChatLongMemory).filter(
             ChatLongMemory.user_id == user_id
         ).delete()
+        if settings.MEMORY_STATS_SUMMARY_ENABLED:
+            db.query(ChatLongMemoryStats).filter(ChatLongMemoryStats.user_id == user_id).delete()
         
         db.commit()
+        memory_vector_index.invalidate(user_id)
         logger.warning(f"Deleted ALL {deleted} memories for user {user_id}")
         return deleted
     except Exception as e:
@@ -422,6 +623,10 @@ def delete_all_user_memories(db: Session, user_id: UUID) -> int:
 
 def get_memory_count(db: Session, user_id: UUID) -> int:
     """Get total memory count for a user"""
+    if settings.MEMORY_STATS_SUMMARY_ENABLED:
+        return db.query(func.coalesce(func.sum(ChatLongMemoryStats.memory_count), 0)).filter(
+            ChatLongMemoryStats.user_id == user_id
+        ).scalar()
     return db.query(func.count(ChatLongMemory.id)).filter(
         ChatLongMemory.user_id == user_id
     ).scalar()
@@ -431,6 +636,10 @@ def get_memory_stats(db: Session, user_id: UUID) -> dict:
     """
     Get comprehensive memory statistics
     
+    One query either way: a GROUP BY over the user's memories, or - with
+    MEMORY_STATS_SUMMARY_ENABLED - a primary-key read of the per-type totals in
+    chat_long_memory_stats, whose cost doesn't grow with the number of memories.
+    
     Args:
         db: Database session
         user_id: User UUID
@@ -438,34 +647,319 @@ def get_memory_stats(db: Session, user_id: UUID) -> dict:
     Returns:
         Dictionary with statistics
     """
-    # Total count
-    total = db.query(func.count(ChatLongMemory.id)).filter(
-        ChatLongMemory.user_id == user_id
-    ).scalar()
-    
-    # Count by type
-    type_counts = db.query(
-        ChatLongMemory.memory_type,
-        func.count(ChatLongMemory.id)
-    ).filter(
-        ChatLongMemory.user_id == user_id
-    ).group_by(ChatLongMemory.memory_type).all()
-    
-    # Average importance
-    avg_importance = db.query(
-        func.avg(ChatLongMemory.importance_score)
-    ).filter(
-        ChatLongMemory.user_id == user_id
-    ).scalar() or 0.0
+    if settings.MEMORY_STATS_SUMMARY_ENABLED:
+        rows = db.query(
+            ChatLongMemoryStats.memory_type,
+            ChatLongMemoryStats.memory_count,
+            ChatLongMemoryStats.importance_sum,
+            ChatLongMemoryStats.latest_created_at
+        ).filter(
+            ChatLongMemoryStats.user_id == user_id,
+            ChatLongMemoryStats.memory_count > 0
+        ).all()
+    else:
+        memory_type = _stats_type_column()
+        rows = db.query(
+            memory_type,
+            func.count(ChatLongMemory.id),
+            func.coalesce(func.sum(ChatLongMemory.importance_score), 0.0),
+            func.max(ChatLongMemory.created_at)
+        ).filter(
+            ChatLongMemory.user_id == user_id
+        ).group_by(memory_type).all()
     
-    # Most recent memory
-    most_recent = db.query(ChatLongMemory).filter(
-        ChatLongMemory.user_id == user_id
-    ).order_by(ChatLongMemory.created_at.desc()).first()
+    total = sum(count for _, count, _, _ in rows)
+    importance_sum = sum(importance for _, _, importance, _ in rows)
+    latest = [created_at for _, _, _, created_at in rows if created_at is not None]
     
     return {
         "total_memories": total,
-        "memory_types": {memory_type: count for memory_type, count in type_counts},
-        "average_importance": round(float(avg_importance), 2),
-        "most_recent_memory": most_recent.created_at if most_recent else None
-    }
\ No newline at end of file
+        "memory_types": {memory_type: count for memory_type, count, _, _ in rows},
+        "average_importance": round(float(importance_sum) / total, 2) if total else 0.0,
+        "most_recent_memory": max(latest) if latest else None
+    }
+
+
+# ==================== STATS SUMMARY ====================
+
+# memory_type is nullable but part of the stats primary key: untyped memories are
+# counted under this name (in the summary and in the GROUP BY path alike)
+UNKNOWN_MEMORY_TYPE = "unknown"
+
+
+def _stats_type(memory_type: Optional[str]) -> str:
+    return UNKNOWN_MEMORY_TYPE if memory_type is None else memory_type
+
+
+def _stats_type_column():
+    return func.coalesce(ChatLongMemory.memory_type, UNKNOWN_MEMORY_TYPE)
+
+
+def _bump_stats(
+    db: Session,
+    user_id: UUID,
+    memory_type: Optional[str],
+    count: int,
+    importance: float,
+    created_at=None
+):
+    """Add a delta to one (user, type) row of chat_long_memory_stats, creating it if needed"""
+    stmt = pg_insert(ChatLongMemoryStats).values(
+        user_id=user_id,
+        memory_type=_stats_type(memory_type),
+        memory_count=count,
+        importance_sum=importance,
+        latest_created_at=created_at
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[ChatLongMemoryStats.user_id, ChatLongMemoryStats.memory_type],
+        set_={
+            "memory_count": ChatLongMemoryStats.memory_count + stmt.excluded.memory_count,
+            "importance_sum": ChatLongMemoryStats.importance_sum + stmt.excluded.importance_sum,
+            # GREATEST skips NULLs, so a delta without created_at leaves it alone
+            "latest_created_at": func.greatest(
+                ChatLongMemoryStats.latest_created_at, stmt.excluded.latest_created_at
+            ),
+        }
+    ))
+
+
+def _remove_from_stats(db: Session, user_id: UUID, removed: Dict[Optional[str], Tuple[int, float, datetime]]):
+    """
+    Subtract removed memories ({memory_type: (count, importance_sum, newest created_at)}).
+    Must run after the rows are gone: if the newest memory of a type was removed,
+    latest_created_at is re-read from what is left.
+    """
+    for memory_type, (count, importance, latest) in removed.items():
+        _bump_stats(db, user_id, memory_type, -count, -float(importance))
+        if latest is None:
+            continue
+        db.execute(
+            update(ChatLongMemoryStats)
+            .where(
+                and_(
+                    ChatLongMemoryStats.user_id == user_id,
+                    ChatLongMemoryStats.memory_type == _stats_type(memory_type),
+                    ChatLongMemoryStats.latest_created_at <= latest
+                )
+            )
+            .values(latest_created_at=(
+                select(func.max(ChatLongMemory.created_at))
+                .where(
+                    and_(
+                        ChatLongMemory.user_id == user_id,
+                        _stats_type_column() == _stats_type(memory_type)
+                    )
+                )
+                .scalar_subquery()
+            ))
+        )
+
+
+def rebuild_memory_stats(db: Session, user_id: Optional[UUID] = None) -> int:
+    """
+    Recompute chat_long_memory_stats from chat_long_memory (all users, or one)
+    
+    Run it once after turning MEMORY_STATS_SUMMARY_ENABLED on for a database
+    that already has memories written while it was off.
+    
+    Args:
+        db: Database session
+        user_id: Only rebuild this user
+    
+    Returns:
+        Number of (user, type) rows written
+    """
+    try:
+        stale = delete(ChatLongMemoryStats)
+        memory_type = _stats_type_column()
+        totals = select(
+            ChatLongMemory.user_id,
+            memory_type,
+            func.count(ChatLongMemory.id),
+            func.coalesce(func.sum(ChatLongMemory.importance_score), 0.0),
+            func.max(ChatLongMemory.created_at)
+        )
+        if user_id is not None:
+            stale = stale.where(ChatLongMemoryStats.user_id == user_id)
+            totals = totals.where(ChatLongMemory.user_id == user_id)
+        totals = totals.group_by(ChatLongMemory.user_id, memory_type)
+        
+        db.execute(stale)
+        result = db.execute(pg_insert(ChatLongMemoryStats).from_select(
+            ["user_id", "memory_type", "memory_count", "importance_sum", "latest_created_at"],
+            totals
+        ))
+        db.commit()
+        logger.info("Rebuilt memory stats (%s rows)", result.rowcount)
+        return result.rowcount
+    except Exception as e:
+        db.rollback()
+        logger.error("Error rebuilding memory stats: %s", e)
+        raise
+
+
+# ==================== CONSOLIDATION ====================
+
+# meta_data["source"] of the memories save_sharmaji_turn writes for each chat turn.
+# Only these are consolidated: other memories of the same type (notes created
+# through the API, system notes) are never summarised away.
+CHAT_TURN_SOURCE = "chat_turn"
+
+
+def _is_chat_turn(memory_type: str):
+    """Turn filter: a raw chat turn of `memory_type`"""
+    return and_(
+        ChatLongMemory.memory_type == memory_type,
+        ChatLongMemory.role.in_(("human", "ai")),
+        ChatLongMemory.meta_data["source"].as_string() == CHAT_TURN_SOURCE
+    )
+
+
+def _after_watermark():
+    """Turn filter: newer than the user's consolidation watermark (needs the outer join)"""
+    return or_(
+        MemoryConsolidationWatermark.consolidated_until.is_(None),
+        ChatLongMemory.created_at > MemoryConsolidationWatermark.consolidated_until
+    )
+
+
+def get_consolidation_candidates(
+    db: Session,
+    memory_type: str,
+    before: datetime,
+    min_turns: int,
+    limit: int
+) -> List[UUID]:
+    """
+    Users with at least `min_turns` unconsolidated chat turns of `memory_type`
+    created before `before`, most backlogged first
+    
+    Args:
+        db: Database session
+        memory_type: Raw turn type to consolidate
+        before: Only turns older than this are eligible
+        min_turns: Smallest backlog worth a summary
+        limit: Maximum users
+    
+    Returns:
+        List of user UUIDs
+    """
+    rows = (
+        db.query(ChatLongMemory.user_id)
+        .outerjoin(
+            MemoryConsolidationWatermark,
+            MemoryConsolidationWatermark.user_id == ChatLongMemory.user_id
+        )
+        .filter(
+            _is_chat_turn(memory_type),
+            ChatLongMemory.created_at < before,
+            _after_watermark()
+        )
+        .group_by(ChatLongMemory.user_id)
+        .having(func.count(ChatLongMemory.id) >= min_turns)
+        .order_by(func.count(ChatLongMemory.id).desc())
+        .limit(limit)
+        .all()
+    )
+    return [user_id for user_id, in rows]
+
+
+def get_unconsolidated_turns(
+    db: Session,
+    user_id: UUID,
+    memory_type: str,
+    before: datetime,
+    limit: int
+) -> List[ChatLongMemory]:
+    """
+    Oldest unconsolidated chat turns of `memory_type` for a user (created before `before`)
+    
+    Args:
+        db: Database session
+        user_id: User UUID
+        memory_type: Raw turn type to consolidate
+        before: Only turns older than this are eligible
+        limit: Maximum turns (one summary's worth)
+    
+    Returns:
+        List of ChatLongMemory objects, oldest first
+    """
+    return (
+        db.query(ChatLongMemory)
+        .outerjoin(
+            MemoryConsolidationWatermark,
+            MemoryConsolidationWatermark.user_id == ChatLongMemory.user_id
+        )
+        .filter(
+            ChatLongMemory.user_id == user_id,
+            _is_chat_turn(memory_type),
+            ChatLongMemory.created_at < before,
+            _after_watermark()
+        )
+        .order_by(ChatLongMemory.created_at.asc(), ChatLongMemory.id.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def consolidate_turns(
+    db: Session,
+    summary: ChatLongMemoryCreate,
+    source_ids: List[UUID],
+    until: datetime,
+    embedding: Optional[Sequence[float]] = None
+) -> ChatLongMemory:
+    """
+    Replace raw turns with one summary memory, in a single transaction:
+    insert the summary (dated `until`, so it sorts where its turns were), delete
+    the source turns, and move the user's watermark to `until`.
+    
+    Args:
+        db: Database session
+        summary: The summary memory
+        source_ids: IDs of the turns it replaces
+        until: created_at of the newest source turn
+        embedding: Optional summary embedding
+    
+    Returns:
+        Created summary ChatLongMemory object
+    """
+    try:
+        user_id = summary.user_id
+        new_mem = ChatLongMemory(**summary.dict(), created_at=until)
+        if embedding is not None:
+            new_mem.embedding_vector = encode_embedding(embedding)
+        db.add(new_mem)
+        db.flush()
+        if settings.MEMORY_STATS_SUMMARY_ENABLED:
+            _bump_stats(db, user_id, new_mem.memory_type, 1, new_mem.importance_score or 0.0, until)
+        
+        removed = _delete_and_tally(db, user_id, ChatLongMemory.id.in_(source_ids))
+        
+        stmt = pg_insert(MemoryConsolidationWatermark).values(
+            user_id=user_id,
+            consolidated_until=until,
+            turns_consolidated=removed,
+            summaries_created=1
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[MemoryConsolidationWatermark.user_id],
+            set_={
+                "consolidated_until": func.greatest(
+                    MemoryConsolidationWatermark.consolidated_until, stmt.excluded.consolidated_until
+                ),
+                "turns_consolidated": MemoryConsolidationWatermark.turns_consolidated + removed,
+                "summaries_created": MemoryConsolidationWatermark.summaries_created + 1,
+                "updated_at": func.now(),
+            }
+        ))
+        db.commit()
+        db.refresh(new_mem)
+        memory_vector_index.invalidate(user_id)
+        logger.info("Consolidated %s turns into memory %s for user %s", removed, new_mem.id, user_id)
+        return new_mem
+    except Exception as e:
+        db.rollback()
+        logger.error("Error consolidating memories: %s", e)
+        raise
@@ -1,17 +1,26 @@
+from sqlalchemy import and_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.db.models.chat_memory_model import ChatMemory
 from app.db.models.user_model import User
 from app.schemas.chat_memory_schema import ChatMemoryCreate
+from app.core.config import settings
+from app.core.tracing import traced
+from app.db.chat_memory_writer import chat_memory_writer
+from app.db.user_cache import user_cache
 
 
+@traced("db.save_chat_memory")
 def save_chat_memory(db: Session, chat: ChatMemoryCreate):
-    user = db.query(User).filter(User.id == chat.user_id).first()
-    if not user:
-        raise ValueError("User not found")
+    if user_cache.get(chat.user_id) is None:
+        user = db.query(User).filter(User.id == chat.user_id).first()
+        if not user:
+            raise ValueError("User not found")
+        user_cache.put(user)
 
     new_chat = ChatMemory(
-        user_id=chat.user_id, 
-        question=chat.question, 
+        user_id=chat.user_id,
+        question=chat.question,
         answer=chat.answer
     )
     db.add(new_chat)
@@ -21,4 +30,107 @@ def save_chat_memory(db: Session, chat: ChatMemoryCreate):
 
 
 def get_user_chat_memory(db: Session, user_id):
-    return db.query(ChatMemory).filter(ChatMemory.user_id == user_id).order_by(ChatMemory.created_at.desc()).all()
\ No newline at end of file
+    return db.query(ChatMemory).filter(ChatMemory.user_id == user_id).order_by(ChatMemory.created_at.desc()).all()
+
+
+# ==================== ASYNC ====================
+
+def _page_key(row):
+    return row.created_at, row.id
+
+
+def _is_before(row, before, before_id) -> bool:
+    if before is None:
+        return True
+    if before_id is None:
+        return row.created_at < before
+    return _page_key(row) < (before, before_id)
+
+
+def with_pending_turns(rows, user_id, before=None, before_id=None):
+    """
+    Merge write-behind turns that haven't been flushed yet into `rows` (newest first),
+    so a user always sees their own latest turns. Rows already committed are skipped.
+    """
+    pending = chat_memory_writer.pending_for(user_id)
+    if not pending:
+        return rows
+    seen = {row.id for row in rows}
+    extra = [p for p in pending if p.id not in seen and _is_before(p, before, before_id)]
+    return sorted([*rows, *extra], key=_page_key, reverse=True)
+
+
+@traced("db.save_chat_memory")
+async def asave_chat_memory(db: AsyncSession, chat: ChatMemoryCreate):
+    if user_cache.get(chat.user_id) is None:
+        result = await db.execute(select(User).where(User.id == chat.user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise ValueError("User not found")
+        user_cache.put(user)
+
+    if settings.CHAT_WRITE_BEHIND_ENABLED:
+        # Queued and flushed in batches (the user is known, so the turn isn't dropped later)
+        return await chat_memory_writer.enqueue(chat)
+
+    new_chat = ChatMemory(
+        user_id=chat.user_id,
+        question=chat.question,
+        answer=chat.answer
+    )
+    db.add(new_chat)
+    await db.commit()
+    await db.refresh(new_chat)
+    return new_chat
+
+
+async def aget_user_chat_memory(db: AsyncSession, user_id):
+    result = await db.execute(
+        select(ChatMemory)
+        .where(ChatMemory.user_id == user_id)
+        .order_by(ChatMemory.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+@traced("db.load_history")
+async def aget_recent_chat_memory(db: AsyncSession, user_id, limit: int):
+    """Last `limit` turns for a user, oldest first (ready to replay into a prompt)"""
+    result = await db.execute(
+        select(ChatMemory)
+        .where(ChatMemory.user_id == user_id)
+        .order_by(ChatMemory.created_at.desc())
+        .limit(limit)
+    )
+    rows = with_pending_turns(result.scalars().all(), user_id)[:limit]
+    return list(reversed(rows))
+
+
+async def aget_chat_memory_page(db: AsyncSession, user_id, before=None, before_id=None, limit: int = 50):
+    """
+    Keyset page of a user's history, newest first.
+    The cursor is (created_at, id): rows strictly before (`before`, `before_id`) are
+    returned, so turns sharing a timestamp (write-behind batches stamp them together)
+    are never skipped, and each page is an index range scan on
+    (user_id, created_at DESC) no matter how deep the user pages. Without
+    `before_id` the cursor is created_at alone.
+    Returns (rows, next_before, next_before_id); both are None on the last page.
+    """
+    query = select(ChatMemory).where(ChatMemory.user_id == user_id)
+    if before is not None and before_id is not None:
+        # The plain created_at bound keeps the range scan; the tuple breaks ties by id
+        query = query.where(and_(
+            ChatMemory.created_at <= before,
+            tuple_(ChatMemory.created_at, ChatMemory.id) < tuple_(before, before_id)
+        ))
+    elif before is not None:
+        query = query.where(ChatMemory.created_at < before)
+    query = query.order_by(ChatMemory.created_at.desc(), ChatMemory.id.desc()).limit(limit + 1)
+
+    result = await db.execute(query)
+    rows = with_pending_turns(result.scalars().all(), user_id, before, before_id)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more and rows:
+        return rows, rows[-1].created_at, rows[-1].id
+    return rows, None, None
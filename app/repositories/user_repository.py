@@ -1,12 +1,27 @@
-from sqlalchemy.orm import Session # type: ignore
+from sqlalchemy.orm import Session, make_transient_to_detached # type: ignore
 from app.db.models.user_model import User
+from app.db.user_cache import user_cache
 from app.schemas.user_schema import UserCreate
 
+
+def cached_user(db: Session, user_id):
+    """User from the lookup cache, attached to `db` without a SELECT (None on a miss)"""
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        return None
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
 def get_users(db: Session):
     return db.query(User).all()
 
 def get_user_by_id(db: Session, user_id):
-    return db.query(User).filter(User.id == user_id).first()
+    user = cached_user(db, user_id)
+    if user is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        user_cache.put(user)
+    return user
 
 def create_user(db: Session, user: UserCreate):
     new_user = User(
@@ -20,6 +35,8 @@ def create_user(db: Session, user: UserCreate):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    # Fresh UUID -> nothing to invalidate elsewhere, just warm this worker
+    user_cache.put(new_user)
     return new_user
 
 def delete_user(db: Session, user_id):
@@ -27,6 +44,7 @@ def delete_user(db: Session, user_id):
     if user:
         db.delete(user)
         db.commit()
+        user_cache.invalidate(user_id)
     return user
 
 def update_user_profile_pic(db: Session, user_id, profile_pic_url: str):
@@ -37,4 +55,5 @@ def update_user_profile_pic(db: Session, user_id, profile_pic_url: str):
     db.add(user)
     db.commit()
     db.refresh(user)
-    return user
\ No newline at end of file
+    user_cache.invalidate(user_id)
+    return user
@@ -1,6 +1,6 @@
 # app/schemas/ai_schema.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 import uuid
 from datetime import datetime
 
@@ -24,3 +24,32 @@ class AIResponseOut(AIBase):
 
     class Config:
         from_attributes = True
+
+
+class AIBatchRequest(BaseModel):
+    prompts: List[str] = Field(..., min_length=1)
+    model_type: str = "auto"
+    concurrency: Optional[int] = Field(default=None, ge=1, description="Prompts in flight (capped by the server)")
+    hedge: Optional[bool] = None
+
+
+class AIBatchItem(BaseModel):
+    index: int
+    prompt: str
+    response: Optional[str] = None
+    model: Optional[str] = None
+    provider: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    error: Optional[str] = None
+    id: Optional[uuid.UUID] = None
+    created_at: Optional[datetime] = None
+
+
+class AIBatchResponse(BaseModel):
+    items: List[AIBatchItem]
+    succeeded: int
+    failed: int
+    rate_limit_pauses: int
+    seconds: float
@@ -35,7 +35,7 @@ Pydantic models for validation and serialization
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
-from pydantic import BaseModel, Field, validator
+from pydantic import AliasChoices, BaseModel, Field, validator
 
 
 class ChatLongMemoryBase(BaseModel):
@@ -60,9 +60,12 @@ class ChatLongMemoryBase(BaseModel):
         le=1.0,
         description="Importance score from 0.0 to 1.0"
     )
+    # "metadata" is reserved on SQLAlchemy models (the column is meta_data): read the field
+    # name first so ORM rows validate, accept "metadata" from API clients
     meta_data: Optional[Dict[str, Any]] = Field(
         default_factory=dict,
-        alias="metadata",
+        validation_alias=AliasChoices("meta_data", "metadata"),
+        serialization_alias="metadata",
         description="Additional metadata"
     )
 
@@ -82,6 +85,9 @@ class ChatLongMemoryBase(BaseModel):
             raise ValueError(f'Memory type must be one of: {", ".join(allowed_types)}')
         return v
 
+    class Config:
+        populate_by_name = True
+
 
 class ChatLongMemoryCreate(ChatLongMemoryBase):
     """Schema for creating a new memory"""
@@ -95,7 +101,8 @@ class ChatLongMemoryUpdate(BaseModel):
     importance_score: Optional[float] = Field(None, ge=0.0, le=1.0)
     meta_data: Optional[Dict[str, Any]] = Field(
         None,
-        alias="metadata",
+        validation_alias=AliasChoices("meta_data", "metadata"),
+        serialization_alias="metadata",
         description="Additional metadata update"
     )
 
@@ -116,7 +123,7 @@ class ChatLongMemoryResponse(ChatLongMemoryBase):
     last_used_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
         schema_extra = {
             "example": {
                 "id": "123e4567-e89b-12d3-a456-426614174000",
@@ -161,6 +168,19 @@ class ChatMemoryQueryResponse(BaseModel):
         }
 
 
+class MemorySearchHit(BaseModel):
+    """One full-text / trigram search match"""
+    memory: ChatLongMemoryResponse
+    score: float = Field(..., description="ts_rank_cd rank, or trigram similarity for substring matches")
+
+
+class MemorySearchResponse(BaseModel):
+    """Schema for returning ranked search results"""
+    hits: List[MemorySearchHit]
+    total_count: int
+    mode: str = Field(..., description="words, prefix, phrase or substring")
+
+
 class MemoryStatsResponse(BaseModel):
     """Schema for memory statistics"""
     total_memories: int
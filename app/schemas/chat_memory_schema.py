@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 
@@ -16,4 +17,9 @@ class ChatMemoryResponse(ChatMemoryBase):
     created_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ChatMemoryPage(BaseModel):
+    items: List[ChatMemoryResponse]
+    next_before: Optional[datetime] = None  # pass as ?before= to fetch the next (older) page
+    next_before_id: Optional[UUID] = None  # pass as ?before_id= alongside ?before=
@@ -1,7 +1,8 @@
 from dotenv import load_dotenv
 from app.core.config import settings
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+from app.core.client_registry import client_registry
+from app.core.embedding_cache import cached_openai_embeddings
+from app.core.resources import resources
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
@@ -9,25 +10,32 @@ import os
 
 load_dotenv()
 
-# Initialize embeddings
-embeddings = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)
-
-# Set up Chroma vector database
 CHROMA_PATH = "app/db/chroma_storage"
-vectorstore = Chroma(
-    persist_directory=CHROMA_PATH,
-    embedding_function=embeddings
-)
 
-# Create LLM
-llm = ChatOpenAI(
-    model=settings.OPENAI_MODEL,
-    temperature=0.3,
-    api_key=settings.OPENAI_API_KEY
-)
 
-# Retriever
-retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
+def _build_vectorstore():
+    from langchain_community.vectorstores import Chroma
+    # Embeddings are cached by content hash
+    return Chroma(persist_directory=CHROMA_PATH, embedding_function=cached_openai_embeddings())
+
+
+def _build_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=settings.OPENAI_MODEL,
+        temperature=0.3,
+        api_key=settings.OPENAI_API_KEY,
+        http_client=client_registry.http_client,
+        http_async_client=client_registry.async_http_client
+    )
+
+
+# Built on first use / during the lifespan warm-up, not at import
+vectorstore = resources.register("ai_memory.vectorstore", _build_vectorstore)
+llm = resources.register("ai_memory.llm", _build_llm)
+retriever = resources.register(
+    "ai_memory.retriever", lambda: vectorstore.get().as_retriever(search_kwargs={"k": 3})
+)
 
 # Create prompt
 prompt = ChatPromptTemplate.from_messages([
@@ -50,11 +58,11 @@ def chat_with_memory(question: str, chat_history: list):
             messages.append(item)
     
     # Retrieve relevant documents using invoke (newer method)
-    docs = retriever.invoke(question)
+    docs = retriever.get().invoke(question)
     context = "\n\n".join([doc.page_content for doc in docs])
     
     # Create chain
-    chain = prompt | llm | StrOutputParser()
+    chain = prompt | llm.get() | StrOutputParser()
     
     # Get response
     answer = chain.invoke({
@@ -1,43 +1,182 @@
 # app/services/ai_service.py
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+
 from app.core.config import settings
+from app.core.llm_router import Completion, is_rate_limited, llm_router
 from app.repositories.ai_repository import AIRepository
 from app.schemas.ai_schema import AIResponseCreate
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """The provider's Retry-After when it sent one, else exponential backoff"""
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        delay = float(header)
+    except (TypeError, ValueError):
+        delay = settings.AI_BATCH_BACKOFF * 2 ** attempt
+    return min(delay, settings.AI_BATCH_MAX_BACKOFF)
+
+
+class RateLimitGate:
+    """Shared by the workers of one batch: a 429 pauses all of them, not just the one that hit it"""
+
+    def __init__(self):
+        self._resume_at = 0.0
+        self.pauses = 0
+
+    async def wait(self):
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+        self.pauses += 1
+
+
+async def _complete_with_retries(prompt: str, model_type: str, hedge: Optional[bool],
+                                 semaphore: asyncio.Semaphore, gate: RateLimitGate) -> Completion:
+    async with semaphore:
+        for attempt in range(settings.AI_BATCH_MAX_RETRIES + 1):
+            await gate.wait()
+            try:
+                return await llm_router.complete(prompt, model_type, hedge=hedge)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == settings.AI_BATCH_MAX_RETRIES:
+                    raise
+                delay = retry_delay(e, attempt)
+                logger.warning("⏳ [AI-BATCH] Rate limited, pausing batch for %.1fs (attempt %s)", delay, attempt + 1)
+                gate.pause(delay)
+
+
+def _batch_item(index: int, prompt: str, outcome) -> dict:
+    item = {"index": index, "prompt": prompt, "id": None, "created_at": None}
+    if isinstance(outcome, Exception):
+        return {**item, "error": str(outcome) or type(outcome).__name__}
+    return {
+        **item,
+        "response": outcome.text,
+        "model": outcome.model,
+        "provider": outcome.provider,
+        "prompt_tokens": outcome.prompt_tokens,
+        "completion_tokens": outcome.completion_tokens,
+        "total_tokens": outcome.total_tokens,
+        "error": None,
+    }
+
 
 class AIService:
     @staticmethod
-    async def generate_response(db: Session, prompt: str, model_type: str):
-        # Select client and model based on type
-        if model_type.lower() == "openai":
-            response = settings.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            model_name = settings.OPENAI_MODEL
-        elif model_type.lower() == "groq":
-            response = settings.groq_client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            model_name = settings.GROQ_MODEL
-        else:
-            raise ValueError("Invalid model_type. Use 'openai' or 'groq'.")
-
-        # Extract usage safely
-        usage = response.usage if hasattr(response, "usage") else None
+    async def generate_response(db: Session, prompt: str, model_type: str, hedge: Optional[bool] = None):
+        # "openai" / "groq" pin the provider, "auto" lets the router pick (and hedge)
+        completion = await llm_router.complete(prompt, model_type, hedge=hedge)
 
         data = AIResponseCreate(
             prompt=prompt,
-            response=response.choices[0].message.content,
-            model=model_name,
-            prompt_tokens=usage.prompt_tokens if usage else None,
-            completion_tokens=usage.completion_tokens if usage else None,
-            total_tokens=usage.total_tokens if usage else None,
+            response=completion.text,
+            model=completion.model,
+            prompt_tokens=completion.prompt_tokens,
+            completion_tokens=completion.completion_tokens,
+            total_tokens=completion.total_tokens,
         )
 
         return AIRepository.create_response(db, data)
 
+    @staticmethod
+    def check_batch(prompts: List[str], model_type: str):
+        """ValueError for a batch that can't run (checked before anything is sent)"""
+        if len(prompts) > settings.AI_BATCH_MAX_PROMPTS:
+            raise ValueError(f"At most {settings.AI_BATCH_MAX_PROMPTS} prompts per batch")
+        llm_router.check_model_type(model_type)
+
+    @staticmethod
+    async def stream_batch(
+        db: Session,
+        prompts: List[str],
+        model_type: str = "auto",
+        concurrency: Optional[int] = None,
+        hedge: Optional[bool] = None
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Run a batch of prompts concurrently.
+        Async generator of ("result", item) pairs in completion order, then one
+        ("done", summary) once the successful results are saved with a single
+        multi-row insert. A failed prompt is reported in its item and not saved.
+        Closing the generator early cancels the prompts still in flight.
+        """
+        AIService.check_batch(prompts, model_type)
+        concurrency = min(concurrency or settings.AI_BATCH_CONCURRENCY, settings.AI_BATCH_MAX_CONCURRENCY)
+        semaphore = asyncio.Semaphore(concurrency)
+        gate = RateLimitGate()
+        started = time.perf_counter()
+        items: List[Optional[dict]] = [None] * len(prompts)
+
+        async def run(index: int):
+            try:
+                return index, await _complete_with_retries(prompts[index], model_type, hedge, semaphore, gate)
+            except Exception as e:
+                return index, e
+
+        tasks = [asyncio.ensure_future(run(index)) for index in range(len(prompts))]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, outcome = await next_done
+                items[index] = _batch_item(index, prompts[index], outcome)
+                yield "result", items[index]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        succeeded = [item for item in items if item["error"] is None]
+        saved = await asyncio.to_thread(AIRepository.create_responses, db, [
+            AIResponseCreate(
+                prompt=item["prompt"],
+                response=item["response"],
+                model=item["model"],
+                prompt_tokens=item["prompt_tokens"],
+                completion_tokens=item["completion_tokens"],
+                total_tokens=item["total_tokens"],
+            )
+            for item in succeeded
+        ])
+        for item, (row_id, created_at) in zip(succeeded, saved):
+            item["id"], item["created_at"] = row_id, created_at
+
+        seconds = round(time.perf_counter() - started, 3)
+        logger.info("📦 [AI-BATCH] %s prompts (%s ok, %s failed) in %.1fs, concurrency %s, %s rate-limit pauses",
+                    len(prompts), len(succeeded), len(prompts) - len(succeeded), seconds, concurrency, gate.pauses)
+        yield "done", {
+            "ids": [item["id"] for item in items],
+            "succeeded": len(succeeded),
+            "failed": len(prompts) - len(succeeded),
+            "rate_limit_pauses": gate.pauses,
+            "seconds": seconds,
+        }
+
+    @staticmethod
+    async def generate_batch(
+        db: Session,
+        prompts: List[str],
+        model_type: str = "auto",
+        concurrency: Optional[int] = None,
+        hedge: Optional[bool] = None
+    ) -> dict:
+        """stream_batch, collected: every item in prompt order plus the summary"""
+        items = [None] * len(prompts)
+        async for event, data in AIService.stream_batch(db, prompts, model_type, concurrency, hedge):
+            if event == "result":
+                items[data["index"]] = data
+            else:
+                summary = {key: value for key, value in data.items() if key != "ids"}
+        return {"items": items, **summary}
+
     @staticmethod
     async def get_all_responses(db: Session):
         return AIRepository.get_all_responses(db)
@@ -7,9 +7,15 @@ from typing import List, Optional
 from uuid import UUID
 import logging
 
+from app.core.config import settings
+from app.core.embedding_cache import cached_openai_embeddings
+from app.core.intent import detect_intent
+from app.core.tracing import span
+from app.core.resources import resources
 from app.core.openai_client import get_ai_response
 from app.core.tavily_client import fetch_realtime_data
 from app.repositories.chat_long_memory_repository import (
+    CHAT_TURN_SOURCE,
     create_chat_long_memory,
     get_memory_by_id,
     get_recent_memories,
@@ -17,7 +23,7 @@ from app.repositories.chat_long_memory_repository import (
     get_memories_by_type,
     get_important_memories,
     search_memories_by_content,
-    update_last_used,
+    search_similar_memories,
     update_memory_importance as repo_update_importance,
     update_memory,
     delete_memory,
@@ -26,17 +32,34 @@ from app.repositories.chat_long_memory_repository import (
     get_memory_count,
     get_memory_stats
 )
+from app.db.memory_access_buffer import memory_access_buffer
 from app.schemas.chat_long_memory_schema import (
     ChatLongMemoryCreate,
     ChatLongMemoryUpdate,
     ChatLongMemoryResponse,
     ChatMemoryQueryResponse,
+    MemorySearchHit,
+    MemorySearchResponse,
     MemoryStatsResponse,
     MemoryCleanupResponse
 )
 
 logger = logging.getLogger(__name__)
 
+# Same model as the sharmaji chat's question embeddings, so one embedding serves both
+memory_embeddings = resources.register("memory.embeddings", cached_openai_embeddings)
+
+
+def embed_memory_text(text: str) -> Optional[List[float]]:
+    """Embedding for a memory, or None if the call fails (the memory is still saved)"""
+    try:
+        with span("embed"):
+            return memory_embeddings.get().embed_query(text)
+    except Exception as e:
+        logger.warning("⚠️ [SERVICE] Memory embedding failed: %s", e)
+        return None
+
+
 class ChatLongMemoryService:
     """Service layer for managing long-term chat memories"""
 
@@ -48,7 +71,8 @@ class ChatLongMemoryService:
         role: str = "system",
         memory_type: str = "summary",
         importance_score: float = 0.5,
-        meta_data: Optional[dict] = None
+        meta_data: Optional[dict] = None,
+        embedding: Optional[List[float]] = None
     ) -> ChatLongMemoryResponse:
         """
         Create a new long-term memory entry
@@ -60,12 +84,13 @@ class ChatLongMemoryService:
             memory_type: Type of memory (summary/fact/reflection/note)
             importance_score: Importance rating (0.0 to 1.0)
             meta_data: Additional metadata
+            embedding: Content embedding if the caller already has one (computed otherwise)
         Returns:
             ChatLongMemoryResponse object
         """
         try:
-            print(f"💾 [SERVICE] Creating memory for user {user_id}")
-            print(f"📝 [SERVICE] Type: {memory_type}, Role: {role}, Importance: {importance_score}")
+            logger.info("💾 [SERVICE] Creating memory for user %s", user_id)
+            logger.debug("📝 [SERVICE] Type: %s, Role: %s, Importance: %s", memory_type, role, importance_score)
             memory_data = ChatLongMemoryCreate(
                 user_id=user_id,
                 role=role,
@@ -74,12 +99,13 @@ class ChatLongMemoryService:
                 importance_score=importance_score,
                 meta_data=meta_data or {}
             )
-            new_memory = create_chat_long_memory(db, memory_data)
-            print(f"✅ [SERVICE] Memory created with ID: {new_memory.id}")
+            if embedding is None:
+                embedding = embed_memory_text(content)
+            new_memory = create_chat_long_memory(db, memory_data, embedding)
+            logger.info("✅ [SERVICE] Memory created with ID: %s", new_memory.id)
             return ChatLongMemoryResponse.from_orm(new_memory)
         except Exception as e:
-            logger.error(f"Error creating memory: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error creating memory: %s", e)
             raise
 
     @staticmethod
@@ -95,11 +121,11 @@ class ChatLongMemoryService:
         try:
             memory = get_memory_by_id(db, memory_id)
             if memory:
-                update_last_used(db, memory_id)
+                memory_access_buffer.record(db, [memory.id])
                 return ChatLongMemoryResponse.from_orm(memory)
             return None
         except Exception as e:
-            logger.error(f"Error fetching memory: {e}")
+            logger.error("Error fetching memory: %s", e)
             raise
 
     @staticmethod
@@ -118,16 +144,53 @@ class ChatLongMemoryService:
             ChatMemoryQueryResponse with list of memories
         """
         try:
-            print(f"🔍 [SERVICE] Fetching {limit} recent memories for user {user_id}")
+            logger.info("🔍 [SERVICE] Fetching %s recent memories for user %s", limit, user_id)
             memories = get_recent_memories(db, user_id, limit)
-            print(f"✅ [SERVICE] Found {len(memories)} memories")
-            # Update last_used_at for fetched memories
-            for memory in memories:
-                update_last_used(db, memory.id)
+            logger.info("✅ [SERVICE] Found %s memories", len(memories))
+            # Mark fetched memories as used (buffered, one bulk UPDATE per flush)
+            memory_access_buffer.record(db, [memory.id for memory in memories])
             return ChatMemoryQueryResponse(memories=memories)
         except Exception as e:
-            logger.error(f"Error fetching recent memories: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error fetching recent memories: %s", e)
+            raise
+
+    @staticmethod
+    def get_relevant_memories(
+        db: Session,
+        user_id: UUID,
+        query_embedding: Optional[List[float]],
+        limit: int = None,
+        recent_limit: int = None
+    ) -> ChatMemoryQueryResponse:
+        """
+        Memories most similar to the current message plus the latest few
+        
+        Args:
+            db: Database session
+            user_id: User's UUID
+            query_embedding: Embedding of the current message (None = recent only)
+            limit: Number of similar memories (MEMORY_RETRIEVAL_TOP_K)
+            recent_limit: Number of latest memories kept for continuity (MEMORY_RETRIEVAL_RECENT)
+        
+        Returns:
+            ChatMemoryQueryResponse, oldest first so it replays as a conversation
+        """
+        try:
+            limit = limit or settings.MEMORY_RETRIEVAL_TOP_K
+            recent_limit = recent_limit or settings.MEMORY_RETRIEVAL_RECENT
+            selected = {m.id: m for m in get_recent_memories(db, user_id, recent_limit)}
+            if query_embedding is not None:
+                similar = search_similar_memories(
+                    db, user_id, query_embedding, limit, settings.MEMORY_RETRIEVAL_MIN_SCORE
+                )
+                logger.info("🔍 [SERVICE] %s similar memories for user %s", len(similar), user_id)
+                for memory, _score in similar:
+                    selected.setdefault(memory.id, memory)
+            memories = sorted(selected.values(), key=lambda m: m.created_at)
+            memory_access_buffer.record(db, list(selected))
+            return ChatMemoryQueryResponse(memories=memories, total_count=len(memories))
+        except Exception as e:
+            logger.error("Error fetching relevant memories: %s", e)
             raise
 
     @staticmethod
@@ -146,10 +209,10 @@ class ChatLongMemoryService:
             ChatMemoryQueryResponse with all memories
         """
         try:
-            print(f"🔍 [SERVICE] Fetching all memories for user {user_id}")
+            logger.info("🔍 [SERVICE] Fetching all memories for user %s", user_id)
             
             memories = get_all_memories(db, user_id)
-            print(f"✅ [SERVICE] Found {len(memories)} total memories")
+            logger.info("✅ [SERVICE] Found %s total memories", len(memories))
             
             response = ChatMemoryQueryResponse(
                 memories=[ChatLongMemoryResponse.from_orm(m) for m in memories],
@@ -159,8 +222,7 @@ class ChatLongMemoryService:
             return response
             
         except Exception as e:
-            logger.error(f"Error fetching all memories: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error fetching all memories: %s", e)
             raise
 
     @staticmethod
@@ -183,10 +245,10 @@ class ChatLongMemoryService:
             ChatMemoryQueryResponse with filtered memories
         """
         try:
-            print(f"🔍 [SERVICE] Fetching {memory_type} memories for user {user_id}")
+            logger.info("🔍 [SERVICE] Fetching %s memories for user %s", memory_type, user_id)
             
             memories = get_memories_by_type(db, user_id, memory_type, limit)
-            print(f"✅ [SERVICE] Found {len(memories)} {memory_type} memories")
+            logger.info("✅ [SERVICE] Found %s %s memories", len(memories), memory_type)
             
             response = ChatMemoryQueryResponse(
                 memories=[ChatLongMemoryResponse.from_orm(m) for m in memories],
@@ -196,8 +258,7 @@ class ChatLongMemoryService:
             return response
             
         except Exception as e:
-            logger.error(f"Error fetching memories by type: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error fetching memories by type: %s", e)
             raise
 
     @staticmethod
@@ -220,10 +281,11 @@ class ChatLongMemoryService:
             ChatMemoryQueryResponse with important memories
         """
         try:
-            print(f"🔍 [SERVICE] Fetching important memories (>= {min_importance}) for user {user_id}")
+            logger.info("🔍 [SERVICE] Fetching important memories (>= %s) for user %s", min_importance, user_id)
             
             memories = get_important_memories(db, user_id, min_importance, limit)
-            print(f"✅ [SERVICE] Found {len(memories)} important memories")
+            logger.info("✅ [SERVICE] Found %s important memories", len(memories))
+            memory_access_buffer.record(db, [memory.id for memory in memories])
             
             response = ChatMemoryQueryResponse(
                 memories=[ChatLongMemoryResponse.from_orm(m) for m in memories],
@@ -233,8 +295,7 @@ class ChatLongMemoryService:
             return response
             
         except Exception as e:
-            logger.error(f"Error fetching important memories: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error fetching important memories: %s", e)
             raise
 
     @staticmethod
@@ -242,36 +303,41 @@ class ChatLongMemoryService:
         db: Session,
         user_id: UUID,
         search_term: str,
-        limit: int = 20
-    ) -> ChatMemoryQueryResponse:
+        limit: int = 20,
+        mode: str = "words"
+    ) -> MemorySearchResponse:
         """
-        Search memories by content
+        Search memories by content, best match first
         
         Args:
             db: Database session
             user_id: User's UUID
             search_term: Text to search for
             limit: Maximum results
+            mode: words, prefix, phrase or substring (see search_memories_by_content)
         
         Returns:
-            ChatMemoryQueryResponse with matching memories
+            MemorySearchResponse with ranked hits
         """
         try:
-            print(f"🔍 [SERVICE] Searching memories for '{search_term}' (user {user_id})")
+            logger.info("🔍 [SERVICE] Searching memories for '%s' (user %s, mode %s)", search_term, user_id, mode)
             
-            memories = search_memories_by_content(db, user_id, search_term, limit)
-            print(f"✅ [SERVICE] Found {len(memories)} matching memories")
+            matches = search_memories_by_content(db, user_id, search_term, limit, mode)
+            logger.info("✅ [SERVICE] Found %s matching memories", len(matches))
             
-            response = ChatMemoryQueryResponse(
-                memories=[ChatLongMemoryResponse.from_orm(m) for m in memories],
-                total_count=len(memories)
+            response = MemorySearchResponse(
+                hits=[
+                    MemorySearchHit(memory=ChatLongMemoryResponse.from_orm(m), score=score)
+                    for m, score in matches
+                ],
+                total_count=len(matches),
+                mode=mode
             )
             
             return response
             
         except Exception as e:
-            logger.error(f"Error searching memories: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error searching memories: %s", e)
             raise
 
     @staticmethod
@@ -292,20 +358,19 @@ class ChatLongMemoryService:
             Updated ChatLongMemoryResponse or None
         """
         try:
-            print(f"🔄 [SERVICE] Updating importance for memory {memory_id} to {new_importance}")
+            logger.info("🔄 [SERVICE] Updating importance for memory %s to %s", memory_id, new_importance)
             
             memory = repo_update_importance(db, memory_id, new_importance)
             
             if not memory:
-                print(f"⚠️ [SERVICE] Memory {memory_id} not found")
+                logger.warning("⚠️ [SERVICE] Memory %s not found", memory_id)
                 return None
             
-            print(f"✅ [SERVICE] Importance updated to {memory.importance_score}")
+            logger.info("✅ [SERVICE] Importance updated to %s", memory.importance_score)
             return ChatLongMemoryResponse.from_orm(memory)
             
         except Exception as e:
-            logger.error(f"Error updating memory importance: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error updating memory importance: %s", e)
             raise
 
     @staticmethod
@@ -326,20 +391,20 @@ class ChatLongMemoryService:
             Updated ChatLongMemoryResponse or None
         """
         try:
-            print(f"🔄 [SERVICE] Updating memory {memory_id}")
+            logger.info("🔄 [SERVICE] Updating memory %s", memory_id)
             
-            memory = update_memory(db, memory_id, update_data)
+            embedding = embed_memory_text(update_data.content) if update_data.content else None
+            memory = update_memory(db, memory_id, update_data, embedding)
             
             if not memory:
-                print(f"⚠️ [SERVICE] Memory {memory_id} not found")
+                logger.warning("⚠️ [SERVICE] Memory %s not found", memory_id)
                 return None
             
-            print(f"✅ [SERVICE] Memory updated successfully")
+            logger.info("✅ [SERVICE] Memory updated successfully")
             return ChatLongMemoryResponse.from_orm(memory)
             
         except Exception as e:
-            logger.error(f"Error updating memory: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error updating memory: %s", e)
             raise
 
     @staticmethod
@@ -355,20 +420,19 @@ class ChatLongMemoryService:
             True if deleted, False if not found
         """
         try:
-            print(f"🗑️ [SERVICE] Deleting memory {memory_id}")
+            logger.info("🗑️ [SERVICE] Deleting memory %s", memory_id)
             
             deleted = delete_memory(db, memory_id)
             
             if deleted:
-                print(f"✅ [SERVICE] Memory deleted successfully")
+                logger.info("✅ [SERVICE] Memory deleted successfully")
             else:
-                print(f"⚠️ [SERVICE] Memory {memory_id} not found")
+                logger.warning("⚠️ [SERVICE] Memory %s not found", memory_id)
             
             return deleted
             
         except Exception as e:
-            logger.error(f"Error deleting memory: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error deleting memory: %s", e)
             raise
 
     @staticmethod
@@ -391,11 +455,11 @@ class ChatLongMemoryService:
             MemoryCleanupResponse with deletion count
         """
         try:
-            print(f"🗑️ [SERVICE] Cleaning up old memories for user {user_id}")
-            print(f"📅 [SERVICE] Days old: {days_old}, Min importance: {min_importance}")
+            logger.info("🗑️ [SERVICE] Cleaning up old memories for user %s", user_id)
+            logger.debug("📅 [SERVICE] Days old: %s, Min importance: %s", days_old, min_importance)
             
             deleted_count = repo_delete_old(db, user_id, days_old, min_importance)
-            print(f"✅ [SERVICE] Deleted {deleted_count} old memories")
+            logger.info("✅ [SERVICE] Deleted %s old memories", deleted_count)
             
             return MemoryCleanupResponse(
                 message=f"Successfully deleted {deleted_count} old memories",
@@ -403,8 +467,7 @@ class ChatLongMemoryService:
             )
             
         except Exception as e:
-            logger.error(f"Error deleting old memories: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error deleting old memories: %s", e)
             raise
 
     @staticmethod
@@ -420,10 +483,10 @@ class ChatLongMemoryService:
             MemoryCleanupResponse with deletion count
         """
         try:
-            print(f"🗑️ [SERVICE] Deleting ALL memories for user {user_id}")
+            logger.info("🗑️ [SERVICE] Deleting ALL memories for user %s", user_id)
             
             deleted_count = delete_all_user_memories(db, user_id)
-            print(f"✅ [SERVICE] Deleted {deleted_count} memories")
+            logger.info("✅ [SERVICE] Deleted %s memories", deleted_count)
             
             return MemoryCleanupResponse(
                 message=f"Successfully deleted all {deleted_count} memories",
@@ -431,8 +494,7 @@ class ChatLongMemoryService:
             )
             
         except Exception as e:
-            logger.error(f"Error deleting all memories: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error deleting all memories: %s", e)
             raise
 
     @staticmethod
@@ -448,16 +510,15 @@ class ChatLongMemoryService:
             MemoryStatsResponse with statistics
         """
         try:
-            print(f"📊 [SERVICE] Fetching memory stats for user {user_id}")
+            logger.info("📊 [SERVICE] Fetching memory stats for user %s", user_id)
             
             stats = get_memory_stats(db, user_id)
-            print(f"✅ [SERVICE] Stats retrieved successfully")
+            logger.info("✅ [SERVICE] Stats retrieved successfully")
             
             return MemoryStatsResponse(**stats)
             
         except Exception as e:
-            logger.error(f"Error fetching memory stats: {e}")
-            print(f"❌ [SERVICE ERROR] {e}")
+            logger.error("Error fetching memory stats: %s", e)
             raise
 
 
@@ -471,30 +532,22 @@ from app.repositories.chat_memory_repository import get_user_chat_memory, save_c
 from app.schemas.chat_memory_schema import ChatMemoryCreate
 from langchain_core.messages import HumanMessage, AIMessage
 from app.core.config import settings
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from uuid import UUID
-from langchain_community.tools import DuckDuckGoSearchRun
-import traceback
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-# 🧠 Initialize LLM and Vector DB
-try:
-    embeddings = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)
-    CHROMA_PATH = "app/db/chroma_storage"
-    vectorstore = Chroma(persist_directory=CHROMA_PATH, embedding_function=embeddings)
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-    llm = ChatOpenAI(model=settings.OPENAI_MODEL, temperature=0.3, api_key=settings.OPENAI_API_KEY)
-    search_tool = DuckDuckGoSearchRun()
-    logger.info("✅ All tools initialized successfully")
-except Exception as init_error:
-    logger.error(f"❌ Initialization error: {init_error}")
-    logger.debug(traceback.format_exc())
+
+def _build_search_tool():
+    from langchain_community.tools import DuckDuckGoSearchRun
+    return DuckDuckGoSearchRun()
+
+
+# 🧠 DuckDuckGo search tool (the LLM and retriever are the lazy resources defined below)
+search_tool = resources.register("long_memory.search_tool", _build_search_tool, warm=False)
 
 # 💬 System Prompt
 prompt = ChatPromptTemplate.from_messages([
@@ -572,11 +625,11 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
     Sharma Ji bot with memory + retrieval + real-time search capability.
     """
     try:
-        logger.info(f"📝 Processing question for user {user_id}: {question}")
+        logger.info("📝 Processing question for user %s: %s", user_id, question)
         
         # Get current datetime
         current_info = get_current_datetime_info()
-        logger.info(f"📅 Current date: {current_info['date']}")
+        logger.info("📅 Current date: %s", current_info['date'])
         
         # 🧠 Load previous messages from DB
         try:
@@ -585,16 +638,14 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
             for item in db_history:
                 messages.append(HumanMessage(content=item.question))
                 messages.append(AIMessage(content=item.answer))
-            logger.info(f"✅ Loaded {len(messages)} previous messages")
+            logger.info("✅ Loaded %s previous messages", len(messages))
         except Exception as history_error:
-            logger.error(f"❌ Error loading chat history: {history_error}")
+            logger.error("❌ Error loading chat history: %s", history_error)
             messages = []
 
         # 🗓️ Direct date/time questions - don't even search
-        date_time_keywords = ["aaj ki date", "today date", "aaj ka din", "current date", "kya tarikh", 
-                              "aaj kya date", "date kya hai", "time kya hai", "aaj ka time"]
-        
-        if any(keyword in question.lower() for keyword in date_time_keywords):
+        intent = detect_intent(question)
+        if intent.date_time:
             logger.info("📅 Direct date/time question - using system time")
             
             # Generate response directly with current date
@@ -611,7 +662,7 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
                 save_chat_memory(db, chat_data)
                 logger.info("✅ Chat saved to database")
             except Exception as db_error:
-                logger.error(f"❌ Database save error: {db_error}")
+                logger.error("❌ Database save error: %s", db_error)
             
             return {
                 "answer": direct_answer,
@@ -620,28 +671,26 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
             }
 
         # 🌍 Detect if question needs real-time info (other than date/time)
-        realtime_keywords = [
-            "latest", "current", "now", "news", "weather",
-            "score", "who is", "what is", "recent", "update", "2024", "2025"
-        ]
-        needs_search = any(keyword in question.lower() for keyword in realtime_keywords)
+        needs_search = intent.realtime
 
         # 🔎 Perform real-time search if needed
         if needs_search:
-            logger.info(f"🔍 Real-time search triggered for: {question}")
+            logger.info("🔍 Real-time search triggered for: %s", question)
             try:
                 # Enhance search query with current date for better results
                 enhanced_query = f"{question} {current_info['date']}"
-                search_results = search_tool.run(enhanced_query)
-                logger.info(f"✅ Search results retrieved: {len(search_results)} chars")
+                with span("tavily"):
+                    search_results = search_tool.get().run(enhanced_query)
+                logger.info("✅ Search results retrieved: %s chars", len(search_results))
 
                 # Create answer using search results with current date context
-                search_chain = search_prompt | llm | StrOutputParser()
-                search_answer = search_chain.invoke({
-                    "question": question,
-                    "search_results": search_results,
-                    "current_date": current_info['date']
-                })
+                search_chain = search_prompt | llm.get() | StrOutputParser()
+                with span("llm"):
+                    search_answer = search_chain.invoke({
+                        "question": question,
+                        "search_results": search_results,
+                        "current_date": current_info['date']
+                    })
                 logger.info("✅ Search answer generated")
 
                 # Save chat to DB
@@ -654,8 +703,8 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
                     save_chat_memory(db, chat_data)
                     logger.info("✅ Chat saved to database")
                 except Exception as db_error:
-                    logger.error(f"❌ Database save error: {db_error}")
-                    logger.debug(traceback.format_exc())
+                    logger.error("❌ Database save error: %s", db_error)
+                    logger.debug("Traceback", exc_info=True)
 
                 return {
                     "answer": search_answer,
@@ -664,33 +713,35 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
                 }
 
             except Exception as search_error:
-                logger.error(f"❌ Search failed: {search_error}")
-                logger.debug(traceback.format_exc())
+                logger.error("❌ Search failed: %s", search_error)
+                logger.debug("Traceback", exc_info=True)
                 # Continue to regular flow if search fails
 
         # 📚 Retrieve related docs from vector DB (for non-search queries or search fallback)
         try:
-            docs = retriever.invoke(question)
+            with span("vector"):
+                docs = retriever.get().invoke(question)
             context = "\n\n".join([doc.page_content for doc in docs]) if docs else "No relevant context found."
-            logger.info(f"✅ Retrieved {len(docs)} documents from vector DB")
+            logger.info("✅ Retrieved %s documents from vector DB", len(docs))
         except Exception as retriever_error:
-            logger.error(f"❌ Retriever error: {retriever_error}")
-            logger.debug(traceback.format_exc())
+            logger.error("❌ Retriever error: %s", retriever_error)
+            logger.debug("Traceback", exc_info=True)
             docs = []
             context = "No context available."
 
         # 🧩 Run through prompt chain
         try:
-            chain = prompt | llm | StrOutputParser()
-            answer = chain.invoke({
-                "input": question,
-                "chat_history": messages,
-                "context": context
-            })
+            chain = prompt | llm.get() | StrOutputParser()
+            with span("llm"):
+                answer = chain.invoke({
+                    "input": question,
+                    "chat_history": messages,
+                    "context": context
+                })
             logger.info("✅ Answer generated successfully")
         except Exception as chain_error:
-            logger.error(f"❌ Chain execution error: {chain_error}")
-            logger.debug(traceback.format_exc())
+            logger.error("❌ Chain execution error: %s", chain_error)
+            logger.debug("Traceback", exc_info=True)
             raise
 
         # 💾 Save chat to DB
@@ -703,8 +754,8 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
             save_chat_memory(db, chat_data)
             logger.info("✅ Chat saved to database")
         except Exception as db_error:
-            logger.error(f"❌ Database save error: {db_error}")
-            logger.debug(traceback.format_exc())
+            logger.error("❌ Database save error: %s", db_error)
+            logger.debug("Traceback", exc_info=True)
 
         return {
             "answer": answer,
@@ -713,9 +764,9 @@ def chat_with_memory_db(db: Session, user_id: UUID, question: str):
         }
 
     except Exception as e:
-        logger.error(f"❌ Critical error in chat_with_memory_db: {e}")
-        logger.error(f"Error type: {type(e).__name__}")
-        logger.error(traceback.format_exc())
+        logger.error("❌ Critical error in chat_with_memory_db: %s", e)
+        logger.error("Error type: %s", type(e).__name__)
+        logger.debug("Traceback", exc_info=True)
         
         return {
             "answer": f"Sorry, maine ek technical error encounter kiya: {str(e)}. Please try again!",
@@ -735,48 +786,48 @@ from app.repositories.chat_memory_repository import get_user_chat_memory, save_c
 from app.schemas.chat_memory_schema import ChatMemoryCreate
 from langchain_core.messages import HumanMessage, AIMessage
 from app.core.config import settings
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+from app.core.openai_client import stream_ai_response
+from app.core.token_budget import count_tokens
+from app.core.semantic_cache import get_response_cache, ttl_for
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
-from tavily import TavilyClient
 from uuid import UUID
-import traceback
+import asyncio
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-# Initialize LLM, Vectorstore, and Tavily Search
-try:
-    print("🔧 [INIT] Starting initialization...")
-    embeddings = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)
-    CHROMA_PATH = "app/db/chroma_storage_new"
-    print(f"📁 [INIT] Chroma path: {CHROMA_PATH}")
-
-    vectorstore = Chroma(
-        persist_directory=CHROMA_PATH,
-        embedding_function=embeddings
-    )
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-    print("✅ [INIT] Vectorstore initialized")
-
-    llm = ChatOpenAI(
-        model=settings.OPENAI_MODEL,
-        temperature=0.3,
-        api_key=settings.OPENAI_API_KEY
-    )
-    print(f"✅ [INIT] LLM initialized: {settings.OPENAI_MODEL}")
-
-    tavily_client = TavilyClient(api_key=settings.TAVILY_API_KEY)
-    print("✅ [INIT] Tavily Search initialized successfully")
-    logger.info("Tavily Search initialized successfully")
-
-except Exception as init_error:
-    print(f"❌ [INIT ERROR] {init_error}")
-    logger.error(f"Initialization error: {init_error}")
-    logger.debug(traceback.format_exc())
-    raise
+CHROMA_PATH = "app/db/chroma_storage_new"
+
+
+def _build_vectorstore():
+    from langchain_community.vectorstores import Chroma
+    logger.info("📁 [INIT] Chroma path: %s", CHROMA_PATH)
+    return Chroma(persist_directory=CHROMA_PATH, embedding_function=embeddings.get())
+
+
+def _build_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=settings.OPENAI_MODEL, temperature=0.3, api_key=settings.OPENAI_API_KEY)
+
+
+def _build_tavily_client():
+    from tavily import TavilyClient
+    return TavilyClient(api_key=settings.TAVILY_API_KEY)
+
+
+# LLM, Vectorstore and Tavily Search: built on first use. Sharma Ji only needs the
+# embeddings (warmed with memory.embeddings); the rest serves chat_with_memory_db.
+embeddings = memory_embeddings
+vectorstore = resources.register("long_memory.vectorstore", _build_vectorstore, warm=False)
+retriever = resources.register(
+    "long_memory.retriever", lambda: vectorstore.get().as_retriever(search_kwargs={"k": 3}), warm=False
+)
+llm = resources.register("long_memory.llm", _build_llm, warm=False)
+tavily_client = resources.register("long_memory.tavily", _build_tavily_client, warm=False)
+
+sharmaji_response_cache = get_response_cache("sharmaji")
 
 # System Prompt (Hinglish + Personality)
 prompt = ChatPromptTemplate.from_messages([
@@ -822,7 +873,7 @@ def get_current_datetime_info():
         "time": now.strftime("%I:%M %p"),
         "day": now.strftime("%A"),
     }
-    print(f"📅 [TIME] Current info: {info}")
+    logger.debug("📅 [TIME] Current info: %s", info)
     return info
 
 
@@ -832,45 +883,43 @@ def extract_content_from_doc(doc):
     Handles Document objects, dicts, and strings.
     """
     try:
-        print(f"📄 [DOC] Extracting content from type: {type(doc)}")
+        logger.debug("📄 [DOC] Extracting content from type: %s", type(doc))
         
         # Case 1: Document object with page_content attribute
         if hasattr(doc, "page_content"):
             content = str(doc.page_content).strip()
-            print(f"✅ [DOC] Extracted from page_content attribute: {content[:50]}...")
+            logger.debug("✅ [DOC] Extracted from page_content attribute: %s...", content[:50])
             return content
         
         # Case 2: Dictionary with page_content key
         elif isinstance(doc, dict):
-            print(f"🔑 [DOC] Dict keys: {list(doc.keys())}")
+            logger.debug("🔑 [DOC] Dict keys: %s", list(doc.keys()))
             if "page_content" in doc:
                 content = str(doc["page_content"]).strip()
-                print(f"✅ [DOC] Extracted from page_content key: {content[:50]}...")
+                logger.debug("✅ [DOC] Extracted from page_content key: %s...", content[:50])
                 return content
             elif "content" in doc:
                 content = str(doc["content"]).strip()
-                print(f"✅ [DOC] Extracted from content key: {content[:50]}...")
+                logger.debug("✅ [DOC] Extracted from content key: %s...", content[:50])
                 return content
             else:
                 content = str(doc).strip()
-                print(f"⚠️ [DOC] No content key, using string repr: {content[:50]}...")
+                logger.warning("⚠️ [DOC] No content key, using string repr: %s...", content[:50])
                 return content
         
         # Case 3: Plain string
         elif isinstance(doc, str):
-            print(f"✅ [DOC] Already a string: {doc[:50]}...")
+            logger.debug("✅ [DOC] Already a string: %s...", doc[:50])
             return doc.strip()
         
         # Case 4: Unknown type, convert to string
         else:
             content = str(doc).strip()
-            print(f"⚠️ [DOC] Unknown type, converting to string: {content[:50]}...")
-            logger.warning(f"Unknown document type: {type(doc)}")
+            logger.warning("Unknown document type: %s", type(doc))
             return content
             
     except Exception as e:
-        print(f"❌ [DOC ERROR] {e}")
-        logger.error(f"Error extracting content from doc: {e}")
+        logger.error("Error extracting content from doc: %s", e)
         return ""
 
 
@@ -879,12 +928,12 @@ def serialize_docs(docs):
     Convert documents to JSON-serializable format.
     Returns a list of dicts with content and metadata.
     """
-    print(f"🔄 [SERIALIZE] Starting serialization of {len(docs)} docs")
+    logger.debug("🔄 [SERIALIZE] Starting serialization of %s docs", len(docs))
     serialized = []
     
     for i, doc in enumerate(docs):
         try:
-            print(f"🔄 [SERIALIZE] Doc {i}: type={type(doc)}")
+            logger.debug("🔄 [SERIALIZE] Doc %s: type=%s", i, type(doc))
             
             # Extract content
             content = extract_content_from_doc(doc)
@@ -893,73 +942,77 @@ def serialize_docs(docs):
             metadata = {}
             if hasattr(doc, "metadata"):
                 metadata = doc.metadata
-                print(f"📋 [SERIALIZE] Doc {i}: Found metadata attribute")
+                logger.debug("📋 [SERIALIZE] Doc %s: Found metadata attribute", i)
             elif isinstance(doc, dict) and "metadata" in doc:
                 metadata = doc["metadata"]
-                print(f"📋 [SERIALIZE] Doc {i}: Found metadata key")
+                logger.debug("📋 [SERIALIZE] Doc %s: Found metadata key", i)
             
             result = {
                 "content": content,
                 "metadata": metadata
             }
             serialized.append(result)
-            print(f"✅ [SERIALIZE] Doc {i}: Successfully serialized")
+            logger.debug("✅ [SERIALIZE] Doc %s: Successfully serialized", i)
             
         except Exception as e:
-            print(f"❌ [SERIALIZE ERROR] Doc {i}: {e}")
-            logger.error(f"Error serializing doc: {e}")
+            logger.error("Error serializing doc: %s", e)
             continue
     
-    print(f"✅ [SERIALIZE] Completed: {len(serialized)} docs serialized")
+    logger.debug("✅ [SERIALIZE] Completed: %s docs serialized", len(serialized))
     return serialized
 
 
-def detect_realtime_intent(question: str) -> bool:
-    """Smart detection for realtime or dynamic queries."""
-    q = question.lower().strip()
-
-    realtime_keywords = [
-        "latest", "current", "today", "now", "live", "update", "trending", "recent", "breaking", "abhi",
-        "aaj", "abhi ka", "kal ka", "score", "match", "price", "rate", "value", "weather", "temperature",
-        "winner", "ipl", "news", "gold", "silver", "bitcoin", "stock", "sensex", "bazar", "market"
-    ]
-
-    finance_words = ["price", "rate", "value", "gold", "silver", "usd", "bitcoin", "crypto", "share", "stock"]
-    event_words = ["ipl", "match", "score", "winner", "tournament", "game"]
-    news_words = ["news", "update", "today", "breaking", "headline"]
-    weather_words = ["weather", "temperature", "climate", "rain", "humidity"]
-
-    if any(word in q for word in ["aaj", "abhi", "today", "current", "latest", "now"]) and \
-       any(w in q for w in (finance_words + event_words + news_words + weather_words)):
-        return True
-
-    if any(str(y) in q for y in range(2023, 2031)):
-        return True
+SHARMAJI_ERROR_REPLY = "Sorry, something went wrong while generating my response."
 
-    if any(k in q for k in realtime_keywords):
-        return True
 
-    return False
+# Long-term memory roles (system/human/ai) -> chat completion roles
+MEMORY_ROLE_TO_CHAT_ROLE = {"system": "system", "human": "user", "ai": "assistant"}
 
 
+def save_sharmaji_turn(db: Session, user_id: str, user_message: str, ai_reply: str, message_embedding=None):
+    """Store both user and AI messages in long-term memory (tagged as chat turns for consolidation)"""
+    try:
+        chat_long_memory_service.create_memory(
+            db, user_id=user_id, role="human", content=user_message, memory_type="note",
+            meta_data={"source": CHAT_TURN_SOURCE}, embedding=message_embedding
+        )
+        chat_long_memory_service.create_memory(
+            db, user_id=user_id, role="ai", content=ai_reply, memory_type="note",
+            meta_data={"source": CHAT_TURN_SOURCE}
+        )
+        logger.info("✅ Both user and AI messages saved successfully.")
+    except Exception as e:
+        logger.error("❌ Error saving chat memory: %s", e)
 
 
-def sharmaji_chat(db: Session, user_id: str, user_message: str):
+def prepare_sharmaji_chat(db: Session, user_id: str, user_message: str) -> dict:
     """
-    Main chat logic that uses long-term memory + realtime data + OpenAI.
-    Each step includes console logs for debugging and understanding flow.
+    Steps 1-3 of sharmaji_chat: semantic cache, relevant memories, prompt context and
+    realtime data. Returns {"result": ...} on a cache hit (turn already saved),
+    otherwise the plan the AI call needs.
     """
-    print("\n🧠 [SharmaJi Chat Started]")
-    print(f"👤 User ID: {user_id}")
-    print(f"💬 User Message: {user_message}")
-
-    # 1️⃣ Get recent memories
-    print("\n[STEP 1] Fetching recent memories...")
-    recent_memories = chat_long_memory_service.get_user_recent_memories(db, user_id, limit=10)
-    print(f"✅ Recent memories fetched: {len(recent_memories.memories)} entries found.")
+    # 1️⃣ Semantic cache (exact question hash, then embedding similarity).
+    # The message embedding is reused for memory retrieval and when saving the turn.
+    message_embedding = None
+    cached = sharmaji_response_cache.get_exact(user_message, user_id)
+    if cached is None:
+        try:
+            with span("embed"):
+                message_embedding = embeddings.get().embed_query(user_message)
+            cached = sharmaji_response_cache.get_similar(message_embedding, user_id)
+        except Exception as e:
+            logger.warning("⚠️ Cache embedding lookup failed: %s", e)
+    if cached is not None:
+        logger.info("⚡ Cache %s hit → skipping AI call.", cached['cache_hit'])
+        save_sharmaji_turn(db, user_id, user_message, cached["reply"], message_embedding)
+        return {"result": {"reply": cached["reply"], "realtime_info": cached["realtime_info"]}}
+
+    # 2️⃣ Most relevant memories (vector similarity) plus the latest few
+    logger.info("[STEP 2] Fetching relevant memories...")
+    with span("memories"):
+        relevant_memories = chat_long_memory_service.get_relevant_memories(db, user_id, message_embedding)
+    logger.info("✅ Relevant memories fetched: %s entries found.", len(relevant_memories.memories))
 
-    # 2️⃣ Combine memories into context
-    print("\n[STEP 2] Building context for AI prompt...")
     context_messages = [
         {
             "role": "system",
@@ -967,59 +1020,145 @@ def sharmaji_chat(db: Session, user_id: str, user_message: str):
         }
     ]
 
-    for i, mem in enumerate(recent_memories.memories, start=1):
-        print(f"   ↳ Memory {i}: ({mem.role}) {mem.content[:60]}...")
-        context_messages.append({"role": mem.role, "content": mem.content})
+    for i, mem in enumerate(relevant_memories.memories, start=1):
+        logger.debug("↳ Memory %s: (%s) %s...", i, mem.role, mem.content[:60])
+        context_messages.append({"role": MEMORY_ROLE_TO_CHAT_ROLE.get(mem.role, "system"), "content": mem.content})
 
     context_messages.append({"role": "user", "content": user_message})
-    print(f"✅ Context built with {len(context_messages)} total messages.")
+    logger.info("✅ Context built with %s total messages.", len(context_messages))
+    personalised = len(relevant_memories.memories) > 0
 
     # 3️⃣ Check if message needs realtime data
-    print("\n[STEP 3] Checking if realtime data is required...")
+    logger.info("[STEP 3] Checking if realtime data is required...")
     realtime_data = ""
-    if any(keyword in user_message.lower() for keyword in ["today", "latest", "current", "news", "update"]):
-        print("🌐 Realtime keywords detected → fetching data from Tavily...")
+    if detect_intent(user_message).categories & {"temporal", "news"}:
+        logger.info("🌐 Realtime keywords detected → fetching data from Tavily...")
         try:
-            data = fetch_realtime_data(user_message)
+            with span("tavily"):
+                data = fetch_realtime_data(user_message)
             if data:
                 realtime_data = f"\n[Realtime Info from Tavily]: {data[0].get('content', '')}"
                 context_messages.append({"role": "system", "content": realtime_data})
-                print("✅ Realtime data successfully added to context.")
+                logger.info("✅ Realtime data successfully added to context.")
             else:
-                print("⚠️ No realtime data returned from Tavily.")
+                logger.warning("⚠️ No realtime data returned from Tavily.")
         except Exception as e:
-            print(f"❌ Error fetching realtime data: {e}")
+            logger.error("❌ Error fetching realtime data: %s", e)
     else:
-        print("ℹ️ No realtime data needed for this query.")
+        logger.info("ℹ️ No realtime data needed for this query.")
 
-    # 4️⃣ Get AI reply
-    print("\n[STEP 4] Sending context to AI model (OpenAI/Groq)...")
-    try:
-        ai_reply = get_ai_response(context_messages)
-        print(f"🤖 AI Reply Received: {ai_reply[:120]}...")
-    except Exception as e:
-        print(f"❌ Error while getting AI response: {e}")
-        ai_reply = "Sorry, something went wrong while generating my response."
+    return {
+        "context_messages": context_messages,
+        "realtime_data": realtime_data,
+        "personalised": personalised,
+        "message_embedding": message_embedding,
+    }
 
+
+def finish_sharmaji_chat(
+    db: Session, user_id: str, user_message: str, plan: dict, ai_reply: str, ai_failed: bool = False
+) -> dict:
+    """Steps 5-6 of sharmaji_chat: save the turn, cache the reply, build the response"""
     # 5️⃣ Store both user and AI messages in memory
-    print("\n[STEP 5] Saving messages to long-term memory...")
-    try:
-        chat_long_memory_service.create_memory(
-            db, user_id=user_id, role="user", content=user_message, memory_type="fact"
-        )
-        chat_long_memory_service.create_memory(
-            db, user_id=user_id, role="assistant", content=ai_reply, memory_type="response"
-        )
-        print("✅ Both user and AI messages saved successfully.")
-    except Exception as e:
-        print(f"❌ Error saving chat memory: {e}")
+    logger.info("[STEP 5] Saving messages to long-term memory...")
+    save_sharmaji_turn(db, user_id, user_message, ai_reply, plan["message_embedding"])
 
     # 6️⃣ Return the bot's response
-    print("\n[STEP 6] Preparing final response for frontend...")
+    logger.info("[STEP 6] Preparing final response for frontend...")
+    realtime_data = plan["realtime_data"]
     response = {
         "reply": ai_reply,
         "realtime_info": realtime_data if realtime_data else None
     }
 
-    print("🎯 Final Response Ready → Returning to user.\n")
-    return response
\ No newline at end of file
+    source_type = "realtime" if realtime_data else "memory"
+    ttl = ttl_for(source_type, plan["personalised"])
+    if ttl and not ai_failed:
+        prompt_text = "\n".join(m["content"] for m in plan["context_messages"])
+        sharmaji_response_cache.put(
+            user_message,
+            response,
+            embedding=plan["message_embedding"],
+            user_id=user_id if plan["personalised"] else None,
+            ttl=ttl,
+            tokens=count_tokens(prompt_text) + count_tokens(ai_reply),
+            source_type=source_type,
+        )
+
+    logger.info("🎯 Final Response Ready → Returning to user.")
+    return response
+
+
+def sharmaji_chat(db: Session, user_id: str, user_message: str):
+    """
+    Main chat logic that uses long-term memory + realtime data + OpenAI.
+    Each step is logged (DEBUG for per-message detail).
+    """
+    logger.info("🧠 [SharmaJi Chat Started]")
+    logger.debug("👤 User ID: %s", user_id)
+    logger.debug("💬 User Message: %s", user_message)
+
+    plan = prepare_sharmaji_chat(db, user_id, user_message)
+    if "result" in plan:
+        return plan["result"]
+
+    # 4️⃣ Get AI reply
+    logger.info("[STEP 4] Sending context to AI model (OpenAI/Groq)...")
+    ai_failed = False
+    try:
+        ai_reply = get_ai_response(plan["context_messages"])
+        logger.debug("🤖 AI Reply Received: %s...", ai_reply[:120])
+    except Exception as e:
+        logger.error("❌ Error while getting AI response: %s", e)
+        ai_reply = SHARMAJI_ERROR_REPLY
+        ai_failed = True
+
+    return finish_sharmaji_chat(db, user_id, user_message, plan, ai_reply, ai_failed)
+
+
+async def stream_sharmaji_chat(db: Session, user_id: str, user_message: str, is_disconnected=None):
+    """
+    Streaming variant of sharmaji_chat.
+    Async generator of (event, data) pairs: "sources" (realtime info) first, then
+    "token" frames, then "done" (or "error"). Sync DB work runs in a worker thread.
+    As in sharmaji_chat, the turn is saved when the stream completes and, with the
+    fallback reply, when the model fails; a client disconnect saves nothing.
+    """
+    logger.info("🧠 [SharmaJi Stream Started] user=%s", user_id)
+    try:
+        plan = await asyncio.to_thread(prepare_sharmaji_chat, db, user_id, user_message)
+    except Exception as e:
+        logger.error("❌ Error preparing chat: %s", e)
+        yield "error", {"detail": str(e)}
+        return
+
+    if "result" in plan:
+        result = plan["result"]
+        yield "sources", {"realtime_info": result["realtime_info"]}
+        yield "token", {"text": result["reply"]}
+        yield "done", result
+        return
+
+    yield "sources", {"realtime_info": plan["realtime_data"] or None}
+
+    parts = []
+    stream = stream_ai_response(plan["context_messages"])
+    try:
+        async for delta in stream:
+            if is_disconnected is not None and await is_disconnected():
+                logger.warning("⚠️ Client disconnected → aborting generation.")
+                return
+            parts.append(delta)
+            yield "token", {"text": delta}
+    except Exception as e:
+        logger.error("❌ Error while streaming AI response: %s", e)
+        await asyncio.to_thread(
+            finish_sharmaji_chat, db, user_id, user_message, plan, SHARMAJI_ERROR_REPLY, True
+        )
+        yield "error", {"detail": str(e), "reply": SHARMAJI_ERROR_REPLY}
+        return
+    finally:
+        await stream.aclose()
+
+    response = await asyncio.to_thread(finish_sharmaji_chat, db, user_id, user_message, plan, "".join(parts))
+    yield "done", response
@@ -663,53 +663,61 @@
 
 
 from langchain_core.tools import Tool
-from sqlalchemy.orm import Session
-from app.repositories.chat_memory_repository import get_user_chat_memory, save_chat_memory
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.chat_memory_repository import aget_recent_chat_memory, asave_chat_memory
+from app.db.session import AsyncSessionLocal
 from app.schemas.chat_memory_schema import ChatMemoryCreate
 from langchain_core.messages import HumanMessage, AIMessage
 from app.core.config import settings
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
+from app.core.token_budget import count_tokens, trim_history_to_budget
+from app.core.semantic_cache import get_response_cache, ttl_for
+from app.core.client_registry import client_registry
+from app.core.search_cache import search_cache
+from app.core.embedding_cache import cached_openai_embeddings
+from app.core.intent import detect_intent
+from app.core.tracing import record_tokens, span, traced_stream
+from app.core.resources import resources
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
-from tavily import TavilyClient
 from uuid import UUID
-import traceback
+import asyncio
 import logging
+import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-# Initialize LLM, Vectorstore, and Tavily Search
-try:
-    print("🔧 [INIT] Starting initialization...")
-    embeddings = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)
-    CHROMA_PATH = "app/db/chroma_storage_new"
-    print(f"📁 [INIT] Chroma path: {CHROMA_PATH}")
+CHROMA_PATH = "app/db/chroma_storage_new"
+RETRIEVER_K = 3
+
+
+def _build_vectorstore():
+    from langchain_community.vectorstores import Chroma
+    logger.info("📁 [INIT] Chroma path: %s", CHROMA_PATH)
+    return Chroma(persist_directory=CHROMA_PATH, embedding_function=embeddings.get())
 
-    vectorstore = Chroma(
-        persist_directory=CHROMA_PATH,
-        embedding_function=embeddings
-    )
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-    print("✅ [INIT] Vectorstore initialized")
 
-    llm = ChatOpenAI(
+def _build_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
         model=settings.OPENAI_MODEL,
         temperature=0.3,
-        api_key=settings.OPENAI_API_KEY
+        api_key=settings.OPENAI_API_KEY,
+        http_client=client_registry.http_client,
+        http_async_client=client_registry.async_http_client
     )
-    print(f"✅ [INIT] LLM initialized: {settings.OPENAI_MODEL}")
 
-    tavily_client = TavilyClient(api_key=settings.TAVILY_API_KEY)
-    print("✅ [INIT] Tavily Search initialized successfully")
-    logger.info("Tavily Search initialized successfully")
 
-except Exception as init_error:
-    print(f"❌ [INIT ERROR] {init_error}")
-    logger.error(f"Initialization error: {init_error}")
-    logger.debug(traceback.format_exc())
-    raise
+# LLM, Vectorstore and Tavily Search: built on first use / during the lifespan warm-up
+embeddings = resources.register("chat.embeddings", cached_openai_embeddings)
+vectorstore = resources.register("chat.vectorstore", _build_vectorstore)
+retriever = resources.register(
+    "chat.retriever", lambda: vectorstore.get().as_retriever(search_kwargs={"k": RETRIEVER_K})
+)
+llm = resources.register("chat.llm", _build_llm)
+tavily_client = resources.register("chat.tavily", lambda: settings.async_tavily_client)
+
+response_cache = get_response_cache("chat_memory")
 
 # System Prompt (Hinglish + Personality)
 prompt = ChatPromptTemplate.from_messages([
@@ -755,7 +763,7 @@ def get_current_datetime_info():
         "time": now.strftime("%I:%M %p"),
         "day": now.strftime("%A"),
     }
-    print(f"📅 [TIME] Current info: {info}")
+    logger.debug("📅 [TIME] Current info: %s", info)
     return info
 
 
@@ -765,45 +773,43 @@ def extract_content_from_doc(doc):
     Handles Document objects, dicts, and strings.
     """
     try:
-        print(f"📄 [DOC] Extracting content from type: {type(doc)}")
+        logger.debug("📄 [DOC] Extracting content from type: %s", type(doc))
         
         # Case 1: Document object with page_content attribute
         if hasattr(doc, "page_content"):
             content = str(doc.page_content).strip()
-            print(f"✅ [DOC] Extracted from page_content attribute: {content[:50]}...")
+            logger.debug("✅ [DOC] Extracted from page_content attribute: %s...", content[:50])
             return content
         
         # Case 2: Dictionary with page_content key
         elif isinstance(doc, dict):
-            print(f"🔑 [DOC] Dict keys: {list(doc.keys())}")
+            logger.debug("🔑 [DOC] Dict keys: %s", list(doc.keys()))
             if "page_content" in doc:
                 content = str(doc["page_content"]).strip()
-                print(f"✅ [DOC] Extracted from page_content key: {content[:50]}...")
+                logger.debug("✅ [DOC] Extracted from page_content key: %s...", content[:50])
                 return content
             elif "content" in doc:
                 content = str(doc["content"]).strip()
-                print(f"✅ [DOC] Extracted from content key: {content[:50]}...")
+                logger.debug("✅ [DOC] Extracted from content key: %s...", content[:50])
                 return content
             else:
                 content = str(doc).strip()
-                print(f"⚠️ [DOC] No content key, using string repr: {content[:50]}...")
+                logger.warning("⚠️ [DOC] No content key, using string repr: %s...", content[:50])
                 return content
         
         # Case 3: Plain string
         elif isinstance(doc, str):
-            print(f"✅ [DOC] Already a string: {doc[:50]}...")
+            logger.debug("✅ [DOC] Already a string: %s...", doc[:50])
             return doc.strip()
         
         # Case 4: Unknown type, convert to string
         else:
             content = str(doc).strip()
-            print(f"⚠️ [DOC] Unknown type, converting to string: {content[:50]}...")
-            logger.warning(f"Unknown document type: {type(doc)}")
+            logger.warning("Unknown document type: %s", type(doc))
             return content
             
     except Exception as e:
-        print(f"❌ [DOC ERROR] {e}")
-        logger.error(f"Error extracting content from doc: {e}")
+        logger.error("Error extracting content from doc: %s", e)
         return ""
 
 
@@ -812,12 +818,12 @@ def serialize_docs(docs):
     Convert documents to JSON-serializable format.
     Returns a list of dicts with content and metadata.
     """
-    print(f"🔄 [SERIALIZE] Starting serialization of {len(docs)} docs")
+    logger.debug("🔄 [SERIALIZE] Starting serialization of %s docs", len(docs))
     serialized = []
     
     for i, doc in enumerate(docs):
         try:
-            print(f"🔄 [SERIALIZE] Doc {i}: type={type(doc)}")
+            logger.debug("🔄 [SERIALIZE] Doc %s: type=%s", i, type(doc))
             
             # Extract content
             content = extract_content_from_doc(doc)
@@ -826,265 +832,367 @@ def serialize_docs(docs):
             metadata = {}
             if hasattr(doc, "metadata"):
                 metadata = doc.metadata
-                print(f"📋 [SERIALIZE] Doc {i}: Found metadata attribute")
+                logger.debug("📋 [SERIALIZE] Doc %s: Found metadata attribute", i)
             elif isinstance(doc, dict) and "metadata" in doc:
                 metadata = doc["metadata"]
-                print(f"📋 [SERIALIZE] Doc {i}: Found metadata key")
+                logger.debug("📋 [SERIALIZE] Doc %s: Found metadata key", i)
             
             result = {
                 "content": content,
                 "metadata": metadata
             }
             serialized.append(result)
-            print(f"✅ [SERIALIZE] Doc {i}: Successfully serialized")
+            logger.debug("✅ [SERIALIZE] Doc %s: Successfully serialized", i)
             
         except Exception as e:
-            print(f"❌ [SERIALIZE ERROR] Doc {i}: {e}")
-            logger.error(f"Error serializing doc: {e}")
+            logger.error("Error serializing doc: %s", e)
             continue
     
-    print(f"✅ [SERIALIZE] Completed: {len(serialized)} docs serialized")
+    logger.debug("✅ [SERIALIZE] Completed: %s docs serialized", len(serialized))
     return serialized
 
 
-def detect_realtime_intent(question: str) -> bool:
-    """Smart detection for realtime or dynamic queries."""
-    q = question.lower().strip()
+LLM_ERROR_ANSWER = "Sorry, answer generate nahi kar paya abhi. Thodi der baad try karo."
 
-    realtime_keywords = [
-        "latest", "current", "today", "now", "live", "update", "trending", "recent", "breaking", "abhi",
-        "aaj", "abhi ka", "kal ka", "score", "match", "price", "rate", "value", "weather", "temperature",
-        "winner", "ipl", "news", "gold", "silver", "bitcoin", "stock", "sensex", "bazar", "market"
-    ]
 
-    finance_words = ["price", "rate", "value", "gold", "silver", "usd", "bitcoin", "crypto", "share", "stock"]
-    event_words = ["ipl", "match", "score", "winner", "tournament", "game"]
-    news_words = ["news", "update", "today", "breaking", "headline"]
-    weather_words = ["weather", "temperature", "climate", "rain", "humidity"]
+def cache_answer(question: str, result: dict, embedding, user_id: UUID, personalised: bool, tokens: int):
+    """Store a generated answer in the semantic cache according to its source type"""
+    ttl = ttl_for(result["source_type"], personalised)
+    if ttl is None:
+        return
+    response_cache.put(
+        question,
+        {"answer": result["answer"], "context": result["context"], "source_type": result["source_type"]},
+        embedding=embedding,
+        user_id=user_id if personalised else None,
+        ttl=ttl,
+        tokens=tokens,
+        source_type=result["source_type"],
+    )
 
-    if any(word in q for word in ["aaj", "abhi", "today", "current", "latest", "now"]) and \
-       any(w in q for w in (finance_words + event_words + news_words + weather_words)):
-        return True
 
-    if any(str(y) in q for y in range(2023, 2031)):
-        return True
+def serialize_tavily_results(tavily_results):
+    """Tavily results -> JSON-safe dicts for the response"""
+    serialized_tavily = []
+    for r in tavily_results:
+        try:
+            serialized_tavily.append({
+                "title": str(r.get("title", "")),
+                "url": str(r.get("url", "")),
+                "content": str(r.get("content", "")),
+                "score": float(r.get("score", 0.0)) if r.get("score") else 0.0
+            })
+        except Exception as ser_err:
+            logger.warning("⚠️ [TAVILY] Failed to serialize result: %s", ser_err)
+            continue
+    return serialized_tavily
 
-    if any(k in q for k in realtime_keywords):
-        return True
 
-    return False
+async def _timed_source(name: str, coro, timeout: float, default, timings: dict):
+    """Await one retrieval source; on timeout/error log it and fall back to `default`"""
+    started = time.perf_counter()
+    try:
+        with span(name):
+            return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        logger.warning("⚠️ [RETRIEVAL] %s timed out after %ss", name, timeout)
+        return default
+    except Exception as source_error:
+        logger.error("❌ [RETRIEVAL] %s failed: %s", name, source_error)
+        logger.debug("%s traceback", name, exc_info=True)
+        return default
+    finally:
+        timings[name] = round(time.perf_counter() - started, 4)
+
+
+async def load_history(user_id: UUID) -> list:
+    """
+    Recent turns on a session of its own, so the read can run alongside the other
+    sources (an AsyncSession can't run two statements at once) and a timed-out
+    query never leaves the request's session half-used.
+    """
+    async with AsyncSessionLocal() as history_db:
+        return await aget_recent_chat_memory(history_db, user_id, settings.CHAT_HISTORY_MAX_TURNS)
 
 
+async def retrieve_docs(question: str, question_embedding=None) -> list:
+    """Chroma top-k; reuses the cache-lookup embedding instead of embedding the question twice"""
+    if question_embedding is not None:
+        return await vectorstore.get().asimilarity_search_by_vector(question_embedding, k=RETRIEVER_K)
+    return await retriever.get().ainvoke(question)
 
 
-def chat_with_memory_db(db: Session, user_id: UUID, question: str):
-    """Main Sharma Ji Bot Function (Tavily + Memory + Vector + LLM)"""
-    try:
-        print(f"\n{'='*60}")
-        print(f"🚀 [START] New request")
-        print(f"👤 [USER] ID: {user_id}")
-        print(f"❓ [QUESTION] {question}")
-        print(f"{'='*60}\n")
-        
-        logger.info(f"Processing question: {question}")
-        current_info = get_current_datetime_info()
+async def search_realtime(question: str) -> list:
+    results = await search_cache.aget_or_fetch(question, tavily_client.get().search, max_results=5)
+    logger.info("🌐 [TAVILY] Received %s results", len(results))
+    return results
 
-        # Load chat memory
-        print("💾 [MEMORY] Loading chat history...")
-        db_history = get_user_chat_memory(db, user_id)
-        print(f"💾 [MEMORY] Found {len(db_history)} previous messages")
-        
-        messages = []
-        for item in db_history:
-            messages.append(HumanMessage(content=item.question))
-            messages.append(AIMessage(content=item.answer))
-        print(f"💾 [MEMORY] Built {len(messages)} message objects")
-
-        # Handle direct date/time queries
-        date_time_keywords = [
-            "aaj ki date", "today date", "aaj ka din", "current date",
-            "kya tarikh", "aaj kya date", "date kya hai", "time kya hai"
-        ]
-        print(f"🔍 [CHECK] Checking for date/time keywords...")
-        if any(k in question.lower() for k in date_time_keywords):
-            print("✅ [CHECK] Date/time keyword detected!")
-            answer = f"Aaj {current_info['day']} hai, date {current_info['date']} aur time {current_info['time']} hai."
-            save_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=answer))
-            print(f"💬 [ANSWER] {answer}")
-            return {"answer": answer, "context": [], "source_type": "system_time"}
-
-        # Tavily Search (for real-time info)
-        print("🔍 [CHECK] Detecting if question needs realtime search...")
-        needs_search = detect_realtime_intent(question)
-        print(f"🔍 [CHECK] Realtime intent detected: {needs_search}")
-
-
-
-        if needs_search:
-            try:
-                print(f"🌐 [TAVILY] Search triggered for: {question}")
-                logger.info(f"Tavily Search triggered for: {question}")
-                
-                tavily_results = tavily_client.search(query=question, max_results=5)
-                print(f"🌐 [TAVILY] Received {len(tavily_results.get('results', []))} results")
-
-                formatted_results = "\n\n".join(
-                    [f"- {r.get('title', 'No Title')}: {r.get('url', 'No URL')}\n{r.get('content', 'No content')}" 
-                     for r in tavily_results.get("results", [])]
-                )
-                print(f"🌐 [TAVILY] Formatted results length: {len(formatted_results)} chars")
-
-                print("🤖 [LLM] Generating answer from Tavily results...")
-                chain = search_prompt | llm | StrOutputParser()
-                search_answer = chain.invoke({
-                    "question": question,
-                    "search_results": formatted_results,
-                    "current_date": current_info['date']
-                })
-                print(f"✅ [LLM] Answer generated: {search_answer[:100]}...")
-
-                print("💾 [MEMORY] Saving to database...")
-                save_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=search_answer))
-                print("✅ [MEMORY] Saved successfully")
-                
-                # Serialize Tavily results to ensure JSON compatibility
-                print("🔄 [TAVILY] Serializing Tavily results...")
-                serialized_tavily = []
-                for r in tavily_results.get("results", []):
-                    try:
-                        serialized_tavily.append({
-                            "title": str(r.get("title", "")),
-                            "url": str(r.get("url", "")),
-                            "content": str(r.get("content", "")),
-                            "score": float(r.get("score", 0.0)) if r.get("score") else 0.0
-                        })
-                    except Exception as ser_err:
-                        print(f"⚠️ [TAVILY] Failed to serialize result: {ser_err}")
-                        continue
-                
-                print(f"✅ [TAVILY] Serialized {len(serialized_tavily)} results")
-                
-                result = {
-                    "answer": search_answer,
-                    "context": serialized_tavily,
-                    "source_type": "tavily_search"
-                }
-                print(f"✅ [RETURN] Returning Tavily result with {len(serialized_tavily)} context items")
-                return result
-
-            except Exception as tavily_error:
-                print(f"❌ [TAVILY ERROR] {tavily_error}")
-                print(f"❌ [TAVILY TRACE] {traceback.format_exc()}")
-                logger.error(f"Tavily Search Error: {tavily_error}")
-                logger.debug(traceback.format_exc())
-                print("⚠️ [FALLBACK] Continuing to vector fallback...")
-
-        # Vector DB Retrieval (fallback)
-        print("🔍 [VECTOR] Starting vector retrieval...")
-        context = "No relevant context found."
-        docs = []
-        serialized_context = []
 
+def format_tavily_results(tavily_results) -> str:
+    return "\n\n".join(
+        [f"- {r.get('title', 'No Title')}: {r.get('url', 'No URL')}\n{r.get('content', 'No content')}"
+         for r in tavily_results]
+    )
+
+
+def build_vector_context(docs) -> tuple:
+    """(prompt context string, serialized docs for the response)"""
+    context_parts = []
+    for i, doc in enumerate(docs):
         try:
-            print(f"🔍 [VECTOR] Invoking retriever with question: {question}")
-            docs = retriever.invoke(question)
-            print(f"✅ [VECTOR] Retriever returned {len(docs)} items")
-            
-            if docs:
-                print(f"🔍 [VECTOR] First doc type: {type(docs[0])}")
-                print(f"🔍 [VECTOR] First doc content: {docs[0]}")
-                
-                # Check if it's a dict with direct access
-                if isinstance(docs[0], dict):
-                    print(f"🔍 [VECTOR] First doc keys: {list(docs[0].keys())}")
+            content = extract_content_from_doc(doc)
+            if content:
+                context_parts.append(content)
+                logger.debug("✅ [VECTOR] Doc %s added: %s...", i, content[:100])
             else:
-                print("⚠️ [VECTOR] No docs returned!")
+                logger.warning("⚠️ [VECTOR] Doc %s returned empty content", i)
+        except Exception as doc_error:
+            logger.error("❌ [VECTOR] Error processing doc %s: %s", i, doc_error)
+            logger.debug("Doc %s traceback", i, exc_info=True)
 
-            context_parts = []
-            for i, doc in enumerate(docs):
-                try:
-                    print(f"🔍 [VECTOR] Processing doc {i}... Type: {type(doc)}")
-                    content = extract_content_from_doc(doc)
-                    
-                    if content:
-                        context_parts.append(content)
-                        print(f"✅ [VECTOR] Doc {i} added: {content[:100]}...")
-                    else:
-                        print(f"⚠️ [VECTOR] Doc {i} returned empty content")
-                        
-                except Exception as doc_error:
-                    print(f"❌ [VECTOR] Error processing doc {i}: {doc_error}")
-                    print(f"❌ [VECTOR] Doc {i} trace: {traceback.format_exc()}")
-                    continue
-
-            context = "\n\n".join(context_parts) if context_parts else "No relevant context found."
-            print(f"🧩 [VECTOR] Built context from {len(context_parts)} chunks")
-            print(f"🧩 [VECTOR] Total context length: {len(context)} chars")
-            
-            # Serialize docs for JSON response
-            print("🔄 [VECTOR] Starting serialization...")
-            try:
-                serialized_context = serialize_docs(docs)
-                print(f"✅ [VECTOR] Serialization complete: {len(serialized_context)} items")
-            except Exception as serialize_error:
-                print(f"❌ [VECTOR] Serialization failed: {serialize_error}")
-                print(f"❌ [VECTOR] Serialize trace: {traceback.format_exc()}")
-                serialized_context = []
-
-        except Exception as retriever_error:
-            print(f"❌ [VECTOR ERROR] {retriever_error}")
-            print(f"❌ [VECTOR TRACE] {traceback.format_exc()}")
-            logger.error(f"❌ Retriever Error: {retriever_error}")
-            logger.debug(traceback.format_exc())
-            context = "Context retrieval failed."
-            serialized_context = []
+    context = "\n\n".join(context_parts) if context_parts else "No relevant context found."
+    logger.info("🧩 [VECTOR] Built context from %s chunks", len(context_parts))
 
-        # Generate final answer
+    try:
+        serialized_context = serialize_docs(docs)
+    except Exception as serialize_error:
+        logger.error("❌ [VECTOR] Serialization failed: %s", serialize_error)
+        logger.debug("Serialization traceback", exc_info=True)
+        serialized_context = []
+    return context, serialized_context
+
+
+async def prepare_chat(db: AsyncSession, user_id: UUID, question: str) -> dict:
+    """
+    Everything that happens before the LLM call: history window, date/time shortcut,
+    semantic cache and Tavily / vector context.
+
+    History, Chroma and (when the question needs it) Tavily are fetched concurrently,
+    each under its own timeout, so retrieval costs the slowest source, not the sum.
+
+    Returns either {"result": ...} when the answer is already known (shortcut or cache
+    hit, already persisted), or a plan with the chain + inputs for the caller to
+    invoke or stream, plus what finish_chat needs to persist and cache the answer.
+    """
+    current_info = get_current_datetime_info()
+    timings = {}
+
+    # History load starts right away; it overlaps the cache lookup and the other sources
+    history_task = asyncio.ensure_future(_timed_source(
+        "history", load_history(user_id), settings.RETRIEVAL_HISTORY_TIMEOUT, [], timings
+    ))
+
+    async def history_window():
+        db_history, history_stats = trim_history_to_budget(await history_task, settings.CHAT_HISTORY_MAX_TOKENS)
+        logger.info("💾 [MEMORY] Kept %s/%s turns (%s tokens trimmed)",
+                    history_stats["turns_kept"], history_stats["turns_loaded"], history_stats["tokens_trimmed"])
+        return db_history, history_stats
+
+    # Handle direct date/time queries
+    intent = detect_intent(question)
+    if intent.date_time:
+        logger.info("✅ [CHECK] Date/time keyword detected!")
+        answer = f"Aaj {current_info['day']} hai, date {current_info['date']} aur time {current_info['time']} hai."
+        _, history_stats = await history_window()
+        await asave_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=answer))
+        logger.debug("💬 [ANSWER] %s", answer)
+        return {"result": {"answer": answer, "context": [], "source_type": "system_time", "history_stats": history_stats}}
+
+    # Semantic cache: exact question hash first, then embedding similarity
+    question_embedding = None
+    cached = response_cache.get_exact(question, user_id)
+    if cached is None:
         try:
-            print("🤖 [LLM] Generating final answer...")
-            print(f"🤖 [LLM] Context length: {len(context)}")
-            print(f"🤖 [LLM] Chat history length: {len(messages)}")
-            
-            chain = prompt | llm | StrOutputParser()
-            answer = chain.invoke({
-                "input": question,
-                "chat_history": messages,
-                "context": context
-            })
-            print(f"✅ [LLM] Answer generated: {answer[:100]}...")
+            with span("embed"):
+                question_embedding = await embeddings.get().aembed_query(question)
+            cached = response_cache.get_similar(question_embedding, user_id)
+        except Exception as cache_error:
+            logger.warning("⚠️ [CACHE] Embedding lookup failed: %s", cache_error)
+    if cached is not None:
+        logger.info("⚡ [CACHE] %s hit, skipping LLM", cached['cache_hit'])
+        _, history_stats = await history_window()
+        await asave_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=cached["answer"]))
+        return {"result": {**cached, "history_stats": history_stats}}
+
+    # Fan out: vector retrieval always, Tavily only for realtime questions
+    needs_search = intent.realtime
+    logger.info("🔍 [CHECK] Realtime intent detected: %s", needs_search)
+    sources = [
+        history_window(),
+        _timed_source("vector", retrieve_docs(question, question_embedding),
+                      settings.RETRIEVAL_VECTOR_TIMEOUT, None, timings),
+    ]
+    if needs_search:
+        sources.append(_timed_source("tavily", search_realtime(question),
+                                     settings.RETRIEVAL_SEARCH_TIMEOUT, [], timings))
+    (db_history, history_stats), docs, *rest = await asyncio.gather(*sources)
+    tavily_results = rest[0] if rest else []
+    logger.info("⏱️ [RETRIEVAL] Source timings (s): %s", timings)
+
+    messages = []
+    for item in db_history:
+        messages.append(HumanMessage(content=item.question))
+        messages.append(AIMessage(content=item.answer))
+
+    if docs is None:
+        context, serialized_context = "Context retrieval failed.", []
+    else:
+        context, serialized_context = build_vector_context(docs)
+
+    plan = {"history_stats": history_stats, "question_embedding": question_embedding}
+
+    if tavily_results:
+        # Realtime answer: Tavily results lead, vector hits ride along as background
+        formatted_results = format_tavily_results(tavily_results)
+        if serialized_context:
+            formatted_results += f"\n\nKnowledge base:\n{context}"
+        return {
+            **plan,
+            "chain": search_prompt | llm.get() | StrOutputParser(),
+            "inputs": {
+                "question": question,
+                "search_results": formatted_results,
+                "current_date": current_info['date']
+            },
+            "context": serialize_tavily_results(tavily_results) + serialized_context,
+            "source_type": "tavily_search",
+            "personalised": False,
+            "prompt_text": formatted_results,
+        }
+    if needs_search:
+        logger.warning("⚠️ [FALLBACK] No Tavily results, answering from vector context")
+
+    logger.debug("🤖 [LLM] Context length: %s", len(context))
+    logger.debug("🤖 [LLM] Chat history length: %s", len(messages))
+    return {
+        **plan,
+        "chain": prompt | llm.get() | StrOutputParser(),
+        "inputs": {
+            "input": question,
+            "chat_history": messages,
+            "context": context
+        },
+        "context": serialized_context,
+        "source_type": "vectorstore",
+        "personalised": history_stats["turns_kept"] > 0,
+        "prompt_text": context,
+    }
 
-            print("💾 [MEMORY] Saving to database...")
-            save_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=answer))
-            print("✅ [MEMORY] Saved successfully")
-            
-            result = {
-                "answer": answer,
-                "context": serialized_context,
-                "source_type": "vectorstore"
-            }
-            print(f"✅ [RETURN] Returning vectorstore result")
-            print(f"✅ [RETURN] Context items: {len(serialized_context)}")
-            return result
 
+async def finish_chat(db: AsyncSession, user_id: UUID, question: str, plan: dict, answer: str) -> dict:
+    """Persist + cache a generated answer and build the response dict"""
+    logger.info("💾 [MEMORY] Saving to database...")
+    await asave_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=answer))
+    logger.info("✅ [MEMORY] Saved successfully")
+
+    result = {
+        "answer": answer,
+        "context": plan["context"],
+        "source_type": plan["source_type"],
+        "history_stats": plan["history_stats"]
+    }
+    # The chain's parser drops the API usage, so tokens are counted locally
+    prompt_tokens = count_tokens(plan["prompt_text"]) + count_tokens(question)
+    completion_tokens = count_tokens(answer)
+    record_tokens(settings.OPENAI_MODEL, prompt_tokens, completion_tokens)
+    cache_answer(
+        question, result, plan["question_embedding"], user_id,
+        personalised=plan["personalised"],
+        tokens=prompt_tokens + completion_tokens
+    )
+    logger.info("✅ [RETURN] Returning %s result with %s context items", plan["source_type"], len(plan["context"]))
+    return result
+
+
+async def fail_chat(db: AsyncSession, user_id: UUID, question: str, plan: dict, llm_error: Exception) -> dict:
+    """LLM call failed: persist the apology answer and build the error response"""
+    logger.error("❌ [LLM ERROR] %s", llm_error)
+    logger.debug("LLM traceback", exc_info=True)
+    await asave_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=LLM_ERROR_ANSWER))
+    return {
+        "answer": LLM_ERROR_ANSWER,
+        "context": [],
+        "source_type": "error",
+        "history_stats": plan["history_stats"]
+    }
+
+
+async def chat_with_memory_db(db: AsyncSession, user_id: UUID, question: str):
+    """Main Sharma Ji Bot Function (Tavily + Memory + Vector + LLM)"""
+    try:
+        logger.info("🚀 [START] New request from user %s", user_id)
+        logger.debug("❓ [QUESTION] %s", question)
+
+        plan = await prepare_chat(db, user_id, question)
+        if "result" in plan:
+            return plan["result"]
+
+        # Generate final answer
+        try:
+            logger.info("🤖 [LLM] Generating final answer...")
+            with span("llm"):
+                answer = await plan["chain"].ainvoke(plan["inputs"])
+            logger.debug("✅ [LLM] Answer generated: %s...", answer[:100])
         except Exception as llm_error:
-            print(f"❌ [LLM ERROR] {llm_error}")
-            print(f"❌ [LLM TRACE] {traceback.format_exc()}")
-            logger.error(f"LLM generation error: {llm_error}")
-            answer = "Sorry, answer generate nahi kar paya abhi. Thodi der baad try karo."
-            save_chat_memory(db, ChatMemoryCreate(user_id=user_id, question=question, answer=answer))
-            return {
-                "answer": answer,
-                "context": [],
-                "source_type": "error"
-            }
+            return await fail_chat(db, user_id, question, plan, llm_error)
+
+        return await finish_chat(db, user_id, question, plan, answer)
 
     except Exception as e:
-        print(f"❌ [CRITICAL ERROR] {e}")
-        print(f"❌ [CRITICAL TRACE] {traceback.format_exc()}")
-        logger.error(f"Critical Error: {e}")
-        logger.debug(traceback.format_exc())
+        logger.error("❌ [CRITICAL ERROR] %s", e)
+        logger.debug("Critical error traceback", exc_info=True)
         return {
             "answer": f"Sorry, ek technical issue hua: {e}",
             "context": [],
             "source_type": "error"
-        }
\ No newline at end of file
+        }
+
+
+async def stream_chat_with_memory_db(db: AsyncSession, user_id: UUID, question: str, is_disconnected=None):
+    """
+    Streaming variant of chat_with_memory_db.
+    Async generator of (event, data) pairs: one "sources" frame first, then "token"
+    frames as the chain produces them, then "done" (or "error"). The answer is only
+    persisted once the stream completes; if the client goes away the LLM stream is
+    closed and nothing is saved.
+    """
+    logger.info("🚀 [STREAM] New request from user %s", user_id)
+    logger.debug("❓ [QUESTION] %s", question)
+    try:
+        plan = await prepare_chat(db, user_id, question)
+    except Exception as e:
+        logger.error("Stream preparation error: %s", e)
+        yield "error", {"detail": str(e)}
+        return
+
+    if "result" in plan:
+        result = plan["result"]
+        yield "sources", {"source_type": result["source_type"], "sources": result["context"]}
+        yield "token", {"text": result["answer"]}
+        yield "done", {"answer": result["answer"], "source_type": result["source_type"],
+                       "history_stats": result.get("history_stats")}
+        return
+
+    yield "sources", {"source_type": plan["source_type"], "sources": plan["context"]}
+
+    parts = []
+    # "llm.stream" times the waits on the chain only, not the SSE writes between tokens
+    stream = traced_stream("llm.stream", plan["chain"].astream(plan["inputs"]))
+    try:
+        async for chunk in stream:
+            if is_disconnected is not None and await is_disconnected():
+                logger.warning("⚠️ [STREAM] Client disconnected, aborting generation")
+                return
+            parts.append(chunk)
+            yield "token", {"text": chunk}
+    except Exception as llm_error:
+        result = await fail_chat(db, user_id, question, plan, llm_error)
+        yield "error", {"detail": str(llm_error), "answer": result["answer"]}
+        return
+    finally:
+        # Closes the upstream OpenAI stream on completion, error, disconnect or cancellation
+        await stream.aclose()
+
+    result = await finish_chat(db, user_id, question, plan, "".join(parts))
+    yield "done", {"answer": result["answer"], "source_type": result["source_type"],
+                   "history_stats": result["history_stats"]}
@@ -0,0 +1,208 @@
+"""
+Document Ingestion
+Loads documents into the Chroma stores the chat services retrieve from.
+
+Pipeline (one file in memory at a time):
+1. stream files (or uploads) in and split them with RecursiveCharacterTextSplitter
+2. id every chunk by the sha256 of its file and text: repeats within a file are
+   skipped and chunks already in the store (one lookup per file) are never
+   re-upserted. Ids are per file so every file owns its own copy of a shared
+   chunk (pruning one file never removes another's); the vector itself is
+   computed once, since the embeddings go through the embedding cache
+3. embed new chunks in INGEST_EMBED_BATCH_SIZE batches, at most
+   INGEST_EMBED_CONCURRENCY batches in flight, and upsert each batch as soon as
+   its vectors are back
+4. with prune=True, drop chunks a re-ingested file no longer produces
+
+Re-ingesting an unchanged corpus therefore costs the reads and the hashing only.
+
+CLI:
+    python -m app.services.ingestion_service docs/ notes.md --store chat
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.core.config import settings
+from app.core.embedding_cache import cached_openai_embeddings
+from app.core.resources import resources
+
+logger = logging.getLogger(__name__)
+
+# Store name -> persist directory (the paths the chat services open)
+CHROMA_STORES = {
+    "ai-memory": "app/db/chroma_storage",
+    "chat": "app/db/chroma_storage_new",
+}
+TEXT_EXTENSIONS = {".txt", ".md", ".rst", ".csv", ".json", ".html", ".htm", ".xml", ".py"}
+
+embeddings = resources.register("ingest.embeddings", cached_openai_embeddings, warm=False)
+
+_stores = {}
+
+
+def get_store(name: str):
+    """The Chroma vectorstore for a store name (opened once per process)"""
+    from langchain_community.vectorstores import Chroma
+
+    if name not in CHROMA_STORES:
+        raise ValueError(f"Store must be one of: {', '.join(CHROMA_STORES)}")
+    if name not in _stores:
+        _stores[name] = Chroma(persist_directory=CHROMA_STORES[name], embedding_function=embeddings.get())
+    return _stores[name]
+
+
+def iter_documents(paths: Sequence[str], extensions=TEXT_EXTENSIONS) -> Iterator[Tuple[str, str]]:
+    """(source, text) for every matching file under `paths`, read lazily one at a time"""
+    for raw_path in paths:
+        path = Path(raw_path)
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            if file.suffix.lower() not in extensions:
+                continue
+            try:
+                yield str(file), file.read_text(encoding="utf-8", errors="replace")
+            except OSError as e:
+                logger.warning("⚠️ [INGEST] Skipping %s: %s", file, e)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, text: str) -> str:
+    return hashlib.sha256(f"{source}\0{text.strip()}".encode("utf-8")).hexdigest()
+
+
+async def ingest_documents(
+    documents: Iterable[Tuple[str, str]],
+    store: str = "chat",
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    prune: bool = True
+) -> dict:
+    """
+    Chunk, dedupe, embed and upsert `documents` ((source, text) pairs) into `store`
+
+    Returns:
+        Report with file/chunk counts, elapsed seconds and chunks/sec
+    """
+    collection = get_store(store)._collection
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size or settings.INGEST_CHUNK_SIZE,
+        chunk_overlap=chunk_overlap if chunk_overlap is not None else settings.INGEST_CHUNK_OVERLAP
+    )
+    batch_size = batch_size or settings.INGEST_EMBED_BATCH_SIZE
+    concurrency = concurrency or settings.INGEST_EMBED_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+    report = {
+        "store": store, "files": 0, "chunks": 0, "duplicates": 0, "unchanged": 0,
+        "embedded": 0, "failed": 0, "pruned": 0,
+    }
+    pending: List[Tuple[str, str, dict]] = []
+    in_flight = set()
+
+    async def embed_and_upsert(batch: List[Tuple[str, str, dict]]):
+        try:
+            async with semaphore:
+                vectors = await embeddings.get().aembed_documents([text for _, text, _ in batch])
+            await asyncio.to_thread(
+                collection.upsert,
+                ids=[cid for cid, _, _ in batch],
+                embeddings=vectors,
+                documents=[text for _, text, _ in batch],
+                metadatas=[metadata for _, _, metadata in batch]
+            )
+            report["embedded"] += len(batch)
+        except Exception as e:
+            report["failed"] += len(batch)
+            logger.error("❌ [INGEST] Batch of %s chunks failed: %s", len(batch), e)
+
+    async def submit(batch):
+        # Cap queued batches so a huge corpus doesn't pile up in memory
+        while len(in_flight) >= concurrency * 2:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            in_flight.difference_update(done)
+        in_flight.add(asyncio.ensure_future(embed_and_upsert(batch)))
+
+    started = time.perf_counter()
+    for source, text in documents:
+        report["files"] += 1
+        chunks = splitter.split_text(text)
+        report["chunks"] += len(chunks)
+        file_ids = set()
+        fresh = []
+        for index, chunk in enumerate(chunks):
+            cid = chunk_id(source, chunk)
+            if cid in file_ids:
+                report["duplicates"] += 1
+                continue
+            file_ids.add(cid)
+            fresh.append((cid, chunk, {"source": source, "chunk": index, "content_hash": content_hash(chunk)}))
+
+        if fresh:
+            stored = await asyncio.to_thread(collection.get, ids=[cid for cid, _, _ in fresh], include=[])
+            existing = set(stored["ids"])
+            report["unchanged"] += len(existing)
+            pending.extend(item for item in fresh if item[0] not in existing)
+
+        if prune:
+            previous = await asyncio.to_thread(collection.get, where={"source": source}, include=[])
+            stale = [cid for cid in previous["ids"] if cid not in file_ids]
+            if stale:
+                await asyncio.to_thread(collection.delete, ids=stale)
+                report["pruned"] += len(stale)
+
+        while len(pending) >= batch_size:
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            await submit(batch)
+
+    if pending:
+        await submit(pending)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+    elapsed = time.perf_counter() - started
+    report["seconds"] = round(elapsed, 3)
+    report["chunks_per_sec"] = round(report["chunks"] / elapsed, 1) if elapsed else 0.0
+    report["embedded_per_sec"] = round(report["embedded"] / elapsed, 1) if elapsed else 0.0
+    logger.info(
+        "📥 [INGEST] %s files, %s chunks (%s new, %s unchanged, %s duplicate) in %.1fs → %.1f chunks/s",
+        report["files"], report["chunks"], report["embedded"], report["unchanged"],
+        report["duplicates"], elapsed, report["chunks_per_sec"]
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest text files into a Chroma store")
+    parser.add_argument("paths", nargs="+", help="Files or directories (searched recursively)")
+    parser.add_argument("--store", default="chat", choices=sorted(CHROMA_STORES))
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--chunk-overlap", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embedding request")
+    parser.add_argument("--concurrency", type=int, default=None, help="Embedding requests in flight")
+    parser.add_argument("--no-prune", action="store_true", help="Keep chunks a file no longer produces")
+    args = parser.parse_args()
+
+    result = asyncio.run(ingest_documents(
+        iter_documents(args.paths),
+        store=args.store,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        prune=not args.no_prune
+    ))
+    print(f"\n📊 Ingestion into '{result['store']}'")
+    for key, value in result.items():
+        if key != "store":
+            print(f"{key:>16}: {value}")
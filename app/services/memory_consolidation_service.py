@@ -0,0 +1,218 @@
+"""
+Memory Consolidation
+Background worker that compacts raw Sharma Ji turns ("note" memories, one row per
+user message and one per reply) into "summary" memories, so per-user row counts
+and the recent-memory part of the prompt stay bounded. Only memories that
+save_sharmaji_turn tagged as chat turns (meta_data["source"] == CHAT_TURN_SOURCE)
+are consolidated; other notes are left alone.
+
+Every MEMORY_CONSOLIDATION_INTERVAL seconds it:
+1. picks up to MEMORY_CONSOLIDATION_USERS_PER_RUN users with at least
+   MEMORY_CONSOLIDATION_MIN_TURNS turns older than MEMORY_CONSOLIDATION_MIN_AGE_HOURS
+   that sit past their watermark (one aggregate query)
+2. works through those users, at most MEMORY_CONSOLIDATION_CONCURRENCY at a time
+3. per user, summarises the oldest MEMORY_CONSOLIDATION_BATCH_TURNS turns with one
+   LLM call and swaps them for the summary + moves the watermark in one transaction
+   (consolidate_turns), up to MEMORY_CONSOLIDATION_MAX_BATCHES_PER_USER times
+
+A failed summary leaves the turns and the watermark alone; they are retried on the
+next run. With MEMORY_CONSOLIDATION_ARCHIVE the original turn text is kept in the
+summary's metadata instead of being dropped.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.openai_client import get_ai_response
+from app.core.tracing import request_trace
+from app.db.session import SessionLocal
+from app.db.models.chat_long_memory_model import ChatLongMemory
+from app.repositories.chat_long_memory_repository import (
+    consolidate_turns,
+    get_consolidation_candidates,
+    get_unconsolidated_turns
+)
+from app.schemas.chat_long_memory_schema import ChatLongMemoryCreate
+from app.services.chat_long_memory_service import embed_memory_text
+
+logger = logging.getLogger(__name__)
+
+RAW_TURN_TYPE = "note"
+SUMMARY_TYPE = "summary"
+MAX_TURN_CHARS = 1000  # per turn in the summarisation prompt
+
+SUMMARY_PROMPT = (
+    "You maintain the long-term memory of Sharma Ji, a friendly AI assistant. "
+    "Summarise the conversation below into a short third-person note about the user: "
+    "facts about them, preferences, plans, open questions and anything they asked to be remembered. "
+    "Skip small talk and anything Sharma Ji can look up again. "
+    "Write at most 8 bullet points in the language the user used."
+)
+
+
+def format_transcript(turns: List[ChatLongMemory]) -> str:
+    speaker = {"human": "User", "ai": "Sharma Ji"}
+    return "\n".join(
+        f"{speaker.get(turn.role, turn.role)}: {turn.content[:MAX_TURN_CHARS]}" for turn in turns
+    )
+
+
+def aggregate_importance(turns: List[ChatLongMemory]) -> float:
+    """A summary is as important as the most important turn it replaces"""
+    scores = [turn.importance_score for turn in turns if turn.importance_score is not None]
+    return round(max(scores), 2) if scores else 0.5
+
+
+def summarise_turns(turns: List[ChatLongMemory]) -> Optional[str]:
+    try:
+        summary = get_ai_response(
+            [
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": format_transcript(turns)},
+            ],
+            model=settings.MEMORY_CONSOLIDATION_MODEL or None
+        )
+        return summary.strip() if summary and summary.strip() else None
+    except Exception as e:
+        logger.warning("⚠️ [CONSOLIDATION] Summary call failed: %s", e)
+        return None
+
+
+def consolidate_user(user_id: UUID, before: datetime) -> dict:
+    """Fold one user's eligible turns into summaries, one batch at a time (blocking)"""
+    result = {"turns": 0, "summaries": 0}
+    db = SessionLocal()
+    try:
+        for _ in range(settings.MEMORY_CONSOLIDATION_MAX_BATCHES_PER_USER):
+            turns = get_unconsolidated_turns(
+                db, user_id, RAW_TURN_TYPE, before, settings.MEMORY_CONSOLIDATION_BATCH_TURNS
+            )
+            if len(turns) < settings.MEMORY_CONSOLIDATION_MIN_TURNS:
+                break
+            summary = summarise_turns(turns)
+            if summary is None:
+                break
+
+            meta_data = {
+                "consolidated_turns": len(turns),
+                "from": turns[0].created_at.isoformat(),
+                "until": turns[-1].created_at.isoformat(),
+            }
+            if settings.MEMORY_CONSOLIDATION_ARCHIVE:
+                meta_data["archived_turns"] = [
+                    {"role": turn.role, "content": turn.content, "created_at": turn.created_at.isoformat()}
+                    for turn in turns
+                ]
+            consolidate_turns(
+                db,
+                ChatLongMemoryCreate(
+                    user_id=user_id,
+                    role="system",
+                    content=summary,
+                    memory_type=SUMMARY_TYPE,
+                    importance_score=aggregate_importance(turns),
+                    meta_data=meta_data
+                ),
+                source_ids=[turn.id for turn in turns],
+                until=turns[-1].created_at,
+                embedding=embed_memory_text(summary)
+            )
+            result["turns"] += len(turns)
+            result["summaries"] += 1
+    finally:
+        db.close()
+    return result
+
+
+class MemoryConsolidator:
+    """Periodic consolidation loop on the app's event loop; the DB + LLM work runs in threads"""
+
+    def __init__(self):
+        self._task: asyncio.Task = None
+        self._running = False
+        self.stats = {"runs": 0, "users": 0, "turns": 0, "summaries": 0, "errors": 0, "last_run_at": None}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(settings.MEMORY_CONSOLIDATION_INTERVAL)
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error("❌ [CONSOLIDATION] Run failed: %s", e)
+
+    async def run_once(self) -> dict:
+        """One consolidation pass over the most backlogged users"""
+        if self._running:
+            return {"skipped": True}
+        self._running = True
+        try:
+            before = datetime.now(timezone.utc) - timedelta(hours=settings.MEMORY_CONSOLIDATION_MIN_AGE_HOURS)
+            user_ids = await asyncio.to_thread(self._candidates, before)
+            semaphore = asyncio.Semaphore(settings.MEMORY_CONSOLIDATION_CONCURRENCY)
+
+            async def one(user_id):
+                async with semaphore:
+                    return await asyncio.to_thread(self._consolidate_traced, user_id, before)
+
+            results = await asyncio.gather(*(one(user_id) for user_id in user_ids), return_exceptions=True)
+            totals = {"users": len(user_ids), "turns": 0, "summaries": 0, "errors": 0}
+            for user_id, result in zip(user_ids, results):
+                if isinstance(result, Exception):
+                    totals["errors"] += 1
+                    logger.error("❌ [CONSOLIDATION] User %s failed: %s", user_id, result)
+                else:
+                    totals["turns"] += result["turns"]
+                    totals["summaries"] += result["summaries"]
+
+            self.stats["runs"] += 1
+            self.stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+            for key, value in totals.items():
+                self.stats[key] += value
+            logger.info(
+                "🧹 [CONSOLIDATION] %s users, %s turns → %s summaries",
+                totals["users"], totals["turns"], totals["summaries"]
+            )
+            return totals
+        finally:
+            self._running = False
+
+    @staticmethod
+    def _consolidate_traced(user_id: UUID, before: datetime) -> dict:
+        with request_trace("job consolidation"):
+            return consolidate_user(user_id, before)
+
+    @staticmethod
+    def _candidates(before: datetime) -> List[UUID]:
+        db = SessionLocal()
+        try:
+            return get_consolidation_candidates(
+                db, RAW_TURN_TYPE, before,
+                settings.MEMORY_CONSOLIDATION_MIN_TURNS, settings.MEMORY_CONSOLIDATION_USERS_PER_RUN
+            )
+        finally:
+            db.close()
+
+    async def stop(self):
+        """Cancel the loop (a batch already in a worker thread still commits or rolls back on its own)"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def snapshot(self) -> dict:
+        return {"enabled": settings.MEMORY_CONSOLIDATION_ENABLED, "running": self._running, **self.stats}
+
+
+memory_consolidator = MemoryConsolidator()
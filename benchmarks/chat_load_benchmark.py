@@ -0,0 +1,100 @@
+"""
+Chat Load Benchmark
+Fires concurrent POST /chat-memory/chat requests at a running server and
+reports throughput + latency percentiles for each concurrency level.
+
+Run it against a single uvicorn worker so the numbers are per-worker:
+
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.chat_load_benchmark --user-id <uuid> --label after
+
+Run once on the old (sync) build with --label before and once on the new
+(async) build with --label after, then compare the req/s columns.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+DEFAULT_QUESTIONS = [
+    "tum kaun ho?",
+    "FastAPI me dependency injection kaise kaam karta hai?",
+    "Python async aur threading me kya difference hai?",
+    "Ek achha REST API design kaise karte hain?",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values must be non-empty)"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    user_id: str,
+    concurrency: int,
+    total_requests: int,
+) -> dict:
+    """Send total_requests requests with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        payload = {"user_id": user_id, "question": DEFAULT_QUESTIONS[i % len(DEFAULT_QUESTIONS)]}
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/chat-memory/chat", json=payload)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) if latencies else 0.0,
+        "p95": percentile(latencies, 95) if latencies else 0.0,
+        "p99": percentile(latencies, 99) if latencies else 0.0,
+        "mean": statistics.mean(latencies) if latencies else 0.0,
+    }
+
+
+async def main(args: argparse.Namespace):
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        print(f"\n📊 Chat load benchmark [{args.label}] → {args.base_url}")
+        print(f"{'conc':>5} {'ok':>6} {'err':>5} {'req/s':>8} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8}")
+        for concurrency in args.concurrency:
+            total = args.requests or concurrency * 4
+            result = await run_level(client, args.user_id, concurrency, total)
+            print(
+                f"{result['concurrency']:>5} {result['ok']:>6} {result['errors']:>5} "
+                f"{result['rps']:>8.2f} {result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load benchmark for /chat-memory/chat")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user-id", required=True, help="Existing user UUID to chat as")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=0, help="Requests per level (default: 4 x concurrency)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--label", default="run", help="Tag printed with the results, e.g. before/after")
+    asyncio.run(main(parser.parse_args()))
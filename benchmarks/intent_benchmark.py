@@ -0,0 +1,95 @@
+"""
+Intent Benchmark
+Checks app.core.intent against the labelled corpus in benchmarks/intent_corpus.jsonl
+and times it against the substring scan it replaced.
+
+    python -m benchmarks.intent_benchmark --iterations 2000
+
+Exits non-zero when any corpus line is misclassified, so it doubles as a
+regression check after editing the keyword tables.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from app.core.intent import detect_intent
+
+CORPUS = Path(__file__).with_name("intent_corpus.jsonl")
+
+
+def legacy_detect_realtime_intent(question: str) -> bool:
+    """The pre-compiled-matcher implementation, kept here for comparison only"""
+    q = question.lower().strip()
+
+    realtime_keywords = [
+        "latest", "current", "today", "now", "live", "update", "trending", "recent", "breaking", "abhi",
+        "aaj", "abhi ka", "kal ka", "score", "match", "price", "rate", "value", "weather", "temperature",
+        "winner", "ipl", "news", "gold", "silver", "bitcoin", "stock", "sensex", "bazar", "market"
+    ]
+
+    finance_words = ["price", "rate", "value", "gold", "silver", "usd", "bitcoin", "crypto", "share", "stock"]
+    event_words = ["ipl", "match", "score", "winner", "tournament", "game"]
+    news_words = ["news", "update", "today", "breaking", "headline"]
+    weather_words = ["weather", "temperature", "climate", "rain", "humidity"]
+
+    if any(word in q for word in ["aaj", "abhi", "today", "current", "latest", "now"]) and \
+       any(w in q for w in (finance_words + event_words + news_words + weather_words)):
+        return True
+
+    if any(str(y) in q for y in range(2023, 2031)):
+        return True
+
+    return any(k in q for k in realtime_keywords)
+
+
+def load_corpus(path: Path):
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def time_per_call(fn, texts, iterations: int) -> float:
+    """Mean microseconds per call over `iterations` passes of the corpus"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (iterations * len(texts)) * 1e6
+
+
+def main(args: argparse.Namespace) -> int:
+    corpus = load_corpus(Path(args.corpus))
+    texts = [row["text"] for row in corpus]
+
+    failures = []
+    legacy_wrong = 0
+    for row in corpus:
+        intent = detect_intent(row["text"])
+        if sorted(intent.categories) != row["categories"] or intent.realtime != row["realtime"]:
+            failures.append((row, intent))
+        if legacy_detect_realtime_intent(row["text"]) != row["realtime"]:
+            legacy_wrong += 1
+
+    legacy_us = time_per_call(legacy_detect_realtime_intent, texts, args.iterations)
+    compiled_us = time_per_call(detect_intent, texts, args.iterations)
+
+    print(f"\n📊 Intent matching over {len(corpus)} labelled questions")
+    print(f"{'matcher':<22} {'us/call':>9} {'realtime wrong':>15}")
+    print(f"{'legacy substring':<22} {legacy_us:>9.2f} {legacy_wrong:>15}")
+    print(f"{'compiled regex':<22} {compiled_us:>9.2f} {sum(1 for row, i in failures if i.realtime != row['realtime']):>15}")
+    print(f"speedup: {legacy_us / compiled_us:.1f}x")
+
+    for row, intent in failures:
+        print(f"❌ {row['text']!r}: expected {row['categories']} realtime={row['realtime']}, "
+              f"got {sorted(intent.categories)} realtime={intent.realtime}")
+    if not failures:
+        print("✅ All corpus lines classified as labelled")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intent matcher accuracy and speed")
+    parser.add_argument("--corpus", default=str(CORPUS), help="JSONL with text, categories, realtime")
+    parser.add_argument("--iterations", type=int, default=2000, help="Passes over the corpus per matcher")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""
+LLM Router Benchmark
+Offline: runs the router against StubProviders with a chosen latency profile and
+compares pinning one provider, "auto", and "auto" with hedging.
+
+    python -m benchmarks.llm_router_benchmark --requests 300 --concurrency 10
+
+The default profile is a fast provider with a slow tail (5% of calls take 2s)
+and a slower but steady one, which is where hedging pays off.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.llm_router import LLMRouter, StubProvider
+
+
+def providers(args: argparse.Namespace):
+    return [
+        StubProvider("fast", latency=args.fast_latency, jitter=args.fast_latency / 4,
+                     slow_rate=args.fast_slow_rate, slow_latency=args.slow_latency,
+                     error_rate=args.fast_error_rate, seed=1),
+        StubProvider("steady", latency=args.steady_latency, jitter=args.steady_latency / 10, seed=2),
+    ]
+
+
+async def run(mode: str, args: argparse.Namespace) -> dict:
+    stubs = providers(args)
+    router = LLMRouter(stubs)
+    model_type, hedge = {"pinned": ("fast", False), "auto": ("auto", False), "hedged": ("auto", True)}[mode]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await router.complete(f"prompt {i}", model_type, hedge=hedge)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    ordered = sorted(latencies)
+
+    def pct(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else float("nan")
+
+    return {
+        "mode": mode,
+        "p50": statistics.median(ordered) * 1000 if ordered else float("nan"),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "errors": errors,
+        "calls": sum(stub.calls for stub in stubs),
+        "cancelled": sum(stub.cancelled for stub in stubs),
+        "hedges": router.counters["hedges"],
+        "hedge_wins": router.counters["hedge_wins"],
+    }
+
+
+def main(args: argparse.Namespace):
+    print(f"\n📊 LLM router, {args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'mode':<8} {'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8} {'errors':>7} "
+          f"{'calls':>6} {'cancel':>7} {'hedges':>7} {'wins':>5}")
+    for mode in args.modes:
+        r = asyncio.run(run(mode, args))
+        print(f"{r['mode']:<8} {r['p50']:>8.0f} {r['p95']:>8.0f} {r['p99']:>8.0f} {r['errors']:>7} "
+              f"{r['calls']:>6} {r['cancelled']:>7} {r['hedges']:>7} {r['hedge_wins']:>5}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routing / hedging against stub LLM providers")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["pinned", "auto", "hedged"],
+                        choices=["pinned", "auto", "hedged"])
+    parser.add_argument("--fast-latency", type=float, default=0.08)
+    parser.add_argument("--fast-slow-rate", type=float, default=0.05, help="Share of fast-provider calls in the tail")
+    parser.add_argument("--fast-error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--steady-latency", type=float, default=0.2)
+    main(parser.parse_args())
@@ -0,0 +1,134 @@
+"""
+Memory Search Benchmark
+Seeds one throwaway user with synthetic long-term memories (server-side, via
+generate_series) at growing sizes and times the old ILIKE scan against each
+search_memories_by_content mode at every size.
+
+Needs the text-search migration applied (alembic upgrade head):
+
+    python -m benchmarks.memory_search_benchmark --sizes 10000 100000 1000000
+
+The seeded user and its memories are deleted at the end unless --keep is given.
+"""
+import argparse
+import time
+import uuid
+from typing import Callable, List
+
+from sqlalchemy import and_, text
+
+from app.db.models.chat_long_memory_model import ChatLongMemory
+from app.db.session import SessionLocal
+from app.repositories.chat_long_memory_repository import SEARCH_MODES, search_memories_by_content
+
+VOCABULARY = [
+    "cricket", "biryani", "python", "fastapi", "mumbai", "delhi", "monsoon", "chai",
+    "exam", "office", "mother", "birthday", "guitar", "football", "project", "deadline",
+    "travel", "goa", "weekend", "movie", "gym", "diet", "salary", "startup",
+    "interview", "laptop", "bike", "wedding", "festival", "diwali", "holiday", "coffee",
+]
+
+# term per mode; "legacy" is the pre-index ILIKE query (run with bitmap scans off)
+QUERIES = {
+    "legacy": "cricket",
+    "words": "cricket biryani",
+    "prefix": "crick bir",
+    "phrase": "monsoon chai",
+    "substring": "ricke",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values must be non-empty)"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed(db, user_id: uuid.UUID, start: int, stop: int):
+    """Insert memories start..stop-1, six random vocabulary words each"""
+    db.execute(
+        text(
+            """
+            INSERT INTO chat_long_memory (id, user_id, memory_type, role, content, importance_score, metadata)
+            SELECT gen_random_uuid(), :user_id, 'note', 'human',
+                   (SELECT string_agg((CAST(:vocab AS text[]))[1 + floor(random() * :n)::int], ' ')
+                      FROM generate_series(1, 6) WHERE g >= 0),  -- correlated so each row re-rolls
+                   random(), '{}'::json
+              FROM generate_series(:start, :stop - 1) AS g
+            """
+        ),
+        {"user_id": user_id, "vocab": VOCABULARY, "n": len(VOCABULARY), "start": start, "stop": stop},
+    )
+    db.commit()
+    db.execute(text("ANALYZE chat_long_memory"))
+    db.commit()
+
+
+def legacy_search(db, user_id: uuid.UUID, term: str, limit: int):
+    # The trigram GIN index would serve this ILIKE too, and GIN is only read through
+    # bitmap scans: turning those off for the transaction times the pre-index plan
+    db.execute(text("SET LOCAL enable_bitmapscan = off"))
+    try:
+        return (
+            db.query(ChatLongMemory)
+            .filter(and_(ChatLongMemory.user_id == user_id, ChatLongMemory.content.ilike(f"%{term}%")))
+            .order_by(ChatLongMemory.importance_score.desc())
+            .limit(limit)
+            .all()
+        )
+    finally:
+        db.rollback()
+
+
+def time_query(run: Callable[[], list], repeats: int) -> dict:
+    run()  # warm-up
+    latencies = []
+    hits = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        hits = len(run())
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"hits": hits, "p50": percentile(latencies, 50), "p95": percentile(latencies, 95)}
+
+
+def main(args: argparse.Namespace):
+    db = SessionLocal()
+    user_id = uuid.uuid4()
+    db.execute(
+        text("INSERT INTO users (id, name, email) VALUES (:id, 'memory-search-benchmark', :email)"),
+        {"id": user_id, "email": f"bench-{user_id}@example.invalid"},
+    )
+    db.commit()
+
+    print(f"\n📊 Memory search benchmark (user {user_id}, limit {args.limit}, {args.repeats} repeats)")
+    print(f"{'rows':>9} {'mode':>10} {'hits':>6} {'p50(ms)':>9} {'p95(ms)':>9}")
+    seeded = 0
+    try:
+        for size in sorted(args.sizes):
+            seed(db, user_id, seeded, size)
+            seeded = size
+            runs = {"legacy": lambda: legacy_search(db, user_id, QUERIES["legacy"], args.limit)}
+            for mode in SEARCH_MODES:
+                runs[mode] = (
+                    lambda mode=mode: search_memories_by_content(db, user_id, QUERIES[mode], args.limit, mode)
+                )
+            for mode, run in runs.items():
+                result = time_query(run, args.repeats)
+                print(f"{size:>9} {mode:>10} {result['hits']:>6} {result['p50']:>9.2f} {result['p95']:>9.2f}")
+    finally:
+        if not args.keep:
+            db.rollback()
+            db.execute(text("DELETE FROM chat_long_memory WHERE user_id = :id"), {"id": user_id})
+            db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+            db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of long-term memory content search by table size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Leave the seeded user and memories in place")
+    main(parser.parse_args())
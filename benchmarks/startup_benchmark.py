@@ -0,0 +1,89 @@
+"""
+Startup Benchmark
+Measures what importing the app costs, per module, using `python -X importtime`
+in fresh interpreters (nothing cached in sys.modules between runs).
+
+    python -m benchmarks.startup_benchmark --runs 5 --top 25
+    python -m benchmarks.startup_benchmark --module app.services.chat_memory_service
+
+With --warm it also runs the lifespan warm-up once and prints how long each lazy
+resource (Chroma stores, LLM clients, ...) took to build.
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+# "import time:       123 |       4567 |   app.core.config"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> Dict[str, Dict[str, int]]:
+    """{module: {"self": us, "cumulative": us, "depth": n}} for one fresh import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = {"self": int(self_us), "cumulative": int(cumulative_us), "depth": (len(indent) - 1) // 2}
+    return timings
+
+
+def main(args: argparse.Namespace):
+    runs: List[Dict[str, Dict[str, int]]] = [measure(args.module) for _ in range(args.runs)]
+
+    totals = [run[args.module]["cumulative"] / 1000 for run in runs if args.module in run]
+    per_module = defaultdict(list)
+    for run in runs:
+        for name, timing in run.items():
+            per_module[name].append(timing)
+
+    def median(name, field):
+        return statistics.median(t[field] for t in per_module[name]) / 1000
+
+    print(f"\n📊 Import time for {args.module} ({args.runs} fresh runs)")
+    print(f"total: median {statistics.median(totals):.1f} ms, min {min(totals):.1f} ms, max {max(totals):.1f} ms")
+
+    app_modules = sorted((n for n in per_module if n.startswith("app.")), key=lambda n: -median(n, "cumulative"))
+    print(f"\n{'app module':<55} {'self(ms)':>9} {'cum(ms)':>9}")
+    for name in app_modules[:args.top]:
+        print(f"{name:<55} {median(name, 'self'):>9.1f} {median(name, 'cumulative'):>9.1f}")
+
+    # Third-party packages by top-level name, cumulative time of their first import
+    packages = {}
+    for name in per_module:
+        root = name.split(".")[0]
+        if root != "app" and (root not in packages or median(name, "cumulative") > packages[root]):
+            packages[root] = median(name, "cumulative")
+    print(f"\n{'third-party package':<55} {'cum(ms)':>9}")
+    for root, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{root:<55} {cumulative:>9.1f}")
+
+    if args.warm:
+        from app.core.resources import resources
+        __import__(args.module)
+        snapshot = asyncio.run(resources.warm_up())
+        print(f"\n{'resource (warm-up)':<55} {'init(s)':>9}")
+        for name, state in snapshot.items():
+            shown = f"{state['init_seconds']:.2f}" if state["init_seconds"] is not None else state["error"] or "-"
+            print(f"{name:<55} {shown:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-module import time of the app")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    parser.add_argument("--warm", action="store_true", help="Also time the lazy resource warm-up")
+    main(parser.parse_args())
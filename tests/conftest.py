@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+# Run from anywhere: `app` and `benchmarks` are imported from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings() reads these at import; the units under test never reach the services behind them
+for name, value in {
+    "APP_NAME": "test",
+    "APP_ENV": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_REGION": "us-east-1",
+    "S3_BUCKET_NAME": "test",
+    "OPENAI_API_KEY": "test",
+    "OPENAI_MODEL": "gpt-test",
+    "GROQ_API_KEY": "test",
+    "GROQ_MODEL": "groq-test",
+    "TAVILY_API_KEY": "test",
+    "BOT_NAME": "test",
+    "CREATOR_NAME": "test",
+    "LOG_FORMAT": "text",
+}.items():
+    os.environ.setdefault(name, value)
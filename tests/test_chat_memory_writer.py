@@ -0,0 +1,108 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.db import chat_memory_writer as writer_module
+from app.db.chat_memory_writer import ChatMemoryWriter
+from app.repositories import chat_memory_repository
+from app.schemas.chat_memory_schema import ChatMemoryCreate
+
+
+class Rows(list):
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self)
+
+
+class FakeDatabase:
+    """Stands in for AsyncSessionLocal: every user exists, inserts fail while `down`"""
+
+    def __init__(self):
+        self.down = False
+        self.inserted = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        if params is None:
+            return Rows(stmt.whereclause.right.value)  # the batch's user ids: all known
+        if self.down:
+            raise ConnectionError("database is down")
+        self.inserted.extend(row["id"] for row in params)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def database(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_WRITE_BEHIND_RETRIES", 1)
+    monkeypatch.setattr(settings, "CHAT_WRITE_BEHIND_FLUSH_INTERVAL", 0.01)
+    monkeypatch.setattr(settings, "CHAT_WRITE_BEHIND_DEAD_LETTER_MAX", 3)
+    fake = FakeDatabase()
+    monkeypatch.setattr(writer_module, "AsyncSessionLocal", fake)
+    return fake
+
+
+def turn(user_id, i=0):
+    return ChatMemoryCreate(user_id=user_id, question=f"q{i}", answer=f"a{i}")
+
+
+def test_failed_batch_is_dead_lettered_then_redriven(database):
+    writer, user_id = ChatMemoryWriter(), uuid.uuid4()
+
+    async def go():
+        database.down = True
+        first = await writer.enqueue(turn(user_id))
+        await writer._queue.join()
+        assert writer.stats["dead_lettered"] == 1 and writer.stats["dropped"] == 0
+        assert writer.pending_for(user_id) == [first]
+
+        database.down = False
+        second = await writer.enqueue(turn(user_id, 1))
+        await writer.stop()
+        return first, second
+
+    first, second = asyncio.run(go())
+    assert database.inserted == [second.id, first.id]
+    assert writer.stats["redriven"] == 1
+    assert writer.pending_for(user_id) == []
+    assert writer.snapshot()["dead_letter_depth"] == 0
+
+
+def test_full_dead_letter_discards_the_oldest_turns(database):
+    writer, user_id = ChatMemoryWriter(), uuid.uuid4()
+    database.down = True
+
+    async def go():
+        rows = [await writer.enqueue(turn(user_id, i)) for i in range(4)]
+        await writer.stop()
+        return rows
+
+    rows = asyncio.run(go())
+    assert writer.stats["dropped"] == 1
+    assert writer.pending_for(user_id) == rows[1:]
+
+
+def test_unknown_user_is_rejected_before_enqueue(database, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(chat_memory_repository.user_cache, "get", lambda user_id: None)
+
+    class NoUsers:
+        async def execute(self, stmt):
+            return type("Result", (), {"scalar_one_or_none": lambda self: None})()
+
+    with pytest.raises(ValueError, match="User not found"):
+        asyncio.run(chat_memory_repository.asave_chat_memory(NoUsers(), turn(uuid.uuid4())))
+    assert chat_memory_repository.chat_memory_writer.stats["enqueued"] == 0
@@ -0,0 +1,70 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.models.chat_long_memory_model import ChatLongMemory
+from app.db.models.memory_consolidation_model import MemoryConsolidationWatermark
+from app.repositories import chat_long_memory_repository as repo
+from app.services import chat_long_memory_service as service
+
+
+# SQLite stand-ins for the Postgres-only full-text column, which these tests never read
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_as_text(element, compiler, **kw):
+    return "TEXT"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_STATS_SUMMARY_ENABLED", False)
+    monkeypatch.setattr(service, "embed_memory_text", lambda text: [1.0, 0.0])
+    engine = create_engine("sqlite://")
+    event.listen(
+        engine, "connect",
+        lambda conn, _: conn.create_function("to_tsvector", 2, lambda config, text: text, deterministic=True)
+    )
+    tables = [ChatLongMemory.__table__, MemoryConsolidationWatermark.__table__]
+    ChatLongMemory.metadata.create_all(engine, tables=tables)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_saved_turn_is_tagged_and_picked_up_by_consolidation(db):
+    user_id = uuid.uuid4()
+    service.save_sharmaji_turn(db, str(user_id), "what is my name?", "Your name is Ravi.", [0.0, 1.0])
+
+    turns = db.query(ChatLongMemory).filter(repo._is_chat_turn("note")).all()
+    assert sorted(turn.role for turn in turns) == ["ai", "human"]
+    assert all(turn.meta_data == {"source": repo.CHAT_TURN_SOURCE} for turn in turns)
+
+    before = datetime.utcnow() + timedelta(minutes=1)
+    assert repo.get_consolidation_candidates(db, "note", before, min_turns=2, limit=10) == [user_id]
+    picked = repo.get_unconsolidated_turns(db, user_id, "note", before, limit=10)
+    assert {turn.id for turn in picked} == {turn.id for turn in turns}
+
+
+def test_untagged_note_is_not_a_chat_turn(db):
+    user_id = uuid.uuid4()
+    service.chat_long_memory_service.create_memory(
+        db, user_id=user_id, role="human", content="likes cricket", memory_type="note"
+    )
+    assert db.query(ChatLongMemory).filter(repo._is_chat_turn("note")).count() == 0
+
+
+def test_vector_index_failure_does_not_fail_a_committed_create(db, monkeypatch):
+    def broken_add(*args):
+        raise ValueError("dimension mismatch")
+
+    monkeypatch.setattr(repo.memory_vector_index, "add", broken_add)
+    memory = service.chat_long_memory_service.create_memory(
+        db, user_id=uuid.uuid4(), role="human", content="likes cricket", memory_type="note"
+    )
+    assert db.get(ChatLongMemory, memory.id) is not None
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from app.core.conversation_store import (
+    ConversationBackend,
+    ConversationStore,
+    MemoryConversationBackend,
+    turn_size,
+)
+
+
+def test_sessions_are_isolated():
+    backend = MemoryConversationBackend(max_turns=5, max_sessions=10, idle_ttl=60, max_bytes=10_000)
+    backend.append("a", "q1", "a1")
+    backend.append("b", "q2", "a2")
+    assert backend.history("a") == [("q1", "a1")]
+    assert backend.history("b") == [("q2", "a2")]
+
+
+def test_oldest_turns_are_dropped_past_max_turns():
+    backend = MemoryConversationBackend(max_turns=2, max_sessions=10, idle_ttl=60, max_bytes=10_000)
+    for i in range(3):
+        backend.append("a", f"q{i}", f"a{i}")
+    assert backend.history("a") == [("q1", "a1"), ("q2", "a2")]
+    assert backend.snapshot()["bytes"] == turn_size("q1", "a1") + turn_size("q2", "a2")
+
+
+def test_least_recently_used_session_is_evicted():
+    backend = MemoryConversationBackend(max_turns=5, max_sessions=2, idle_ttl=60, max_bytes=10_000)
+    backend.append("a", "q", "a")
+    backend.append("b", "q", "a")
+    backend.history("a")  # "b" is now the least recently used
+    backend.append("c", "q", "a")
+    assert backend.history("b") == []
+    assert backend.history("a") == [("q", "a")]
+    assert backend.snapshot()["evicted"] == 1
+
+
+def test_byte_ceiling_evicts_other_sessions_first():
+    size = turn_size("q" * 10, "a" * 10)
+    backend = MemoryConversationBackend(max_turns=5, max_sessions=10, idle_ttl=60, max_bytes=2 * size)
+    backend.append("a", "q" * 10, "a" * 10)
+    backend.append("b", "q" * 10, "a" * 10)
+    backend.append("b", "q" * 10, "a" * 10)
+    assert backend.history("a") == []
+    assert len(backend.history("b")) == 2
+    assert backend.snapshot()["bytes"] <= 2 * size
+
+
+def test_idle_sessions_expire():
+    backend = MemoryConversationBackend(max_turns=5, max_sessions=10, idle_ttl=0.05, max_bytes=10_000)
+    backend.append("a", "q", "a")
+    time.sleep(0.06)
+    assert backend.history("a") == []
+    assert backend.snapshot()["expired"] == 1
+
+
+def test_clear_reports_whether_the_session_existed():
+    store = ConversationStore(MemoryConversationBackend(max_turns=5, max_sessions=10, idle_ttl=60, max_bytes=10_000))
+    store.append("a", "q", "a")
+    assert store.clear("a") is True
+    assert store.clear("a") is False
+    assert store.history("a") == []
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class NoClear(ConversationBackend):
+        def history(self, session_id):
+            return []
+
+        def append(self, session_id, question, answer):
+            pass
+
+    with pytest.raises(TypeError):
+        NoClear()
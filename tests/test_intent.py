@@ -0,0 +1,22 @@
+import pytest
+
+from app.core.intent import detect_intent, detect_realtime_intent
+from benchmarks.intent_benchmark import CORPUS, load_corpus
+
+
+@pytest.mark.parametrize("row", load_corpus(CORPUS), ids=lambda row: row["text"])
+def test_corpus_line_is_classified_as_labelled(row):
+    intent = detect_intent(row["text"])
+    assert sorted(intent.categories) == row["categories"]
+    assert intent.realtime == row["realtime"]
+
+
+def test_keywords_only_match_whole_words():
+    assert not detect_realtime_intent("do you know my name")  # "now" in "know"
+    assert not detect_realtime_intent("keep these separate")  # "rate" in "separate"
+    assert detect_realtime_intent("gold prices now")
+
+
+def test_topic_follows_category_order():
+    assert detect_intent("ipl match and gold price").topic == "sports"
+    assert detect_intent("tell me a joke").topic == "default"
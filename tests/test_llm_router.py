@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.llm_router import LLMRouter, ProviderError, ProviderRateLimited, StubProvider
+
+
+@pytest.fixture(autouse=True)
+def router_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ROUTER_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "LLM_ROUTER_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "LLM_ROUTER_COOLDOWN", 0.1)
+    monkeypatch.setattr(settings, "LLM_ROUTER_HEDGE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_ROUTER_HEDGE_DELAY", 0.05)
+    monkeypatch.setattr(settings, "LLM_ROUTER_HEDGE_MIN_DELAY", 0.01)
+
+
+def stubs(**first):
+    return (
+        StubProvider("first", latency=0.01, jitter=0.0, seed=1, **first),
+        StubProvider("second", latency=0.02, jitter=0.0, seed=2),
+    )
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_unknown_model_type_is_rejected():
+    router = LLMRouter(stubs())
+    with pytest.raises(ValueError):
+        run(router.complete("hi", "nope"))
+
+
+def test_pinned_provider_is_used_alone():
+    first, second = stubs(error_rate=1.0)
+    router = LLMRouter([first, second])
+    with pytest.raises(ProviderError):
+        run(router.complete("hi", "first"))
+    assert second.calls == 0
+
+
+def test_auto_prefers_the_faster_provider_once_profiled():
+    first, second = StubProvider("slow", latency=0.03, jitter=0.0), StubProvider("fast", latency=0.005, jitter=0.0)
+    router = LLMRouter([first, second])
+
+    async def go():
+        for _ in range(2 * settings.LLM_ROUTER_MIN_SAMPLES):
+            await router.complete("hi")
+        return await router.complete("hi")
+
+    assert run(go()).provider == "fast"
+    assert router.ranked() == ["fast", "slow"]
+
+
+def test_failed_call_fails_over_to_the_next_provider():
+    router = LLMRouter(stubs(error_rate=1.0))
+    result = run(router.complete("hi"))
+    assert result.provider == "second"
+    assert router.counters["failovers"] == 1
+
+
+def test_one_failure_does_not_make_a_provider_unhealthy():
+    router = LLMRouter(stubs(error_rate=1.0))
+    run(router.complete("hi"))
+    assert router.snapshot()["providers"]["first"]["healthy"]
+    assert router.ranked()[0] == "first"
+
+
+def test_breaker_trips_then_recovers_through_half_open():
+    first, second = stubs(error_rate=1.0)
+    router = LLMRouter([first, second])
+
+    async def go():
+        for _ in range(settings.LLM_ROUTER_FAILURE_THRESHOLD):
+            assert (await router.complete("hi")).provider == "second"
+
+    run(go())
+    stats = router.snapshot()["providers"]["first"]
+    assert not stats["healthy"] and stats["trips"] == 1
+    assert router.ranked() == ["second", "first"]
+
+    time.sleep(settings.LLM_ROUTER_COOLDOWN)
+    assert router.snapshot()["providers"]["first"]["half_open"]
+    first.error_rate = 0.0
+    assert run(router.complete("hi", "first")).provider == "first"
+    stats = router.snapshot()["providers"]["first"]
+    assert stats["healthy"] and not stats["half_open"]
+
+
+def test_failure_while_half_open_trips_again():
+    first, second = stubs(error_rate=1.0)
+    router = LLMRouter([first, second])
+
+    async def fail(times):
+        for _ in range(times):
+            with pytest.raises(ProviderError):
+                await router.complete("hi", "first")
+
+    run(fail(settings.LLM_ROUTER_FAILURE_THRESHOLD))
+    time.sleep(settings.LLM_ROUTER_COOLDOWN)
+    run(fail(1))
+    stats = router.snapshot()["providers"]["first"]
+    assert not stats["healthy"] and stats["trips"] == 2
+
+
+def test_hedge_wins_and_cancels_the_slow_call():
+    first, second = stubs(slow_rate=1.0, slow_latency=2.0)
+    router = LLMRouter([first, second])
+    started = time.perf_counter()
+    result = run(router.complete("hi", hedge=True))
+    assert result.provider == "second"
+    assert time.perf_counter() - started < 1.0
+    assert first.cancelled == 1
+    assert router.counters["hedges"] == 1
+    assert router.counters["hedge_wins"] == 1
+    assert router.snapshot()["providers"]["first"]["cancelled"] == 1
+
+
+def test_no_hedge_when_the_primary_answers_in_time():
+    first, second = stubs()
+    router = LLMRouter([first, second])
+    assert run(router.complete("hi", hedge=True)).provider == "first"
+    assert second.calls == 0
+    assert router.counters["hedges"] == 0
+
+
+def test_rate_limit_is_raised_without_failover_or_health_penalty():
+    first, second = stubs(rate_limit_rate=1.0)
+    router = LLMRouter([first, second])
+    for _ in range(settings.LLM_ROUTER_FAILURE_THRESHOLD + 1):
+        with pytest.raises(ProviderRateLimited):
+            run(router.complete("hi"))
+    assert second.calls == 0
+    stats = router.snapshot()["providers"]["first"]
+    assert stats["healthy"] and stats["errors"] == 0
+    assert stats["rate_limited"] == settings.LLM_ROUTER_FAILURE_THRESHOLD + 1
+    assert router.counters["rate_limited"] == settings.LLM_ROUTER_FAILURE_THRESHOLD + 1
@@ -0,0 +1,26 @@
+import sqlite3
+import threading
+import time
+
+from app.db import pool_metrics
+from app.db.pool_metrics import InstrumentedQueuePool, PoolMetrics
+
+
+def slow_connect():
+    time.sleep(0.2)
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+def test_connect_time_is_not_counted_as_pool_wait(monkeypatch):
+    metrics = PoolMetrics("sync")
+    monkeypatch.setattr(pool_metrics, "sync_pool_metrics", metrics)
+    pool = InstrumentedQueuePool(slow_connect, pool_size=1, max_overflow=0, timeout=2)
+
+    first = pool.connect()  # opens the only connection: connect time, no wait
+    threading.Timer(0.3, first.close).start()
+    pool.connect().close()  # blocks on the queue until `first` is returned
+
+    stats = metrics.snapshot(pool)
+    assert stats["connect_seconds_total"] >= 0.2
+    assert stats["wait_seconds_max"] >= 0.25
+    assert stats["wait_seconds_total"] - stats["wait_seconds_max"] < 0.05
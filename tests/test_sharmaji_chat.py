@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.services import chat_long_memory_service as service
+
+PLAN = {
+    "context_messages": [{"role": "user", "content": "hi"}],
+    "realtime_data": "",
+    "personalised": False,
+    "message_embedding": None,
+}
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    turns = []
+    monkeypatch.setattr(service, "prepare_sharmaji_chat", lambda db, user_id, message: dict(PLAN))
+    monkeypatch.setattr(
+        service, "save_sharmaji_turn",
+        lambda db, user_id, message, reply, embedding=None: turns.append((message, reply))
+    )
+    monkeypatch.setattr(
+        service.sharmaji_response_cache, "put",
+        lambda *args, **kwargs: pytest.fail("a failed reply must not be cached")
+    )
+    return turns
+
+
+async def broken_stream(messages):
+    yield "Namaste"
+    raise RuntimeError("provider down")
+
+
+def stream_events(**kwargs):
+    async def go():
+        return [event async for event in service.stream_sharmaji_chat(None, "user", "hi", **kwargs)]
+
+    return asyncio.run(go())
+
+
+def test_failed_reply_is_saved(monkeypatch, saved):
+    def broken(messages):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(service, "get_ai_response", broken)
+    assert service.sharmaji_chat(None, "user", "hi")["reply"] == service.SHARMAJI_ERROR_REPLY
+    assert saved == [("hi", service.SHARMAJI_ERROR_REPLY)]
+
+
+def test_failed_stream_is_saved_like_the_blocking_chat(monkeypatch, saved):
+    monkeypatch.setattr(service, "stream_ai_response", broken_stream)
+    events = stream_events()
+    assert [name for name, _ in events] == ["sources", "token", "error"]
+    assert events[-1][1]["reply"] == service.SHARMAJI_ERROR_REPLY
+    assert saved == [("hi", service.SHARMAJI_ERROR_REPLY)]
+
+
+def test_disconnected_stream_saves_nothing(monkeypatch, saved):
+    async def disconnected():
+        return True
+
+    monkeypatch.setattr(service, "stream_ai_response", broken_stream)
+    assert [name for name, _ in stream_events(is_disconnected=disconnected)] == ["sources"]
+    assert saved == []